@@ -0,0 +1,74 @@
+"""
+Ponto de entrada ASGI da API Med-IA.
+
+Reaproveita a mesma aplicação Flask (main.app) e os mesmos serviços, atrás do adaptador
+WsgiToAsgi do asgiref. O servidor ASGI mantém as conexões (inclusive clientes lentos e
+keep-alive) no event loop, e o tratamento de cada requisição roda em um pool de threads. Assim,
+uma requisição lenta ocupa uma thread, e não um worker inteiro como no gunicorn síncrono.
+O WsgiToAsgi padrão roda todas as chamadas WSGI em uma única thread (thread_sensitive=True);
+aqui elas vão para o pool de threads do worker.
+O scraping do Datasus já roda em segundo plano (catalog_refresh) e não bloqueia requisições.
+
+Uso:
+    uvicorn asgi:app --host 0.0.0.0 --port $PORT --workers 2
+    gunicorn -k uvicorn.workers.UvicornWorker -w 2 asgi:app
+
+MEDIA_ASGI_THREADS define o tamanho do pool por worker (padrão 32); requisições excedentes
+aguardam na fila do pool, e suas conexões continuam no event loop.
+"""
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+
+# Com --workers N, cada processo observa os arquivos de origem (hot_reload), como no gunicorn.conf.py
+os.environ.setdefault('MEDIA_RELOAD_INTERVAL', '5')
+
+from main import app as flask_app  # noqa: E402
+
+ASGI_THREADS = int(os.environ.get('MEDIA_ASGI_THREADS', 32))
+
+
+class _ThreadPoolWsgiInstance(WsgiToAsgiInstance):
+    """Instância do WsgiToAsgi cuja chamada WSGI roda no pool de threads, e não na thread única."""
+
+    # Mesmo corpo do asgiref (WsgiToAsgiInstance.run_wsgi_app sem o decorador), só sem a thread única
+    run_wsgi_app = sync_to_async(WsgiToAsgiInstance.__dict__['run_wsgi_app'].__wrapped__,
+                                 thread_sensitive=False)
+
+
+class _ThreadPoolWsgiToAsgi(WsgiToAsgi):
+    async def __call__(self, scope, receive, send):
+        await _ThreadPoolWsgiInstance(self.wsgi_application, self.duplicate_header_limit)(scope, receive, send)
+
+
+class MediaASGI:
+    """Adaptador ASGI: ciclo de vida (lifespan) próprio e HTTP delegado ao Flask."""
+
+    def __init__(self, wsgi_app, threads: int = ASGI_THREADS):
+        self.http_app = _ThreadPoolWsgiToAsgi(wsgi_app)
+        self.threads = threads
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+        else:
+            await self.http_app(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                # Executor padrão do loop, usado por sync_to_async(thread_sensitive=False)
+                asyncio.get_running_loop().set_default_executor(
+                    ThreadPoolExecutor(self.threads, thread_name_prefix='media-asgi')
+                )
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+app = MediaASGI(flask_app)
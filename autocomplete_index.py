@@ -0,0 +1,81 @@
+"""
+Índice compacto de autocomplete de doenças para a SPA, gerado na etapa de build.
+
+`python autocomplete_index.py` lê o catálogo (snapshot) e grava em static/:
+- autocomplete.<hash>.json: o índice. Como o hash vai no nome, static_assets o serve com
+  cache de um ano (immutable) e com as variantes .gz/.br de `python static_assets.py`;
+- autocomplete.manifest.json: aponta para o índice atual (servido com no-cache, revalidado
+  pelo ETag).
+
+Formato do índice (listas paralelas, uma posição por doença):
+    {"version": ..., "names": [...], "codes": [...], "keys": [...], "buckets": {"di": [0, 7, ...]}}
+`keys` é o nome normalizado (minúsculas, sem acentos). `buckets` mapeia os dois primeiros
+caracteres de cada palavra para as posições que têm uma palavra com esse início. Assim a SPA
+filtra só um balde por tecla, sem requisições à API durante a digitação.
+"""
+import glob
+import hashlib
+import json
+import os
+import unicodedata
+from typing import Dict, List
+
+from catalog_snapshot import get_snapshot
+from catalog_store import write_bytes_atomic
+from static_assets import STATIC_DIR
+
+INDEX_PREFIX = 'autocomplete.'
+MANIFEST_NAME = 'autocomplete.manifest.json'
+BUCKET_SIZE = 2
+
+
+def normalize(text: str) -> str:
+    """Minúsculas e sem acentos (a SPA aplica a mesma normalização à consulta)."""
+    decomposed = unicodedata.normalize('NFD', text.lower())
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def build_index(doencas: List[Dict], version: str) -> Dict:
+    names, codes, keys = [], [], []
+    buckets: Dict[str, List[int]] = {}
+    for doenca in doencas:
+        nome = doenca.get('nome') or ''
+        if not nome:
+            continue
+        position = len(names)
+        key = normalize(nome)
+        names.append(nome)
+        codes.append(doenca.get('cid', ''))
+        keys.append(key)
+        for prefix in sorted({word[:BUCKET_SIZE] for word in key.split()}):
+            buckets.setdefault(prefix, []).append(position)
+    return {'version': version, 'names': names, 'codes': codes, 'keys': keys, 'buckets': buckets}
+
+
+def write_index(directory: str = STATIC_DIR) -> Dict:
+    """Grava o índice com hash no nome e o manifesto; remove índices de builds anteriores."""
+    snapshot = get_snapshot()
+    index = build_index(snapshot.doencas, snapshot.doencas_version)
+    data = json.dumps(index, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    name = f"{INDEX_PREFIX}{hashlib.sha256(data).hexdigest()[:12]}.json"
+
+    os.makedirs(directory, exist_ok=True)
+    write_bytes_atomic(os.path.join(directory, name), data)
+    manifest = {'index': name, 'version': index['version'], 'entries': len(index['names'])}
+    write_bytes_atomic(os.path.join(directory, MANIFEST_NAME), json.dumps(manifest).encode('utf-8'))
+
+    for old in glob.glob(os.path.join(directory, f'{INDEX_PREFIX}*.json*')):
+        base = os.path.basename(old)
+        if not base.startswith((name, MANIFEST_NAME)):
+            os.unlink(old)
+    return dict(manifest, bytes=len(data))
+
+
+def main():
+    manifest = write_index()
+    print(f"Índice de autocomplete gravado em {STATIC_DIR}/{manifest['index']}: "
+          f"{manifest['entries']} doenças, {manifest['bytes']} bytes (versão {manifest['version']})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark de compressão das respostas típicas da API: banda economizada e custo de CPU por
+nível de gzip/brotli, usando os mesmos payloads de bench_json.py. Ajuda a escolher
+MEDIA_GZIP_LEVEL e MEDIA_BROTLI_QUALITY para o CompressionMiddleware.
+
+Uso:
+    python benchmarks/bench_compression.py [--scale 1] [--seconds 0.5] [--json saida.json]
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from flask import Flask
+
+from bench_json import build_payloads, measure
+from compression import BROTLI_QUALITY, GZIP_LEVEL
+from json_provider import FastJSONProvider
+from response_cache import brotli
+
+
+def compressors():
+    levels = {f'gzip-{level}': (lambda body, level=level: gzip.compress(body, compresslevel=level, mtime=0))
+              for level in (1, GZIP_LEVEL, 9)}
+    if brotli is not None:
+        for quality in (1, BROTLI_QUALITY, 11):
+            levels[f'br-{quality}'] = lambda body, quality=quality: brotli.compress(body, quality=quality)
+    return levels
+
+
+def run(scale, seconds):
+    app = Flask(__name__)
+    provider = FastJSONProvider(app)
+    results = []
+    with app.app_context():
+        for name, payload in build_payloads(scale).items():
+            body = provider.response(payload).get_data()
+            for codec, func in compressors().items():
+                size = len(func(body))
+                ops = measure(lambda: func(body), seconds)
+                results.append({
+                    'payload': name,
+                    'codec': codec,
+                    'bytes': len(body),
+                    'compressed_bytes': size,
+                    'ratio': round(size / len(body), 3),
+                    'ms_per_response': round(1000 / ops, 3),
+                    'mb_per_sec': round(ops * len(body) / 1e6, 1),
+                })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', type=int, default=1, help='multiplicador do catálogo sintético')
+    parser.add_argument('--seconds', type=float, default=0.5, help='duração de cada medição')
+    parser.add_argument('--json', dest='json_path', help='grava os resultados em JSON')
+    args = parser.parse_args()
+
+    results = run(args.scale, args.seconds)
+
+    print(f"{'payload':<22}{'codec':<9}{'bytes':>10}{'comprimido':>12}{'razão':>8}{'ms':>9}{'MB/s':>8}")
+    for r in results:
+        print(f"{r['payload']:<22}{r['codec']:<9}{r['bytes']:>10}{r['compressed_bytes']:>12}"
+              f"{r['ratio']:>8}{r['ms_per_response']:>9}{r['mb_per_sec']:>8}")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
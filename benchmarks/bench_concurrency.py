@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Benchmark de conexões concorrentes: gunicorn síncrono com configuração padrão (sync), gunicorn com
+gunicorn.conf.py (tuned: gthread + preload) e entrada ASGI (asgi.py).
+
+Sobe cada servidor em um subprocesso, abre N conexões keep-alive simultâneas e mede
+requisições/s e latências. Com --stalled-clients, abre também conexões que enviam só parte do
+cabeçalho e ficam paradas (clientes lentos). No modo sync cada uma prende um worker; no tuned
+prende uma thread e no ASGI só ocupa o event loop.
+
+Uso:
+    python benchmarks/bench_concurrency.py [--connections 32] [--seconds 5] [--workers 2]
+                                           [--stalled-clients 0] [--json saida.json]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_PATHS = ['/api/v2/categories', '/api/doencas?limit=50', '/api/v2/disease/J45/details']
+
+
+def server_commands(workers, port):
+    return {
+        # -c /dev/null: rodando em ROOT_DIR o gunicorn carregaria ./gunicorn.conf.py sozinho
+        'sync': [sys.executable, '-m', 'gunicorn', '-c', '/dev/null', '-k', 'sync', '--threads', '1',
+                 '-w', str(workers), '-b', f'127.0.0.1:{port}', '--log-level', 'warning', 'main:app'],
+        'tuned': [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '-w', str(workers),
+                  '-b', f'127.0.0.1:{port}', '--log-level', 'warning', 'main:app'],
+        'asgi': [sys.executable, '-m', 'uvicorn', 'asgi:app', '--workers', str(workers),
+                 '--host', '127.0.0.1', '--port', str(port), '--log-level', 'warning'],
+    }
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_ready(port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            conn.request('GET', '/health')
+            if conn.getresponse().status == 200:
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def stall(port, count):
+    """Conexões que enviam meio cabeçalho e param (cliente lento)."""
+    sockets = []
+    for _ in range(count):
+        s = socket.create_connection(('127.0.0.1', port))
+        s.sendall(b'GET /api/v2/categories HTTP/1.1\r\nHost: localhost\r\n')
+        sockets.append(s)
+    return sockets
+
+
+def client(port, paths, deadline, latencies, errors, timeout=10):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=timeout)
+    i = 0
+    while time.perf_counter() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            conn.request('GET', path, headers={'Accept-Encoding': 'gzip'})
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 500:
+                errors.append(response.status)
+            latencies.append(time.perf_counter() - start)
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(type(e).__name__)
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=timeout)
+
+
+def run_load(port, connections, seconds, paths):
+    latencies, errors = [], []
+    deadline = time.perf_counter() + seconds
+    threads = [threading.Thread(target=client, args=(port, paths, deadline, latencies, errors))
+               for _ in range(connections)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+
+    def pct(p):
+        return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 2) if latencies else None
+
+    return {
+        'requests': len(latencies),
+        'rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': pct(0.50),
+        'p99_ms': pct(0.99),
+        'mean_ms': round(statistics.mean(latencies) * 1000, 2) if latencies else None,
+        'errors': len(errors),
+    }
+
+
+def bench_server(name, workers, connections, seconds, stalled, paths):
+    port = free_port()
+    env = dict(os.environ, PYTHONPATH=ROOT_DIR)
+    process = subprocess.Popen(server_commands(workers, port)[name], cwd=ROOT_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    stalled_sockets = []
+    try:
+        if not wait_ready(port):
+            raise RuntimeError(f"servidor {name} não respondeu em /health")
+        run_load(port, min(connections, 4), 1.0, paths)  # aquecimento
+        stalled_sockets = stall(port, stalled)
+        result = run_load(port, connections, seconds, paths)
+    finally:
+        for s in stalled_sockets:
+            s.close()
+        process.terminate()
+        process.wait(timeout=10)
+    return dict(result, server=name, workers=workers, connections=connections, stalled_clients=stalled)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--servers', default='sync,tuned,asgi', help='servidores a comparar (sync, tuned, asgi)')
+    parser.add_argument('--workers', type=int, default=2, help='processos por servidor')
+    parser.add_argument('--connections', type=int, default=32, help='conexões simultâneas')
+    parser.add_argument('--seconds', type=float, default=5.0, help='duração de cada medição')
+    parser.add_argument('--stalled-clients', type=int, default=0, help='conexões lentas paradas durante a medição')
+    parser.add_argument('--path', dest='paths', action='append', help='rota a exercitar (repetível)')
+    parser.add_argument('--json', dest='json_path', help='grava os resultados em JSON')
+    args = parser.parse_args()
+
+    results = [
+        bench_server(name, args.workers, args.connections, args.seconds, args.stalled_clients,
+                     args.paths or DEFAULT_PATHS)
+        for name in args.servers.split(',')
+    ]
+
+    print(f"{'server':<8}{'workers':>8}{'conns':>7}{'stalled':>9}{'req/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'errors':>8}")
+    for r in results:
+        p50, p99 = (r['p50_ms'] or '-'), (r['p99_ms'] or '-')
+        print(f"{r['server']:<8}{r['workers']:>8}{r['connections']:>7}{r['stalled_clients']:>9}"
+              f"{r['rps']:>10}{p50:>9}{p99:>9}{r['errors']:>8}")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
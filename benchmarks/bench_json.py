@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark de serialização JSON: provedor padrão do Flask vs FastJSONProvider,
+usando os payloads reais de /api/doencas, /categories/<letter>/diseases e do
+relatório de interações.
+
+Uso:
+    python benchmarks/bench_json.py [--scale 40] [--seconds 1.0] [--json saida.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+# Permitir importar os módulos da raiz do projeto
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from enhanced_drug_interaction_checker import EnhancedDrugInteractionChecker
+from json_provider import FastJSONProvider, detect_backend
+
+
+def build_payloads(scale):
+    """Monta os payloads a partir dos dados reais do projeto."""
+    with open(os.path.join(ROOT_DIR, 'doencas_cache.json'), encoding='utf-8') as f:
+        doencas = json.load(f)['doencas']
+
+    payloads = {'doencas': doencas}
+
+    # Catálogo escalado, simulando o CID-10 completo
+    if scale > 1:
+        payloads[f'doencas_x{scale}'] = [
+            dict(d, codigo_seq=str(i * len(doencas) + int(d['codigo_seq'])))
+            for i in range(scale) for d in doencas
+        ]
+
+    # Maior categoria, no formato de /api/v2/categories/<letter>/diseases
+    por_letra = {}
+    for d in doencas:
+        por_letra.setdefault(d['categoria'][:1].upper(), []).append({
+            "code": d['cid'],
+            "description": d['nome'],
+            "severity": "Leve",
+            "has_treatment": True,
+            "treatment_type": "Medicamentoso"
+        })
+    letra, diseases = max(por_letra.items(), key=lambda item: len(item[1]))
+    payloads['category_diseases'] = {
+        "success": True,
+        "category": letra,
+        "total_diseases": len(diseases),
+        "diseases": diseases
+    }
+
+    # Resumo + relatório de interações com medicamentos que interagem entre si
+    checker = EnhancedDrugInteractionChecker()
+    medications = ['varfarina', 'aspirina', 'ibuprofeno', 'enalapril', 'losartana',
+                   'amoxicilina', 'fluoxetina', 'fenitoína', 'omeprazol', 'clopidogrel']
+    payloads['interaction_report'] = {
+        'success': True,
+        'medications': medications,
+        'summary': checker.get_interaction_summary(medications),
+        'detailed_report': checker.generate_interaction_report(medications)
+    }
+    return payloads
+
+
+def measure(func, seconds):
+    """Executa func repetidamente por ~seconds e retorna operações por segundo."""
+    func()  # aquecimento
+    iterations = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while True:
+        func()
+        iterations += 1
+        now = time.perf_counter()
+        if now >= deadline:
+            return iterations / (now - start)
+
+
+def run(scale, seconds):
+    app = Flask(__name__)
+    providers = {
+        'stdlib': DefaultJSONProvider(app),
+        detect_backend(): FastJSONProvider(app),
+    }
+    results = []
+
+    with app.app_context():
+        for name, payload in build_payloads(scale).items():
+            size = len(providers['stdlib'].response(payload).get_data())
+            for provider_name, provider in providers.items():
+                body = provider.response(payload).get_data()
+                dumps_ops = measure(lambda: provider.response(payload).get_data(), seconds)
+                loads_ops = measure(lambda: provider.loads(body), seconds)
+                results.append({
+                    'payload': name,
+                    'provider': provider_name,
+                    'bytes': size,
+                    'dumps_ops_per_sec': round(dumps_ops, 1),
+                    'dumps_mb_per_sec': round(dumps_ops * size / 1e6, 1),
+                    'loads_ops_per_sec': round(loads_ops, 1),
+                })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', type=int, default=40, help='multiplicador do catálogo sintético')
+    parser.add_argument('--seconds', type=float, default=1.0, help='duração de cada medição')
+    parser.add_argument('--json', dest='json_path', help='grava os resultados em JSON')
+    args = parser.parse_args()
+
+    results = run(args.scale, args.seconds)
+
+    print(f"{'payload':<22}{'provider':<10}{'bytes':>10}{'dumps/s':>12}{'MB/s':>9}{'loads/s':>12}")
+    for r in results:
+        print(f"{r['payload']:<22}{r['provider']:<10}{r['bytes']:>10}"
+              f"{r['dumps_ops_per_sec']:>12}{r['dumps_mb_per_sec']:>9}{r['loads_ops_per_sec']:>12}")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
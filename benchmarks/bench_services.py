@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Suíte de benchmarks reprodutível dos caminhos de busca, diagnóstico e interações.
+
+Mede, sobre catálogos sintéticos escalados (mesma semente, mesmos dados a cada execução):
+- CIDCategorizer.search_by_name e search_by_code_pattern, em cada backend de busca (--backends:
+  memory, a pontuação em Python; fts5, o índice SQLite FTS5, com a montagem do índice medida à parte);
+- EnhancedSymptomService.get_symptom_analysis;
+e, independentes do tamanho do catálogo:
+- DiagnosticEngine.analyze_symptoms_report com laudo curto e longo;
+- EnhancedDrugInteractionChecker.check_interactions com 2, 10 e 25 medicamentos.
+
+O resultado em JSON (--json) traz a versão do Python, o commit e o tamanho de cada catálogo.
+Com --compare baseline.json, as medianas são comparadas com uma execução anterior, e o
+processo sai com código 1 se alguma piorar mais que --threshold (padrão 15%).
+
+Uso:
+    python benchmarks/bench_services.py [--sizes 1000,14000,50000] [--rounds 7] [--backends memory,fts5]
+                                        [--json saida.json] [--compare baseline.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+import catalog_snapshot
+from catalog_snapshot import CatalogSnapshot, build_indexes
+from cid_categorizer import CIDCategorizer
+from diagnostic_engine import DiagnosticEngine
+from enhanced_drug_interaction_checker import EnhancedDrugInteractionChecker
+from enhanced_symptom_service import EnhancedSymptomService
+from fts_search import BACKENDS, FTSSearchIndex
+from knowledge_base import get_table
+
+SEED = 20240601
+DEFAULT_SIZES = (1000, 14000, 50000)
+
+SHORT_REPORT = "Paciente com febre e tosse há três dias."
+LONG_REPORT = (
+    "Paciente de 58 anos refere dor no peito em aperto há duas horas, com falta de ar, sudorese "
+    "e palpitações. Relata também tontura, náusea e um episódio de vômito. Histórico de dor de "
+    "cabeça frequente, fadiga, perda de apetite e insônia nas últimas semanas, além de sede "
+    "excessiva, visão turva e formigamento nos pés. Nega febre. Ao exame, ansioso e com tosse seca. "
+) * 3
+
+SEARCH_QUERIES = ('tuberculose', 'diabetes mellitus', 'doença pulmonar obstrutiva', 'febre')
+CODE_PATTERNS = ('A0', 'I1', 'J4')
+SYMPTOM_SETS = (['febre', 'tosse'], ['dor no peito', 'falta de ar', 'sudorese', 'palpitações'])
+
+
+def synthetic_catalog(size: int, seed: int = SEED):
+    """Catálogo real ampliado até `size` entradas, com nomes recombinados de forma determinística."""
+    with open(os.path.join(ROOT_DIR, 'cid10_datasus.json'), encoding='utf-8') as f:
+        cid10_real = json.load(f)
+    with open(os.path.join(ROOT_DIR, 'doencas_cache.json'), encoding='utf-8') as f:
+        doencas_real = json.load(f)['doencas']
+
+    rng = random.Random(seed)
+    words = sorted({w for item in cid10_real + doencas_real
+                    for w in (item.get('description') or item.get('nome', '')).split() if len(w) > 2})
+    categorias = sorted({d['categoria'] for d in doencas_real})
+
+    cid10 = list(cid10_real[:size])
+    codes = {item['code'] for item in cid10}
+    doencas = list(doencas_real[:size])
+    n = 0
+    while len(cid10) < size or len(doencas) < size:
+        letter = chr(ord('A') + n % 26)
+        code = f"{letter}{(n // 26) % 100:02d}.{n // 2600}"
+        n += 1
+        if code in codes:
+            continue
+        codes.add(code)
+        name = ' '.join(rng.sample(words, rng.randint(2, 6))).capitalize()
+        if len(cid10) < size:
+            cid10.append({'code': code, 'description': name})
+        if len(doencas) < size:
+            doencas.append({'codigo_seq': str(len(doencas) + 1), 'nome': name, 'cid': code,
+                            'categoria': rng.choice(categorias)})
+    return doencas, cid10
+
+
+def install_catalog(size: int):
+    doencas, cid10 = synthetic_catalog(size)
+    snapshot = CatalogSnapshot(doencas=doencas, doencas_version=f'synthetic-{size}', last_update=None,
+                               cid10=cid10, indexes=build_indexes(doencas, cid10), sources={})
+    # Sem a verificação por stat(), o snapshot sintético não é trocado pelo dos arquivos
+    catalog_snapshot.set_auto_refresh(False)
+    catalog_snapshot.install_snapshot(snapshot)
+
+
+def measure(func, rounds: int, min_time: float = 0.05):
+    """Mediana/mínimo/p95 do tempo por chamada (µs), com calibragem do número de chamadas por rodada."""
+    func()  # aquecimento
+    calls = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(calls):
+            func()
+        if time.perf_counter() - start >= min_time or calls >= 1 << 20:
+            break
+        calls *= 2
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(calls):
+            func()
+        samples.append((time.perf_counter() - start) / calls * 1e6)
+    samples.sort()
+    return {
+        'median_us': round(statistics.median(samples), 2),
+        'min_us': round(samples[0], 2),
+        'p95_us': round(samples[min(len(samples) - 1, int(0.95 * len(samples)))], 2),
+        'calls_per_round': calls,
+        'rounds': rounds,
+    }
+
+
+def drug_list(count: int):
+    drugs = sorted(get_table('drug_aliases'))
+    return [drugs[i] if i < len(drugs) else f'medicamento-{i}' for i in range(count)]
+
+
+def catalog_cases(size: int, backends=BACKENDS):
+    cases = {}
+    for backend in backends:
+        # Os casos do backend em memória mantêm os nomes de antes, comparáveis com baselines antigas
+        prefix = '' if backend == 'memory' else f'{backend}:'
+        categorizer = CIDCategorizer(search_backend=backend)
+        if backend == 'fts5':
+            cid10 = catalog_snapshot.get_snapshot().cid10
+            cases['fts5_build'] = lambda c=cid10: FTSSearchIndex(c).build()
+        for query in SEARCH_QUERIES:
+            cases[f'search_by_name[{prefix}{query}]'] = lambda q=query, c=categorizer: c.search_by_name(q)
+        for pattern in CODE_PATTERNS:
+            cases[f'search_by_code_pattern[{prefix}{pattern}]'] = \
+                lambda p=pattern, c=categorizer: c.search_by_code_pattern(p)
+    symptoms = EnhancedSymptomService()
+    for selected in SYMPTOM_SETS:
+        cases[f'get_symptom_analysis[{len(selected)}]'] = lambda s=selected: symptoms.get_symptom_analysis(s)
+    return cases
+
+
+def fixed_cases():
+    engine = DiagnosticEngine()
+    checker = EnhancedDrugInteractionChecker()
+    cases = {
+        'analyze_symptoms_report[curto]': lambda: engine.analyze_symptoms_report(SHORT_REPORT),
+        'analyze_symptoms_report[longo]': lambda: engine.analyze_symptoms_report(LONG_REPORT),
+    }
+    for count in (2, 10, 25):
+        medications = drug_list(count)
+        cases[f'check_interactions[{count}]'] = lambda m=medications: checker.check_interactions(m)
+    return cases
+
+
+def run(sizes, rounds, backends=BACKENDS):
+    results = []
+    for name, func in fixed_cases().items():
+        results.append(dict(measure(func, rounds), case=name, catalog_size=None))
+    previous = catalog_snapshot.get_snapshot()
+    try:
+        for size in sizes:
+            install_catalog(size)
+            for name, func in catalog_cases(size, backends).items():
+                results.append(dict(measure(func, rounds), case=name, catalog_size=size))
+    finally:
+        catalog_snapshot.install_snapshot(previous)
+        catalog_snapshot.set_auto_refresh(True)
+    return results
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                                capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'commit': commit,
+        'timestamp': int(time.time()),
+        'seed': SEED,
+    }
+
+
+def compare(results, baseline_path, threshold):
+    """Lista os casos cuja mediana piorou mais que threshold em relação à baseline."""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {(r['case'], r['catalog_size']): r for r in json.load(f)['results']}
+    regressions = []
+    for r in results:
+        before = baseline.get((r['case'], r['catalog_size']))
+        if before:
+            change = r['median_us'] / before['median_us'] - 1
+            r['change_vs_baseline'] = round(change, 3)
+            if change > threshold:
+                regressions.append(r)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help='tamanhos dos catálogos sintéticos, separados por vírgula')
+    parser.add_argument('--rounds', type=int, default=7, help='rodadas por caso')
+    parser.add_argument('--backends', default=','.join(BACKENDS),
+                        help='backends de busca do CIDCategorizer, separados por vírgula')
+    parser.add_argument('--json', dest='json_path', help='grava os resultados em JSON')
+    parser.add_argument('--compare', dest='baseline', help='JSON de uma execução anterior para comparação')
+    parser.add_argument('--threshold', type=float, default=0.15, help='piora máxima aceita (fração)')
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(',') if s]
+    backends = [b for b in args.backends.split(',') if b]
+    unknown = set(backends) - set(BACKENDS)
+    if unknown:
+        parser.error(f"backends desconhecidos: {', '.join(sorted(unknown))}")
+    results = run(sizes, args.rounds, backends)
+    regressions = compare(results, args.baseline, args.threshold) if args.baseline else []
+
+    print(f"{'caso':<50}{'catálogo':>10}{'mediana µs':>13}{'mín µs':>11}{'p95 µs':>11}{'Δ':>9}")
+    for r in results:
+        change = r.get('change_vs_baseline')
+        print(f"{r['case']:<50}{r['catalog_size'] or '-':>10}{r['median_us']:>13}{r['min_us']:>11}"
+              f"{r['p95_us']:>11}{'' if change is None else f'{change:+.1%}':>9}")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({'environment': environment(), 'results': results}, f, ensure_ascii=False, indent=2)
+
+    if regressions:
+        print(f"\n{len(regressions)} caso(s) mais lentos que a baseline (limite {args.threshold:.0%}):")
+        for r in regressions:
+            print(f"  {r['case']} (catálogo {r['catalog_size'] or '-'}): {r['change_vs_baseline']:+.1%}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
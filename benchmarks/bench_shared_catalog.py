@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark das varreduras das rotas /api/v2 com o catálogo em memória e com o catálogo
+compartilhado (MEDIA_SHARED_CATALOG=1, registros decodificados sob demanda do mmap).
+
+Sobre os mesmos catálogos sintéticos de bench_services.py, mede por requisição:
+- POST /api/v2/search/name (varredura dos nomes + leitura dos 20 primeiros resultados);
+- montagem de /api/v2/categories (contagem por categoria, sem o cache de respostas);
+- montagem de /api/v2/categories/<prefixo>/diseases com prefixo de mais de uma letra;
+e, à parte, a primeira extração das colunas (CatalogSnapshot.column), feita uma vez por snapshot.
+
+Uso:
+    python benchmarks/bench_shared_catalog.py [--sizes 1000,14000,50000] [--rounds 7] [--json saida.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from bench_services import DEFAULT_SIZES, SEARCH_QUERIES, environment, measure, synthetic_catalog
+
+import catalog_snapshot
+from catalog_snapshot import CatalogSnapshot, build_indexes, read_shared, write_shared
+from main import app
+from src.routes import enhanced_disease
+
+MODES = ('memoria', 'compartilhado')
+
+
+def snapshots(size: int, tmp: str):
+    """Snapshot sintético em memória e o mesmo catálogo gravado e mapeado com shared_catalog."""
+    doencas, cid10 = synthetic_catalog(size)
+    # sources preenchido: has_doencas precisa ser verdadeiro para as rotas não fazerem scraping
+    memoria = CatalogSnapshot(doencas=doencas, doencas_version=f'synthetic-{size}', last_update=None,
+                              cid10=cid10, indexes=build_indexes(doencas, cid10),
+                              sources={'doencas': (0, size), 'cid10': (0, size)})
+    path = os.path.join(tmp, f'catalog_shared_{size}.bin')
+    write_shared(memoria, path)
+    return {'memoria': memoria, 'compartilhado': read_shared(path)}
+
+
+def route_cases(client, prefix: str):
+    cases = {}
+    for query in SEARCH_QUERIES:
+        cases[f'search/name[{query}]'] = \
+            lambda q=query: client.post('/api/v2/search/name', json={'query': q}).get_json()
+    cases['categories'] = enhanced_disease._montar_categorias
+    cases[f'categories/{prefix}/diseases'] = lambda: enhanced_disease._montar_doencas_categoria(prefix)
+    return cases
+
+
+def column_build(snapshot: CatalogSnapshot):
+    def build():
+        snapshot._columns.clear()
+        snapshot.column('doencas', 'nome')
+        snapshot.column('doencas', 'categoria')
+    return build
+
+
+def run(sizes, rounds):
+    results = []
+    client = app.test_client()
+    previous = catalog_snapshot.get_snapshot()
+    catalog_snapshot.set_auto_refresh(False)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for size in sizes:
+                for mode, snapshot in snapshots(size, tmp).items():
+                    catalog_snapshot.install_snapshot(snapshot)
+                    results.append(dict(measure(column_build(snapshot), rounds),
+                                        case='column_build', mode=mode, catalog_size=size))
+                    prefix = snapshot.doencas[0]['categoria'][:4]
+                    for name, func in route_cases(client, prefix).items():
+                        results.append(dict(measure(func, rounds), case=name, mode=mode, catalog_size=size))
+    finally:
+        catalog_snapshot.install_snapshot(previous)
+        catalog_snapshot.set_auto_refresh(True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help='tamanhos dos catálogos sintéticos, separados por vírgula')
+    parser.add_argument('--rounds', type=int, default=7, help='rodadas por caso')
+    parser.add_argument('--json', dest='json_path', help='grava os resultados em JSON')
+    args = parser.parse_args()
+
+    results = run([int(s) for s in args.sizes.split(',') if s], args.rounds)
+
+    medianas = {(r['case'], r['catalog_size'], r['mode']): r['median_us'] for r in results}
+    print(f"{'caso':<40}{'catálogo':>10}{'memória µs':>13}{'mmap µs':>13}{'razão':>9}")
+    for case, size, mode in medianas:
+        if mode != MODES[0]:
+            continue
+        memoria, compartilhado = medianas[case, size, MODES[0]], medianas[case, size, MODES[1]]
+        print(f"{case:<40}{size:>10}{memoria:>13}{compartilhado:>13}{compartilhado / memoria:>8.2f}x")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({'environment': environment(), 'results': results}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
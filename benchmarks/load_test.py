@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Teste de carga HTTP com perfis de tráfego gravados (benchmarks/profiles/*.json).
+
+Cada perfil descreve a mistura de rotas com pesos. Uma entrada pode ter:
+- `values`: valores sorteados para {value} no path ou para o campo da rajada;
+- `json`: corpos alternativos para POST;
+- `burst`: rajada de autocomplete, em que o valor é enviado prefixo a prefixo, como alguém
+  digitando (min_prefix letras em diante, com think_ms entre teclas).
+
+Usuários virtuais (threads) repetem sorteios do perfil em laço fechado durante --seconds. O
+sorteio usa semente fixa, então a mesma carga se repete a cada execução. Alvos:
+- inprocess: a aplicação Flask no próprio processo, via test client (sem rede);
+- gunicorn: sobe `gunicorn -c gunicorn.conf.py` em um subprocesso;
+- --url http://host:porta: servidor já em execução.
+
+O scraping do Datasus é desligado (MEDIA_BACKGROUND_REFRESH=0), então nenhum serviço externo
+é acessado. O relatório traz vazão e latências p50/p95/p99 por rota e no total.
+
+Uso:
+    python benchmarks/load_test.py [--profile mixed] [--target inprocess|gunicorn] [--url URL]
+                                   [--users 8] [--seconds 10] [--workers 2] [--json saida.json]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROFILES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'profiles')
+sys.path.append(ROOT_DIR)
+os.environ['MEDIA_BACKGROUND_REFRESH'] = '0'
+
+from bench_concurrency import free_port, wait_ready
+
+SEED = 20240601
+
+
+def load_profile(name_or_path):
+    path = name_or_path if name_or_path.endswith('.json') else os.path.join(PROFILES_DIR, f'{name_or_path}.json')
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def expand(entry, rng):
+    """Requisições (nome, método, path, corpo) geradas por um sorteio da entrada."""
+    value = rng.choice(entry['values']) if entry.get('values') else None
+    path = entry['path'].replace('{value}', str(value)) if value is not None else entry['path']
+    burst = entry.get('burst')
+    if burst:
+        for size in range(burst.get('min_prefix', 1), len(value) + 1):
+            yield entry['name'], entry['method'], path, {burst['field']: value[:size]}, burst.get('think_ms', 0)
+        return
+    body = rng.choice(entry['json']) if entry.get('json') else None
+    yield entry['name'], entry['method'], path, body, 0
+
+
+class InProcessClient:
+    """Envia requisições à aplicação Flask pelo test client (um por usuário virtual)."""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, body):
+        response = self.client.open(path, method=method, json=body, headers={'Accept-Encoding': 'gzip'})
+        response.get_data()
+        return response.status_code
+
+    def close(self):
+        pass
+
+
+class HttpClient:
+    """Conexão HTTP keep-alive com um servidor real."""
+
+    def __init__(self, host, port):
+        self.host, self.port = host, port
+        self.conn = http.client.HTTPConnection(host, port, timeout=30)
+
+    def request(self, method, path, body):
+        headers = {'Accept-Encoding': 'gzip'}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        try:
+            self.conn.request(method, path, body=payload, headers=headers)
+            response = self.conn.getresponse()
+            response.read()
+            return response.status
+        except (OSError, http.client.HTTPException):
+            self.conn.close()
+            self.conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+            raise
+
+    def close(self):
+        self.conn.close()
+
+
+def virtual_user(index, client_factory, profile, deadline, samples, errors):
+    rng = random.Random(SEED + index)
+    entries = profile['requests']
+    weights = [entry.get('weight', 1) for entry in entries]
+    client = client_factory()
+    try:
+        while time.perf_counter() < deadline:
+            entry = rng.choices(entries, weights)[0]
+            for name, method, path, body, think_ms in expand(entry, rng):
+                if time.perf_counter() >= deadline:
+                    break
+                start = time.perf_counter()
+                try:
+                    status = client.request(method, path, body)
+                except (OSError, http.client.HTTPException) as e:
+                    errors.append((name, type(e).__name__))
+                    continue
+                samples.append((name, time.perf_counter() - start))
+                if status >= 500:
+                    errors.append((name, status))
+                if think_ms:
+                    time.sleep(think_ms / 1000)
+    finally:
+        client.close()
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    return round(sorted_values[min(len(sorted_values) - 1, int(p * len(sorted_values)))] * 1000, 2)
+
+
+def summarize(name, latencies, error_count, elapsed):
+    latencies.sort()
+    return {
+        'route': name,
+        'requests': len(latencies),
+        'errors': error_count,
+        'rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': percentile(latencies, 0.50),
+        'p95_ms': percentile(latencies, 0.95),
+        'p99_ms': percentile(latencies, 0.99),
+    }
+
+
+def run_load(client_factory, profile, users, seconds):
+    samples, errors = [], []
+    deadline = time.perf_counter() + seconds
+    threads = [threading.Thread(target=virtual_user, args=(i, client_factory, profile, deadline, samples, errors))
+               for i in range(users)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    by_route = {}
+    for name, latency in samples:
+        by_route.setdefault(name, []).append(latency)
+    error_counts = {}
+    for name, _ in errors:
+        error_counts[name] = error_counts.get(name, 0) + 1
+    routes = [summarize(name, by_route.get(name, []), error_counts.get(name, 0), elapsed)
+              for name in sorted(set(by_route) | set(error_counts))]
+    total = summarize('TOTAL', [latency for _, latency in samples], len(errors), elapsed)
+    return routes + [total]
+
+
+def start_gunicorn(workers):
+    port = free_port()
+    env = dict(os.environ, PYTHONPATH=ROOT_DIR, MEDIA_BACKGROUND_REFRESH='0')
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '-w', str(workers),
+         '-b', f'127.0.0.1:{port}', '--log-level', 'warning', 'main:app'],
+        cwd=ROOT_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    if not wait_ready(port):
+        process.terminate()
+        raise RuntimeError("gunicorn não respondeu em /health")
+    return process, port
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profile', default='mixed', help='nome em benchmarks/profiles ou caminho de um JSON')
+    parser.add_argument('--target', choices=('inprocess', 'gunicorn'), default='inprocess')
+    parser.add_argument('--url', help='servidor já em execução (ignora --target)')
+    parser.add_argument('--users', type=int, default=8, help='usuários virtuais simultâneos')
+    parser.add_argument('--seconds', type=float, default=10.0, help='duração da medição')
+    parser.add_argument('--warmup', type=float, default=1.0, help='aquecimento antes da medição')
+    parser.add_argument('--workers', type=int, default=2, help='workers do gunicorn (--target gunicorn)')
+    parser.add_argument('--json', dest='json_path', help='grava os resultados em JSON')
+    args = parser.parse_args()
+
+    profile = load_profile(args.profile)
+    process = None
+    try:
+        if args.url:
+            parts = urlsplit(args.url)
+            target = args.url
+            client_factory = lambda: HttpClient(parts.hostname, parts.port or 80)
+        elif args.target == 'gunicorn':
+            process, port = start_gunicorn(args.workers)
+            target = f'gunicorn ({args.workers} workers)'
+            client_factory = lambda: HttpClient('127.0.0.1', port)
+        else:
+            from main import app
+            target = 'inprocess'
+            client_factory = lambda: InProcessClient(app)
+
+        if args.warmup > 0:
+            run_load(client_factory, profile, min(args.users, 2), args.warmup)
+        results = run_load(client_factory, profile, args.users, args.seconds)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=10)
+
+    print(f"perfil {args.profile} · alvo {target} · {args.users} usuários · {args.seconds:g}s")
+    print(f"{'rota':<22}{'reqs':>8}{'erros':>7}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for r in results:
+        print(f"{r['route']:<22}{r['requests']:>8}{r['errors']:>7}{r['rps']:>9}"
+              f"{r['p50_ms'] or '-':>9}{r['p95_ms'] or '-':>9}{r['p99_ms'] or '-':>9}")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({'profile': args.profile, 'target': target, 'users': args.users,
+                       'seconds': args.seconds, 'results': results}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
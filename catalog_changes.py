@@ -0,0 +1,141 @@
+"""
+Log de alterações do catálogo para sincronização incremental (GET /api/v2/catalog/changes).
+
+Cada gravação do catálogo (catalog_store.save_catalog) compara a lista anterior com a nova,
+por CID, e acrescenta ao log uma entrada com os CIDs incluídos, removidos e alterados. Os CIDs
+personalizados (add_custom_cid) entram no mesmo log com source="custom" e levam o próprio
+registro, já que não fazem parte do catálogo em disco.
+
+O log fica ao lado do catálogo (doencas_cache.changes.json) e tem numeração própria,
+monotônica: cada entrada incrementa `version`. O cliente guarda a última versão vista e pede
+só o que mudou depois dela. Para limitar o tamanho do arquivo, só as últimas
+MEDIA_CHANGELOG_MAX_ENTRIES entradas são mantidas. `base` marca a menor versão ainda
+respondível, e um cliente mais antigo que isso recebe full_snapshot_required e baixa o
+catálogo inteiro.
+"""
+import json
+import os
+import time
+from typing import Dict, Iterable, List, Optional
+
+CHANGELOG_FORMAT = 1
+MAX_ENTRIES = int(os.environ.get('MEDIA_CHANGELOG_MAX_ENTRIES', 500))
+
+
+def changelog_path(catalog_path: str) -> str:
+    """doencas_cache.json -> doencas_cache.changes.json"""
+    return os.path.splitext(catalog_path)[0] + '.changes.json'
+
+
+def _by_cid(doencas: Iterable[Dict]) -> Dict[str, Dict]:
+    index = {}
+    for doenca in doencas:
+        index.setdefault(doenca.get('cid', '').upper(), doenca)
+    return index
+
+
+def diff_doencas(previous: List[Dict], current: List[Dict]) -> Dict[str, List[str]]:
+    """CIDs incluídos, removidos e alterados entre duas versões da lista de doenças."""
+    before, after = _by_cid(previous), _by_cid(current)
+    return {
+        'added': sorted(cid for cid in after if cid not in before),
+        'removed': sorted(cid for cid in before if cid not in after),
+        'modified': sorted(cid for cid, doenca in after.items() if cid in before and before[cid] != doenca),
+    }
+
+
+def read_changelog(path: str) -> Dict:
+    """Log em disco; um log inexistente começa na versão 1 (base), sem entradas."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {'format_version': CHANGELOG_FORMAT, 'version': 1, 'base': 1, 'entries': []}
+    if data.get('format_version', 1) > CHANGELOG_FORMAT:
+        raise ValueError(f"Formato de log {data['format_version']} não suportado")
+    return data
+
+
+_cached = {}
+
+
+def current_changelog(path: str) -> Dict:
+    """read_changelog com cache por (mtime, tamanho): as requisições não reparseiam o arquivo."""
+    try:
+        st = os.stat(path)
+        stamp = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        stamp = None
+    cached = _cached.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    log = read_changelog(path)
+    _cached[path] = (stamp, log)
+    return log
+
+
+def append_change(path: str, source: str, added=(), removed=(), modified=(),
+                  records: Optional[Dict[str, Dict]] = None, catalog_version: Optional[int] = None) -> Optional[int]:
+    """
+    Acrescenta uma entrada ao log e retorna a nova versão (None se nada mudou).
+    O chamador serializa os escritores (catalog_store._exclusive).
+    """
+    from catalog_store import write_json_atomic
+
+    if not (added or removed or modified):
+        return None
+    log = read_changelog(path)
+    version = log['version'] + 1
+    entry = {'version': version, 'ts': int(time.time()), 'source': source,
+             'added': list(added), 'removed': list(removed), 'modified': list(modified)}
+    if catalog_version is not None:
+        entry['catalog_version'] = catalog_version
+    if records:
+        entry['records'] = records
+    entries = log['entries'] + [entry]
+    base = log['base']
+    if len(entries) > MAX_ENTRIES:
+        # Compactação: quem estiver antes da última entrada descartada precisa do catálogo inteiro
+        base = entries[-MAX_ENTRIES - 1]['version']
+        entries = entries[-MAX_ENTRIES:]
+    write_json_atomic(path, {'format_version': CHANGELOG_FORMAT, 'version': version, 'base': base,
+                             'entries': entries})
+    return version
+
+
+def changes_since(log: Dict, since: int) -> Optional[Dict]:
+    """
+    Estado final de cada CID alterado depois de `since`, ou None se o log já foi compactado
+    além desse ponto. Operações em sequência são combinadas (incluído e depois removido some
+    do resultado; removido e depois incluído vira alterado).
+    """
+    if since < log['base'] or since > log['version']:
+        return None
+    state: Dict[tuple, str] = {}
+    records: Dict[tuple, Dict] = {}
+    for entry in log['entries']:
+        if entry['version'] <= since:
+            continue
+        source = entry.get('source', 'catalog')
+        for op in ('added', 'removed', 'modified'):
+            for cid in entry[op]:
+                key = (source, cid)
+                previous = state.get(key)
+                if previous is None:
+                    state[key] = op
+                elif previous == 'added':
+                    state[key] = 'added' if op != 'removed' else None
+                elif previous == 'removed':
+                    state[key] = 'modified' if op == 'added' else op
+                else:
+                    state[key] = op
+                if cid in entry.get('records', {}):
+                    records[key] = entry['records'][cid]
+    result = {'added': [], 'removed': [], 'modified': []}
+    for (source, cid), op in sorted(state.items()):
+        if op is not None:
+            item = {'cid': cid, 'source': source}
+            if (source, cid) in records and op != 'removed':
+                item['record'] = records[(source, cid)]
+            result[op].append(item)
+    return result
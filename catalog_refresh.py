@@ -0,0 +1,72 @@
+"""
+Atualização do catálogo do Datasus em segundo plano, uma de cada vez (single-flight).
+
+Com o cache expirado, as rotas continuam servindo o catálogo atual e apenas agendam o
+scraping aqui; nenhuma requisição espera pela rede do Datasus. Depois de uma tentativa,
+a próxima só é agendada após MEDIA_REFRESH_RETRY segundos (padrão 15 min), para que uma
+indisponibilidade do Datasus não gere uma tentativa por requisição.
+MEDIA_BACKGROUND_REFRESH=0 desliga o agendamento automático (testes de carga, ambientes sem
+acesso ao Datasus); refresh_async continua disponível.
+"""
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Optional
+
+import fork_hooks
+from media_logging import get_logger
+
+RETRY_INTERVAL = int(os.environ.get('MEDIA_REFRESH_RETRY', 15 * 60))
+BACKGROUND_REFRESH = os.environ.get('MEDIA_BACKGROUND_REFRESH', '1').lower() not in ('0', 'false', 'no')
+
+logger = get_logger('catalog_refresh')
+_lock = threading.Lock()
+_future: Optional[Future] = None
+_last_attempt = 0.0
+
+
+def _run(scrape: Callable, future: Future):
+    try:
+        future.set_result(scrape())
+    except BaseException as e:
+        future.set_exception(e)
+        logger.error("Erro na atualização em segundo plano: %s", e)
+
+
+def schedule_refresh(scrape: Callable, force: bool = False) -> Optional[Future]:
+    """
+    Agenda scrape() em uma thread própria se não houver outra em andamento e o intervalo
+    entre tentativas já tiver passado. Retorna o Future da execução em andamento (ou nova),
+    ou None se nada foi agendado.
+    """
+    global _future, _last_attempt
+    with _lock:
+        if _future is not None and not _future.done():
+            return _future
+        if not force and (not BACKGROUND_REFRESH or time.time() - _last_attempt < RETRY_INTERVAL):
+            return None
+        _last_attempt = time.time()
+        _future = Future()
+        # Thread nova a cada execução: continua válida após o fork dos workers do gunicorn
+        threading.Thread(target=_run, args=(scrape, _future), name='media-catalog-refresh', daemon=True).start()
+        return _future
+
+
+@fork_hooks.register
+def reset_after_fork():
+    """No processo filho a thread do mestre não existe: descarta o Future órfão e o lock copiado."""
+    global _lock, _future
+    _lock = threading.Lock()
+    _future = None
+
+
+def refresh_running() -> bool:
+    return _future is not None and not _future.done()
+
+
+async def refresh_async(scrape: Callable):
+    """Versão aguardável para código assíncrono: aguarda a execução em andamento ou uma nova."""
+    future = schedule_refresh(scrape, force=True)
+    return await asyncio.wrap_future(future)
@@ -0,0 +1,279 @@
+"""
+Snapshot binário do catálogo (doencas_cache.json + cid10_datasus.json) com índices pré-construídos.
+
+O pipeline de atualização (update_cache.py ou `python catalog_snapshot.py`) compila os JSONs e
+os índices de busca em catalog_snapshot.pickle. Cada worker carrega o snapshot com uma única
+leitura, em vez de parsear os JSONs várias vezes e reconstruir os índices por serviço.
+Se o snapshot estiver ausente ou desatualizado em relação aos JSONs, ele é reconstruído em memória.
+
+Com MEDIA_SHARED_CATALOG=1 o catálogo é servido a partir de catalog_shared.bin, mapeado com mmap
+(ver shared_catalog): os workers compartilham as mesmas páginas em vez de cada um manter suas
+próprias listas e índices.
+"""
+import json
+import os
+import pickle
+import threading
+from typing import Dict, List, Optional
+
+import fork_hooks
+from catalog_store import read_catalog, write_bytes_atomic
+from media_logging import get_logger
+from shared_catalog import SharedCatalog, write_shared_catalog
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DOENCAS_PATH = os.path.join(BASE_DIR, 'doencas_cache.json')
+CID10_PATH = os.path.join(BASE_DIR, 'cid10_datasus.json')
+SNAPSHOT_PATH = os.environ.get('MEDIA_SNAPSHOT_PATH', os.path.join(BASE_DIR, 'catalog_snapshot.pickle'))
+SHARED_PATH = os.environ.get('MEDIA_SHARED_CATALOG_PATH', os.path.join(BASE_DIR, 'catalog_shared.bin'))
+SHARED_CATALOG = os.environ.get('MEDIA_SHARED_CATALOG', '').lower() in ('1', 'true', 'yes')
+
+SNAPSHOT_MAGIC = b'MEDIASNAP'
+SNAPSHOT_FORMAT = 1
+
+
+def _source_stamp(path: str):
+    """(mtime_ns, tamanho) do arquivo fonte, ou None se ausente."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class CatalogSnapshot:
+    """Catálogo imutável e seus índices. Não altere as listas retornadas."""
+    FIELDS = ('doencas', 'doencas_version', 'last_update', 'cid10', 'indexes', 'sources')
+    __slots__ = FIELDS + ('_columns',)
+
+    def __init__(self, doencas, doencas_version, last_update, cid10, indexes, sources):
+        self.doencas = doencas
+        self.doencas_version = doencas_version
+        self.last_update = last_update
+        self.cid10 = cid10
+        self.indexes = indexes
+        self.sources = sources
+        self._columns = {}
+
+    @property
+    def has_doencas(self) -> bool:
+        return self.sources.get('doencas') is not None
+
+    def doenca_por_cid(self, cid: str) -> Optional[Dict]:
+        idx = self.indexes['doencas_by_cid'].get(cid.upper())
+        return None if idx is None else self.doencas[idx]
+
+    def doencas_por_letra(self, letter: str) -> List[Dict]:
+        """Doenças cuja categoria começa pela letra (critério usado nas rotas /categories)."""
+        return [self.doencas[i] for i in self.indexes['doencas_by_category_letter'].get(letter.upper(), ())]
+
+    def column(self, table: str, field: str) -> tuple:
+        """
+        Valores de `field` (None se ausente) em todos os registros de `table` ('doencas' ou
+        'cid10'), na ordem das posições, extraídos uma vez por snapshot em cada processo.
+        As varreduras por campo (busca por nome, agrupamento por categoria) percorrem esta tupla
+        e só decodificam os registros selecionados, em vez de decodificar o catálogo mapeado
+        (RecordView) inteiro a cada requisição.
+        """
+        key = (table, field)
+        values = self._columns.get(key)
+        if values is None:
+            values = tuple(record.get(field) for record in getattr(self, table))
+            self._columns[key] = values
+        return values
+
+    def cid10_por_codigo(self, code: str) -> Optional[Dict]:
+        idx = self.indexes['cid10_by_code'].get(code.upper().strip())
+        return None if idx is None else self.cid10[idx]
+
+    def is_current(self) -> bool:
+        """True se os JSONs de origem não mudaram desde a compilação."""
+        return self.sources == {'doencas': _source_stamp(DOENCAS_PATH), 'cid10': _source_stamp(CID10_PATH)}
+
+
+def build_indexes(doencas: List[Dict], cid10: List[Dict]) -> Dict:
+    """Constrói os índices usados pelos serviços e rotas."""
+    doencas_by_cid = {}
+    doencas_by_category_letter = {}
+    for i, doenca in enumerate(doencas):
+        doencas_by_cid.setdefault(doenca.get('cid', '').upper(), i)
+        categoria = doenca.get('categoria', '')
+        if categoria:
+            doencas_by_category_letter.setdefault(categoria[:1].upper(), []).append(i)
+
+    cid10_by_code = {}
+    cid10_by_letter = {}
+    for i, item in enumerate(cid10):
+        code = item.get('code', '').upper()
+        cid10_by_code.setdefault(code, i)
+        if code:
+            cid10_by_letter.setdefault(code[0], []).append(i)
+    for positions in cid10_by_letter.values():
+        positions.sort(key=lambda i: cid10[i].get('code', ''))
+
+    return {
+        'doencas_by_cid': doencas_by_cid,
+        'doencas_by_category_letter': doencas_by_category_letter,
+        'cid10_by_code': cid10_by_code,
+        'cid10_by_letter': cid10_by_letter,
+    }
+
+
+def build_snapshot() -> CatalogSnapshot:
+    """Compila o snapshot a partir dos JSONs de origem."""
+    sources = {'doencas': _source_stamp(DOENCAS_PATH), 'cid10': _source_stamp(CID10_PATH)}
+
+    catalog = read_catalog(DOENCAS_PATH) or {'doencas': [], 'version': None, 'last_update': None}
+    cid10 = []
+    if os.path.exists(CID10_PATH):
+        with open(CID10_PATH, encoding='utf-8') as f:
+            cid10 = json.load(f)
+
+    return CatalogSnapshot(
+        doencas=catalog['doencas'],
+        doencas_version=catalog['version'],
+        last_update=catalog['last_update'],
+        cid10=cid10,
+        indexes=build_indexes(catalog['doencas'], cid10),
+        sources=sources,
+    )
+
+
+def write_snapshot(snapshot: CatalogSnapshot, path: str = SNAPSHOT_PATH):
+    """Serializa o snapshot de forma atômica."""
+    state = {field: getattr(snapshot, field) for field in CatalogSnapshot.FIELDS}
+    payload = SNAPSHOT_MAGIC + bytes([SNAPSHOT_FORMAT]) + pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+    write_bytes_atomic(path, payload)
+
+
+def read_snapshot(path: str = SNAPSHOT_PATH) -> Optional[CatalogSnapshot]:
+    """Carrega o snapshot com uma única leitura; None se ausente ou incompatível."""
+    try:
+        with open(path, 'rb') as f:
+            payload = f.read()
+    except OSError:
+        return None
+    header = SNAPSHOT_MAGIC + bytes([SNAPSHOT_FORMAT])
+    if not payload.startswith(header):
+        return None
+    return CatalogSnapshot(**pickle.loads(payload[len(header):]))
+
+
+def write_shared(snapshot: CatalogSnapshot, path: str = SHARED_PATH):
+    """Grava o catálogo e os índices no formato mapeável (shared_catalog)."""
+    write_shared_catalog(
+        path,
+        tables={'doencas': snapshot.doencas, 'cid10': snapshot.cid10},
+        indexes=snapshot.indexes,
+        meta={'sources': snapshot.sources, 'doencas_version': snapshot.doencas_version,
+              'last_update': snapshot.last_update},
+    )
+
+
+def read_shared(path: str = SHARED_PATH) -> Optional[CatalogSnapshot]:
+    """Snapshot apoiado no arquivo mapeado; None se ausente ou incompatível."""
+    try:
+        shared = SharedCatalog(path)
+    except (OSError, ValueError):
+        return None
+    meta = shared.meta
+    return CatalogSnapshot(
+        doencas=shared.tables['doencas'],
+        doencas_version=meta['doencas_version'],
+        last_update=meta['last_update'],
+        cid10=shared.tables['cid10'],
+        indexes=shared.indexes,
+        sources={name: tuple(stamp) if stamp else None for name, stamp in meta['sources'].items()},
+    )
+
+
+def share(snapshot: CatalogSnapshot) -> CatalogSnapshot:
+    """
+    No modo compartilhado, troca o snapshot em memória pelo mapeado do disco, gravando o
+    arquivo se ele ainda não corresponder às mesmas fontes (o primeiro worker grava, os demais só mapeiam).
+    """
+    if not SHARED_CATALOG:
+        return snapshot
+    shared = read_shared()
+    if shared is None or shared.sources != snapshot.sources:
+        try:
+            write_shared(snapshot)
+        except OSError as e:
+            get_logger('catalog').warning("Não foi possível gravar o catálogo compartilhado (%s); usando cópia em memória", e)
+            return snapshot
+        shared = read_shared()
+    return shared or snapshot
+
+
+def load_snapshot() -> CatalogSnapshot:
+    """Snapshot em dia a partir dos artefatos compilados, reconstruindo se estiverem desatualizados."""
+    if SHARED_CATALOG:
+        shared = read_shared()
+        if shared is not None and shared.is_current():
+            return shared
+        return share(build_snapshot())
+    snapshot = read_snapshot()
+    if snapshot is None or not snapshot.is_current():
+        snapshot = build_snapshot()
+    return snapshot
+
+
+def write_artifacts(snapshot: CatalogSnapshot):
+    """Grava todos os artefatos compilados (etapa do pipeline de atualização/build)."""
+    write_snapshot(snapshot)
+    write_shared(snapshot)
+
+
+_current = None
+_lock = threading.Lock()
+_auto_refresh = True
+
+
+@fork_hooks.register
+def _reset_after_fork():
+    global _lock
+    _lock = threading.Lock()
+
+
+def get_snapshot() -> CatalogSnapshot:
+    """
+    Snapshot corrente do processo. Uma verificação barata (stat) dos JSONs detecta
+    alterações; nesse caso o snapshot é recarregado do arquivo compilado ou reconstruído.
+    Com o recarregamento em segundo plano ativo (hot_reload), a verificação é desligada e
+    o snapshot só muda via install_snapshot.
+    """
+    global _current
+    snapshot = _current
+    if snapshot is not None and (not _auto_refresh or snapshot.is_current()):
+        return snapshot
+
+    with _lock:
+        if _current is not None and _current.is_current():
+            return _current
+        _current = load_snapshot()
+        return _current
+
+
+def install_snapshot(snapshot: CatalogSnapshot):
+    """Troca atomicamente o snapshot do processo; requisições em andamento mantêm o anterior."""
+    global _current
+    with _lock:
+        _current = snapshot
+
+
+def set_auto_refresh(enabled: bool):
+    """Liga/desliga a verificação por stat() no caminho da requisição."""
+    global _auto_refresh
+    _auto_refresh = enabled
+
+
+def main():
+    """Compila o snapshot (etapa do pipeline de atualização/build)."""
+    snapshot = build_snapshot()
+    write_artifacts(snapshot)
+    print(f"Snapshot gravado em {SNAPSHOT_PATH} e {SHARED_PATH}: {len(snapshot.doencas)} doenças, "
+          f"{len(snapshot.cid10)} códigos CID-10 (versão {snapshot.doencas_version})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+"""
+Leitura e escrita segura do cache de doenças (doencas_cache.json).
+A gravação é atômica (arquivo temporário + fsync + os.replace) e o arquivo leva um
+cabeçalho versionado, de modo que leitores concorrentes nunca vejam dados parciais.
+Cada gravação também registra os CIDs alterados no log de sincronização (catalog_changes).
+"""
+import json
+import os
+import stat
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import catalog_changes
+import fork_hooks
+
+try:
+    import fcntl
+except ImportError:  # Windows (setup_daily_update.bat): apenas o lock entre threads
+    fcntl = None
+
+FORMAT_VERSION = 2
+
+_write_lock = threading.Lock()
+
+
+@fork_hooks.register
+def _reset_after_fork():
+    global _write_lock
+    _write_lock = threading.Lock()
+
+_umask: Optional[int] = None
+_umask_lock = threading.Lock()
+
+
+class CatalogFormatError(ValueError):
+    """Arquivo de catálogo inválido ou em formato mais novo que o suportado."""
+
+
+def _fsync_dir(directory: str):
+    """Garante que a renomeação foi persistida no diretório (POSIX)."""
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _process_umask() -> int:
+    """umask do processo, lido na primeira gravação de um arquivo novo e guardado."""
+    global _umask
+    with _umask_lock:
+        if _umask is None:
+            try:
+                # Linux: lido sem alterar o umask
+                with open('/proc/self/status') as f:
+                    _umask = next(int(line.split()[1], 8) for line in f if line.startswith('Umask:'))
+            except (OSError, StopIteration, ValueError, IndexError):
+                # os.umask só permite ler trocando o valor
+                _umask = os.umask(0o022)
+                os.umask(_umask)
+        return _umask
+
+
+def _target_mode(path: str) -> int:
+    """Permissões do arquivo que será substituído ou, se ele não existir, as de um open() comum."""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~_process_umask()
+
+
+def write_bytes_atomic(path: str, data: bytes):
+    """Grava bytes em um temporário no mesmo diretório e o troca atomicamente pelo destino."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix='.tmp', dir=directory)
+    try:
+        # mkstemp cria com 0600 e os.replace preserva o modo do temporário: sem isto o destino
+        # ficaria legível só pelo dono (servidor de estáticos, backup, outro usuário)
+        if hasattr(os, 'fchmod'):
+            os.fchmod(fd, _target_mode(path))
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    _fsync_dir(directory)
+
+
+def write_json_atomic(path: str, data, indent: Optional[int] = None):
+    """Versão JSON de write_bytes_atomic."""
+    write_bytes_atomic(path, json.dumps(data, ensure_ascii=False, indent=indent).encode('utf-8'))
+
+
+@contextmanager
+def _exclusive(path: str):
+    """Serializa escritores da mesma máquina (threads e processos)."""
+    with _write_lock:
+        if fcntl is None:
+            yield
+            return
+        with open(f"{path}.lock", 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def validate_catalog(data) -> Dict:
+    """Valida o cabeçalho; arquivos legados (sem cabeçalho) são tratados como versão 0."""
+    if not isinstance(data, dict) or not isinstance(data.get('doencas'), list):
+        raise CatalogFormatError("Cache de doenças sem a lista 'doencas'")
+    format_version = data.get('format_version', 1)
+    if format_version > FORMAT_VERSION:
+        raise CatalogFormatError(f"Formato de cache {format_version} não suportado (máximo {FORMAT_VERSION})")
+    data.setdefault('version', 0)
+    data.setdefault('last_update', 0)
+    return data
+
+
+def read_catalog(path: str) -> Optional[Dict]:
+    """Lê e valida o catálogo; None se o arquivo não existir."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None
+    return validate_catalog(data)
+
+
+def save_catalog(path: str, doencas: List[Dict], indent: Optional[int] = None) -> Dict:
+    """
+    Grava a lista de doenças com cabeçalho versionado e retorna o cabeçalho gravado.
+    A versão é monotônica: versão anterior em disco + 1. As diferenças por CID em relação à
+    versão anterior vão para o log de alterações.
+    """
+    with _exclusive(path):
+        try:
+            previous = read_catalog(path)
+        except (ValueError, OSError):
+            previous = None
+        header = {
+            'format_version': FORMAT_VERSION,
+            'version': (previous['version'] if previous else 0) + 1,
+            'last_update': int(time.time()),
+            'total': len(doencas),
+        }
+        write_json_atomic(path, dict(header, doencas=doencas), indent=indent)
+    if previous is not None:
+        diff = catalog_changes.diff_doencas(previous['doencas'], doencas)
+        record_change(path, 'catalog', catalog_version=header['version'], **diff)
+    return header
+
+
+def record_change(catalog_path: str, source: str, **change) -> Optional[int]:
+    """Acrescenta uma entrada ao log de alterações do catálogo (ver catalog_changes.append_change)."""
+    log_path = catalog_changes.changelog_path(catalog_path)
+    with _exclusive(log_path):
+        return catalog_changes.append_change(log_path, source, **change)
@@ -1,24 +1,49 @@
 """
 Serviço para categorização e busca aprimorada de códigos CID-10.
 """
-import json
 import os
+import time
 from typing import List, Dict, Optional
 import re
 
+from sqlalchemy.exc import SQLAlchemyError
+
+from catalog_snapshot import build_indexes, get_snapshot
+from custom_cid_store import DuplicateCIDError, custom_cid_store
+from fts_search import BACKENDS, SEARCH_BACKEND, FTSSearchIndex, fts5_available
+from media_logging import get_logger
+from spans import span, timed
+
+# Intervalo mínimo entre verificações da versão dos CIDs personalizados no banco
+CUSTOM_CHECK_INTERVAL = float(os.environ.get('MEDIA_CUSTOM_CID_CHECK_INTERVAL', 1.0))
+logger = get_logger('custom_cids')
+search_logger = get_logger('search')
+
 class CIDCategorizer:
-    def __init__(self):
+    def __init__(self, store=custom_cid_store, search_backend: str = SEARCH_BACKEND):
         self.cid10_data = []
         self.categories = {}
+        self._by_code = {}
+        self._by_letter = {}
+        # CIDs adicionados por médicos ficam à parte do catálogo compartilhado (somente leitura),
+        # persistidos no banco (custom_cid_store) e carregados sob demanda em cada worker
+        self.custom_cids = []
+        self._custom_by_code = {}
+        self._store = store
+        self._custom_version = None
+        self._custom_checked = 0.0
         self.load_cid_data()
         self.setup_categories()
+        self._fts = self._create_search_index(search_backend)
     
     def load_cid_data(self):
-        """Carrega dados do CID-10 do arquivo JSON."""
-        cid10_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'cid10_datasus.json')
-        if os.path.exists(cid10_path):
-            with open(cid10_path, 'r', encoding='utf-8') as f:
-                self.cid10_data = json.load(f)
+        """Carrega dados do CID-10 do snapshot compilado (com índices pré-construídos), sem copiá-los."""
+        snapshot = get_snapshot()
+        if snapshot.cid10:
+            self.cid10_data = snapshot.cid10
+            self._by_code = snapshot.indexes['cid10_by_code']
+            self._by_letter = snapshot.indexes['cid10_by_letter']
+            return
         else:
             # Dados de exemplo se não existir o arquivo
             self.cid10_data = [
@@ -33,6 +58,59 @@ class CIDCategorizer:
                 {"code": "N18", "description": "Doença renal crônica"},
                 {"code": "R50", "description": "Febre não especificada"}
             ]
+            self._rebuild_indexes()
+    
+    def _create_search_index(self, backend: str) -> Optional[FTSSearchIndex]:
+        """Índice FTS5 do catálogo carregado (MEDIA_SEARCH_BACKEND=fts5), ou None para a busca em memória."""
+        if backend not in BACKENDS:
+            search_logger.warning("MEDIA_SEARCH_BACKEND=%s desconhecido, usando busca em memória", backend)
+            return None
+        if backend != 'fts5':
+            return None
+        if not fts5_available():
+            search_logger.warning("SQLite sem FTS5, usando busca em memória")
+            return None
+        return FTSSearchIndex(self.cid10_data)
+    
+    def _sync_search_index(self):
+        """Leva ao índice FTS5 os CIDs personalizados da versão atual."""
+        self._sync_custom()
+        self._fts.sync_custom(self.custom_cids, self._custom_version)
+    
+    def _rebuild_indexes(self):
+        """Reconstrói os índices por código e por letra a partir de cid10_data."""
+        indexes = build_indexes([], self.cid10_data)
+        self._by_code = indexes['cid10_by_code']
+        self._by_letter = indexes['cid10_by_letter']
+    
+    def _iter_cid10(self):
+        """Catálogo seguido dos CIDs personalizados."""
+        self._sync_custom()
+        yield from self.cid10_data
+        yield from self.custom_cids
+    
+    def _sync_custom(self, force: bool = False):
+        """
+        Recarrega os CIDs personalizados quando a versão no banco muda (inclusões feitas por
+        outros workers). A versão é consultada no máximo a cada CUSTOM_CHECK_INTERVAL segundos.
+        """
+        now = time.monotonic()
+        if not force and now - self._custom_checked < CUSTOM_CHECK_INTERVAL:
+            return
+        self._custom_checked = now
+        try:
+            if self._store.version() == self._custom_version:
+                return
+            version, rows = self._store.load()
+        except (SQLAlchemyError, OSError) as e:
+            # OSError: diretório do SQLite não pôde ser criado na primeira conexão
+            logger.warning("Banco de CIDs personalizados indisponível, mantendo lista atual: %s", e)
+            return
+        # Códigos que passaram a existir no catálogo oficial ficam só lá
+        custom = [row for row in rows if self._by_code.get(row['code']) is None]
+        self._custom_by_code = {row['code']: row for row in custom}
+        self.custom_cids = custom
+        self._custom_version = version
     
     def setup_categories(self):
         """Configura as categorias do CID-10."""
@@ -466,9 +544,12 @@ class CIDCategorizer:
     def get_categories(self) -> List[Dict]:
         """Retorna todas as categorias CID-10 com contagem de doenças."""
         result = []
+        self._sync_custom()
         
         for letter, category_info in self.categories.items():
-            count = len([d for d in self.cid10_data if d.get('code', '').startswith(letter)])
+            count = len(self._by_letter.get(letter, ())) + sum(
+                1 for d in self.custom_cids if d['code'].startswith(letter)
+            )
             
             result.append({
                 'letter': letter,
@@ -480,11 +561,20 @@ class CIDCategorizer:
         
         return sorted(result, key=lambda x: x['letter'])
     
+    @timed('cid.diseases_by_category')
     def get_diseases_by_category(self, category_letter: str) -> List[Dict]:
         """Retorna doenças de uma categoria específica."""
         category_letter = category_letter.upper()
-        diseases = [d for d in self.cid10_data if d.get('code', '').startswith(category_letter)]
-        return sorted(diseases, key=lambda x: x.get('code', ''))
+        self._sync_custom()
+        custom = [dict(d) for d in self.custom_cids if d['code'].startswith(category_letter)]
+        if len(category_letter) == 1:
+            # Índice por letra já vem ordenado por código
+            diseases = [dict(self.cid10_data[i]) for i in self._by_letter.get(category_letter, ())]
+            if not custom:
+                return diseases
+        else:
+            diseases = [dict(d) for d in self.cid10_data if d.get('code', '').startswith(category_letter)]
+        return sorted(diseases + custom, key=lambda x: x.get('code', ''))
     
     def search_by_name(self, query: str, limit: int = 20) -> List[Dict]:
         """Busca doenças por nome com algoritmo aprimorado."""
@@ -492,6 +582,10 @@ class CIDCategorizer:
             return []
         
         query = query.strip().lower()
+        if self._fts is not None:
+            self._sync_search_index()
+            with span('cid.search.fts'):
+                return self._fts.search(query, limit)
         results = []
         
         # Função para calcular relevância
@@ -533,35 +627,44 @@ class CIDCategorizer:
             return score
         
         # Buscar e pontuar todas as doenças
-        for disease in self.cid10_data:
-            description = disease.get('description', '')
-            if description:
-                relevance = calculate_relevance(description, query)
-                if relevance > 0:
-                    results.append({
-                        'code': disease.get('code'),
-                        'description': description,
-                        'relevance': relevance
-                    })
+        with span('cid.search.score'):
+            for disease in self._iter_cid10():
+                description = disease.get('description', '')
+                if description:
+                    relevance = calculate_relevance(description, query)
+                    if relevance > 0:
+                        results.append({
+                            'code': disease.get('code'),
+                            'description': description,
+                            'relevance': relevance
+                        })
         
         # Ordenar por relevância e limitar resultados
-        results.sort(key=lambda x: x['relevance'], reverse=True)
+        with span('cid.search.sort'):
+            results.sort(key=lambda x: x['relevance'], reverse=True)
         return results[:limit]
     
     def search_by_code(self, code: str) -> Optional[Dict]:
         """Busca doença por código CID exato."""
         code = code.upper().strip()
-        for disease in self.cid10_data:
-            if disease.get('code', '').upper() == code:
-                return disease
-        return None
+        idx = self._by_code.get(code)
+        # Cópia para que o chamador possa enriquecer o resultado sem alterar o catálogo
+        if idx is not None:
+            return dict(self.cid10_data[idx])
+        self._sync_custom()
+        custom = self._custom_by_code.get(code)
+        return None if custom is None else dict(custom)
     
+    @timed('cid.search_by_code_pattern')
     def search_by_code_pattern(self, pattern: str, limit: int = 20) -> List[Dict]:
         """Busca doenças por padrão de código (ex: 'I10', 'F2', 'A0')."""
         pattern = pattern.upper().strip()
+        if self._fts is not None:
+            self._sync_search_index()
+            return self._fts.search_code_prefix(pattern, limit)
         results = []
         
-        for disease in self.cid10_data:
+        for disease in self._iter_cid10():
             code = disease.get('code', '').upper()
             if code.startswith(pattern):
                 results.append(disease)
@@ -580,23 +683,32 @@ class CIDCategorizer:
         if not re.match(r'^[A-Z]\d{2}(\.\d)?$', code):
             raise ValueError("Formato de código CID inválido. Use formato como 'A00' ou 'A00.1'")
         
-        # Verificar se já existe
-        existing = self.search_by_code(code)
-        if existing:
-            raise ValueError(f"Código CID {code} já existe: {existing.get('description')}")
-        
-        # Adicionar à lista local (em produção, salvaria no banco de dados)
-        new_disease = {
-            'code': code,
-            'description': description,
-            'custom': True,
-            'added_by': 'doctor'
-        }
+        # Verificar se já existe: catálogo oficial pelo índice; personalizados pelo índice único do banco
+        idx = self._by_code.get(code)
+        if idx is not None:
+            raise ValueError(f"Código CID {code} já existe: {self.cid10_data[idx].get('description')}")
+        try:
+            version, new_disease = self._store.add(code, description, added_by='doctor')
+        except DuplicateCIDError as e:
+            raise ValueError(str(e)) from None
         
-        self.cid10_data.append(new_disease)
+        # Write-through: disponível já nesta instância; os demais workers recarregam pela versão
+        if self._custom_version is not None and version == self._custom_version + 1:
+            self.custom_cids.append(new_disease)
+            self._custom_by_code[code] = new_disease
+            self._custom_version = version
+        else:
+            self._sync_custom(force=True)
         
         return new_disease
-    
+
+    def adopt_state(self, previous: 'CIDCategorizer'):
+        """
+        Recarga a quente: os CIDs personalizados estão no banco, então basta usar o mesmo store.
+        A nova instância os carrega no primeiro uso, sem os que passaram a existir no catálogo.
+        """
+        self._store = previous._store
+
     def get_subcategory_info(self, code: str) -> Optional[Dict]:
         """Retorna informações da subcategoria de um código CID."""
         if not code:
@@ -0,0 +1,108 @@
+"""
+Pipeline da análise abrangente (/api/v2/comprehensive_analysis).
+
+Cada etapa roda uma única vez e guarda o resultado no AnalysisContext da requisição:
+- diagnóstico: analyze_symptoms_report, e o laudo reaproveita esses resultados;
+- interações: get_interaction_summary (um único check_interactions), e o relatório
+  detalhado é montado a partir desse mesmo resumo.
+
+As duas etapas não dependem uma da outra. Quando ambas são pedidas, a de interações roda em
+um pool de threads enquanto a thread da requisição faz o diagnóstico. A tarefa recebe uma
+cópia do contexto (contextvars), então os spans dela entram na mesma requisição.
+MEDIA_ANALYSIS_THREADS=0 executa tudo na thread da requisição.
+"""
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import fork_hooks
+
+ANALYSIS_THREADS = int(os.environ.get('MEDIA_ANALYSIS_THREADS', '2') or 0)
+MIN_REPORT_LENGTH = 10
+MIN_MEDICATIONS = 2
+
+
+@dataclass
+class AnalysisContext:
+    """Entrada da análise e resultados de cada etapa, calculados uma vez por requisição."""
+    symptoms_report: str
+    medications: List[str]
+    include_reports: bool = False
+    diagnostic_results: Optional[list] = None
+    medical_report: Optional[str] = None
+    interaction_summary: Optional[Dict] = None
+    interaction_report: Optional[str] = None
+    recommendations: List[str] = field(default_factory=list)
+
+    @property
+    def wants_diagnosis(self) -> bool:
+        return len(self.symptoms_report) >= MIN_REPORT_LENGTH
+
+    @property
+    def wants_interactions(self) -> bool:
+        return len(self.medications) >= MIN_MEDICATIONS
+
+
+def run_diagnosis(ctx: AnalysisContext, diagnostic_engine):
+    ctx.diagnostic_results = diagnostic_engine.analyze_symptoms_report(ctx.symptoms_report)
+    if ctx.include_reports and ctx.diagnostic_results:
+        ctx.medical_report = diagnostic_engine.generate_medical_report(ctx.diagnostic_results, ctx.symptoms_report)
+
+
+def run_interactions(ctx: AnalysisContext, drug_checker):
+    ctx.interaction_summary = drug_checker.get_interaction_summary(ctx.medications)
+    if ctx.include_reports:
+        ctx.interaction_report = drug_checker.generate_interaction_report(ctx.medications, ctx.interaction_summary)
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(ANALYSIS_THREADS, thread_name_prefix='media-analysis')
+    return _executor
+
+
+@fork_hooks.register
+def reset_after_fork():
+    """As threads do pool não sobrevivem ao fork; o filho cria um pool novo no primeiro uso."""
+    global _executor, _executor_lock
+    _executor = None
+    _executor_lock = threading.Lock()
+
+
+def analyze(ctx: AnalysisContext, diagnostic_engine, drug_checker) -> AnalysisContext:
+    """Executa as etapas pedidas, em paralelo quando há as duas, e monta as recomendações."""
+    if ctx.wants_diagnosis and ctx.wants_interactions and ANALYSIS_THREADS > 0:
+        context = contextvars.copy_context()
+        future = _get_executor().submit(context.run, run_interactions, ctx, drug_checker)
+        try:
+            run_diagnosis(ctx, diagnostic_engine)
+        finally:
+            future.result()
+    else:
+        if ctx.wants_diagnosis:
+            run_diagnosis(ctx, diagnostic_engine)
+        if ctx.wants_interactions:
+            run_interactions(ctx, drug_checker)
+
+    if ctx.diagnostic_results:
+        top = ctx.diagnostic_results[0]
+        if round(top.probability * 100, 1) > 50:
+            ctx.recommendations.append(f"Diagnóstico provável: {top.disease_name} (CID: {top.cid_code})")
+    if ctx.interaction_summary and ctx.interaction_summary['requires_immediate_attention']:
+        ctx.recommendations.append("⚠️ ATENÇÃO: Interações medicamentosas graves detectadas")
+    ctx.recommendations.extend([
+        "Consulte um médico para avaliação completa",
+        "Mantenha lista atualizada de medicamentos",
+        "Monitore sintomas e efeitos adversos"
+    ])
+    return ctx
@@ -0,0 +1,124 @@
+"""
+Middleware WSGI de compressão para as respostas JSON da API.
+
+Negocia brotli/gzip pelo Accept-Encoding e comprime respostas da API acima de um tamanho mínimo.
+Os níveis são escolhidos para latência, não para a menor saída: gzip 5 e brotli 4 ficam perto
+da taxa máxima de compressão de JSON com uma fração do custo de CPU. Não altera:
+- respostas já codificadas (cache de catálogo e arquivos estáticos, que têm variantes prontas);
+- respostas sem Content-Length (streams, como ?format=ndjson), para não segurar o envio;
+- HEAD, 204/304 e tipos não textuais.
+
+Variáveis: MEDIA_COMPRESS_MIN_SIZE (bytes, padrão 1024), MEDIA_GZIP_LEVEL, MEDIA_BROTLI_QUALITY.
+"""
+import gzip
+import os
+from typing import Iterable, List, Optional, Tuple
+
+from werkzeug.http import parse_accept_header
+
+from response_cache import brotli
+
+MIN_SIZE = int(os.environ.get('MEDIA_COMPRESS_MIN_SIZE', 1024))
+GZIP_LEVEL = int(os.environ.get('MEDIA_GZIP_LEVEL', 5))
+BROTLI_QUALITY = int(os.environ.get('MEDIA_BROTLI_QUALITY', 4))
+
+_COMPRESSIBLE_TYPES = ('application/json', 'text/', 'application/javascript', 'application/x-ndjson')
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Melhor codificação aceita pelo cliente, preferindo brotli quando disponível."""
+    if not accept_encoding:
+        return None
+    accepted = parse_accept_header(accept_encoding)
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress(body: bytes, encoding: str, gzip_level: int = GZIP_LEVEL, brotli_quality: int = BROTLI_QUALITY) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+
+
+class CompressionMiddleware:
+    """Envolve app.wsgi_app e comprime as respostas elegíveis sob os prefixos informados."""
+
+    def __init__(self, wsgi_app, prefixes: Tuple[str, ...] = ('/api/',), min_size: int = MIN_SIZE,
+                 gzip_level: int = GZIP_LEVEL, brotli_quality: int = BROTLI_QUALITY):
+        self.wsgi_app = wsgi_app
+        self.prefixes = prefixes
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def __call__(self, environ, start_response):
+        encoding = choose_encoding(environ.get('HTTP_ACCEPT_ENCODING', ''))
+        if (encoding is None or environ.get('REQUEST_METHOD') == 'HEAD'
+                or not environ.get('PATH_INFO', '').startswith(self.prefixes)):
+            return self.wsgi_app(environ, start_response)
+
+        captured = {}
+
+        def capture(status, headers, exc_info=None):
+            if exc_info is not None and captured.get('sent'):
+                raise exc_info[1].with_traceback(exc_info[2])
+            captured['status'], captured['headers'] = status, headers
+            return lambda data: captured.setdefault('written', []).append(data)
+
+        app_iter = self.wsgi_app(environ, capture)
+        status, headers = captured['status'], captured['headers']
+        if not self._eligible(status, headers):
+            captured['sent'] = True
+            write = start_response(status, headers)
+            for data in captured.get('written', ()):
+                write(data)
+            return app_iter
+
+        try:
+            body = b''.join(captured.get('written', [])) + b''.join(app_iter)
+        finally:
+            if hasattr(app_iter, 'close'):
+                app_iter.close()
+
+        if len(body) < self.min_size:
+            start_response(status, headers)
+            return [body]
+
+        compressed = compress(body, encoding, self.gzip_level, self.brotli_quality)
+        start_response(status, self._compressed_headers(headers, encoding, len(compressed)))
+        return [compressed]
+
+    def _eligible(self, status: str, headers: List[Tuple[str, str]]) -> bool:
+        if status[:3] in ('204', '304') or status[0] == '1':
+            return False
+        names = {name.lower(): value for name, value in headers}
+        if 'content-encoding' in names or 'content-length' not in names:
+            return False
+        if int(names['content-length']) < self.min_size:
+            return False
+        return names.get('content-type', '').startswith(_COMPRESSIBLE_TYPES)
+
+    @staticmethod
+    def _compressed_headers(headers: Iterable[Tuple[str, str]], encoding: str, length: int) -> List[Tuple[str, str]]:
+        result = []
+        vary = None
+        for name, value in headers:
+            lower = name.lower()
+            if lower == 'content-length':
+                continue
+            if lower == 'vary':
+                vary = value
+                continue
+            if lower == 'etag' and not value.startswith('W/'):
+                # A representação comprimida não é idêntica byte a byte: ETag fraco
+                value = f'W/{value}'
+            result.append((name, value))
+        if vary is None:
+            vary = 'Accept-Encoding'
+        elif 'accept-encoding' not in vary.lower():
+            vary = f'{vary}, Accept-Encoding'
+        result.extend([('Vary', vary), ('Content-Encoding', encoding), ('Content-Length', str(length))])
+        return result
@@ -0,0 +1,148 @@
+"""
+Armazenamento persistente dos CIDs personalizados (add_custom_cid), compartilhado entre workers.
+
+Os CIDs ficam no mesmo banco do main_enhanced.py: DATABASE_URL em produção ou, localmente,
+SQLite em instance/app.db (o caminho que o Flask-SQLAlchemy usa para 'sqlite:///app.db'),
+com WAL para que leitores não bloqueiem o escritor. O acesso é feito pelo SQLAlchemy Core,
+sem depender de um app Flask, porque os serviços são construídos fora do contexto da aplicação.
+
+- custom_cids: um registro por código, com índice único em `code`. Códigos duplicados são
+  recusados pelo banco (DuplicateCIDError), mesmo com dois workers inserindo ao mesmo tempo.
+- catalog_versions: contador incrementado na mesma transação de cada inserção. Os workers
+  comparam esse número (uma leitura por chave primária) com a versão que têm em memória e só
+  recarregam a lista quando ele muda.
+"""
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import (Column, Integer, MetaData, String, Table, Text, create_engine, event, insert, select,
+                        update)
+from sqlalchemy.exc import IntegrityError
+
+import fork_hooks
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATABASE_URL = os.environ.get('DATABASE_URL') or f"sqlite:///{os.path.join(BASE_DIR, 'instance', 'app.db')}"
+VERSION_KEY = 'custom_cids'
+
+metadata = MetaData()
+
+custom_cids = Table(
+    'custom_cids', metadata,
+    Column('id', Integer, primary_key=True, autoincrement=True),
+    Column('code', String(16), nullable=False, unique=True, index=True),
+    Column('description', Text, nullable=False),
+    Column('added_by', String(32), nullable=False),
+    Column('created_at', Integer, nullable=False),
+)
+
+catalog_versions = Table(
+    'catalog_versions', metadata,
+    Column('name', String(64), primary_key=True),
+    Column('version', Integer, nullable=False),
+)
+
+
+class DuplicateCIDError(ValueError):
+    """O código já existe no banco; `existing` traz o registro gravado."""
+
+    def __init__(self, code: str, existing: Optional[Dict]):
+        description = existing['description'] if existing else ''
+        super().__init__(f"Código CID {code} já existe: {description}")
+        self.existing = existing
+
+
+def _as_dict(row) -> Dict:
+    return {'code': row.code, 'description': row.description, 'custom': True, 'added_by': row.added_by}
+
+
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute('PRAGMA busy_timeout=5000')
+    cursor.close()
+
+
+class CustomCIDStore:
+    """Tabelas de CIDs personalizados; o engine é criado no primeiro uso."""
+
+    def __init__(self, url: str = DATABASE_URL):
+        self.url = url
+        self._engine = None
+        self._lock = threading.Lock()
+
+    @property
+    def engine(self):
+        engine = self._engine
+        if engine is None:
+            with self._lock:
+                if self._engine is None:
+                    self._engine = self._create_engine()
+                engine = self._engine
+        return engine
+
+    def _create_engine(self):
+        if self.url.startswith('sqlite:///'):
+            directory = os.path.dirname(self.url[len('sqlite:///'):])
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        engine = create_engine(self.url, pool_pre_ping=not self.url.startswith('sqlite'))
+        if engine.dialect.name == 'sqlite':
+            event.listen(engine, 'connect', _sqlite_pragmas)
+        metadata.create_all(engine)
+        try:
+            with engine.begin() as conn:
+                conn.execute(insert(catalog_versions).values(name=VERSION_KEY, version=0))
+        except IntegrityError:
+            pass  # já criado por outro worker
+        return engine
+
+    def version(self) -> int:
+        """Versão atual dos CIDs personalizados (uma leitura por chave primária)."""
+        with self.engine.connect() as conn:
+            return conn.execute(
+                select(catalog_versions.c.version).where(catalog_versions.c.name == VERSION_KEY)
+            ).scalar() or 0
+
+    def load(self) -> Tuple[int, List[Dict]]:
+        """(versão, registros em ordem de inclusão), lidos na mesma transação."""
+        with self.engine.connect() as conn:
+            version = conn.execute(
+                select(catalog_versions.c.version).where(catalog_versions.c.name == VERSION_KEY)
+            ).scalar() or 0
+            rows = conn.execute(select(custom_cids).order_by(custom_cids.c.id)).all()
+        return version, [_as_dict(row) for row in rows]
+
+    def get(self, code: str) -> Optional[Dict]:
+        with self.engine.connect() as conn:
+            row = conn.execute(select(custom_cids).where(custom_cids.c.code == code)).first()
+        return None if row is None else _as_dict(row)
+
+    def add(self, code: str, description: str, added_by: str) -> Tuple[int, Dict]:
+        """Grava o CID e incrementa a versão na mesma transação; retorna (nova versão, registro)."""
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(insert(custom_cids).values(
+                    code=code, description=description, added_by=added_by, created_at=int(time.time())))
+                conn.execute(update(catalog_versions).where(catalog_versions.c.name == VERSION_KEY)
+                             .values(version=catalog_versions.c.version + 1))
+                version = conn.execute(
+                    select(catalog_versions.c.version).where(catalog_versions.c.name == VERSION_KEY)
+                ).scalar()
+        except IntegrityError:
+            raise DuplicateCIDError(code, self.get(code)) from None
+        return version, {'code': code, 'description': description, 'custom': True, 'added_by': added_by}
+
+    def reset_after_fork(self):
+        """O filho não pode reusar as conexões do mestre; descarta o pool sem fechá-las."""
+        self._lock = threading.Lock()
+        if self._engine is not None:
+            self._engine.dispose(close=False)
+
+
+# Instância usada pelo CIDCategorizer
+custom_cid_store = CustomCIDStore()
+fork_hooks.register(custom_cid_store.reset_after_fork)
@@ -8,6 +8,10 @@ from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass
 import os
 
+from catalog_snapshot import get_snapshot
+from knowledge_base import get_table
+from spans import span, timed
+
 @dataclass
 class Symptom:
     name: str
@@ -31,255 +35,16 @@ class DiagnosticEngine:
         self.cid10_data = self._load_cid_data()
     
     def _load_cid_data(self):
-        """Carrega dados do CID-10."""
-        cid10_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'cid10_datasus.json')
-        if os.path.exists(cid10_path):
-            with open(cid10_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return []
+        """Carrega dados do CID-10 (lista compartilhada do snapshot; somente leitura)."""
+        return get_snapshot().cid10
     
     def _load_symptom_database(self) -> Dict:
-        """Carrega base de dados de sintomas por doença."""
-        return {
-            # Doenças Cardiovasculares
-            'I10': {  # Hipertensão essencial
-                'name': 'Hipertensão essencial',
-                'primary_symptoms': [
-                    'dor de cabeça', 'cefaleia', 'dor na nuca',
-                    'tontura', 'vertigem', 'tonteira',
-                    'visão turva', 'visão embaçada',
-                    'palpitações', 'batimento cardíaco acelerado',
-                    'fadiga', 'cansaço', 'fraqueza'
-                ],
-                'secondary_symptoms': [
-                    'zumbido no ouvido', 'sangramento nasal',
-                    'falta de ar', 'dispneia',
-                    'dor no peito', 'pressão no peito'
-                ],
-                'risk_factors': ['obesidade', 'sedentarismo', 'estresse', 'idade avançada'],
-                'severity_indicators': ['pressão sistólica > 180', 'pressão diastólica > 110']
-            },
-            
-            'I21': {  # Infarto agudo do miocárdio
-                'name': 'Infarto agudo do miocárdio',
-                'primary_symptoms': [
-                    'dor no peito', 'dor torácica', 'aperto no peito',
-                    'dor irradiando para braço esquerdo',
-                    'dor irradiando para mandíbula',
-                    'falta de ar', 'dispneia',
-                    'sudorese', 'suor frio',
-                    'náusea', 'vômito'
-                ],
-                'secondary_symptoms': [
-                    'palidez', 'ansiedade', 'sensação de morte iminente',
-                    'palpitações', 'fadiga extrema'
-                ],
-                'emergency_indicators': ['dor torácica intensa', 'sudorese profusa', 'dispneia grave']
-            },
-            
-            # Doenças Endócrinas
-            'E11': {  # Diabetes mellitus tipo 2
-                'name': 'Diabetes mellitus não-insulino-dependente',
-                'primary_symptoms': [
-                    'sede excessiva', 'polidipsia',
-                    'micção frequente', 'poliúria',
-                    'fome excessiva', 'polifagia',
-                    'perda de peso', 'emagrecimento',
-                    'fadiga', 'cansaço',
-                    'visão turva', 'visão embaçada'
-                ],
-                'secondary_symptoms': [
-                    'cicatrização lenta', 'infecções recorrentes',
-                    'formigamento nas mãos', 'formigamento nos pés',
-                    'pele seca', 'coceira na pele'
-                ],
-                'risk_factors': ['obesidade', 'sedentarismo', 'histórico familiar'],
-                'complications': ['neuropatia', 'retinopatia', 'nefropatia']
-            },
-            
-            # Doenças Respiratórias
-            'J18': {  # Pneumonia
-                'name': 'Pneumonia por organismo não especificado',
-                'primary_symptoms': [
-                    'febre', 'febre alta', 'hipertermia',
-                    'tosse', 'tosse com catarro', 'tosse produtiva',
-                    'dificuldade para respirar', 'dispneia', 'falta de ar',
-                    'dor no peito', 'dor torácica',
-                    'calafrios', 'tremores'
-                ],
-                'secondary_symptoms': [
-                    'fadiga', 'mal-estar geral',
-                    'dor de cabeça', 'cefaleia',
-                    'perda de apetite', 'náusea',
-                    'sudorese', 'suor noturno'
-                ],
-                'severity_indicators': ['febre > 39°C', 'dispneia grave', 'cianose']
-            },
-            
-            'J45': {  # Asma
-                'name': 'Asma',
-                'primary_symptoms': [
-                    'falta de ar', 'dispneia', 'dificuldade para respirar',
-                    'chiado no peito', 'sibilos', 'ruído respiratório',
-                    'tosse', 'tosse seca', 'tosse noturna',
-                    'aperto no peito', 'opressão torácica'
-                ],
-                'secondary_symptoms': [
-                    'ansiedade', 'fadiga',
-                    'dificuldade para dormir',
-                    'irritabilidade'
-                ],
-                'triggers': ['alérgenos', 'exercício', 'estresse', 'infecções respiratórias']
-            },
-            
-            # Doenças Digestivas
-            'K29': {  # Gastrite
-                'name': 'Gastrite e duodenite',
-                'primary_symptoms': [
-                    'dor no estômago', 'dor epigástrica', 'dor abdominal superior',
-                    'queimação no estômago', 'azia', 'pirose',
-                    'náusea', 'enjoo',
-                    'vômito', 'vômitos',
-                    'sensação de estômago cheio', 'plenitude gástrica'
-                ],
-                'secondary_symptoms': [
-                    'perda de apetite', 'inapetência',
-                    'eructações', 'arrotos',
-                    'flatulência', 'gases',
-                    'mal-estar geral'
-                ],
-                'aggravating_factors': ['alimentos condimentados', 'álcool', 'estresse', 'medicamentos']
-            },
-            
-            # Doenças Mentais
-            'F32': {  # Episódios depressivos
-                'name': 'Episódios depressivos',
-                'primary_symptoms': [
-                    'tristeza persistente', 'humor deprimido',
-                    'perda de interesse', 'anedonia',
-                    'fadiga', 'falta de energia',
-                    'alterações do sono', 'insônia', 'hipersonia',
-                    'alterações do apetite', 'perda de apetite', 'aumento do apetite'
-                ],
-                'secondary_symptoms': [
-                    'dificuldade de concentração', 'problemas de memória',
-                    'sentimentos de culpa', 'baixa autoestima',
-                    'pensamentos de morte', 'ideação suicida',
-                    'irritabilidade', 'ansiedade'
-                ],
-                'severity_indicators': ['ideação suicida', 'sintomas psicóticos', 'incapacidade funcional']
-            },
-            
-            'F41': {  # Transtornos de ansiedade
-                'name': 'Outros transtornos ansiosos',
-                'primary_symptoms': [
-                    'preocupação excessiva', 'ansiedade',
-                    'inquietação', 'agitação',
-                    'tensão muscular', 'rigidez muscular',
-                    'fadiga', 'cansaço',
-                    'dificuldade de concentração'
-                ],
-                'secondary_symptoms': [
-                    'palpitações', 'taquicardia',
-                    'sudorese', 'tremores',
-                    'falta de ar', 'sensação de sufocamento',
-                    'tontura', 'náusea',
-                    'alterações do sono'
-                ],
-                'panic_symptoms': ['medo de morrer', 'medo de enlouquecer', 'despersonalização']
-            },
-            
-            # Doenças Neurológicas
-            'G40': {  # Epilepsia
-                'name': 'Epilepsia',
-                'primary_symptoms': [
-                    'convulsões', 'crises convulsivas',
-                    'perda de consciência', 'desmaio',
-                    'movimentos involuntários', 'espasmos',
-                    'rigidez muscular', 'contrações musculares'
-                ],
-                'secondary_symptoms': [
-                    'confusão mental pós-ictal',
-                    'dor de cabeça', 'cefaleia',
-                    'fadiga', 'sonolência',
-                    'perda de memória temporária'
-                ],
-                'aura_symptoms': ['sensações estranhas', 'alterações visuais', 'odores estranhos']
-            },
-            
-            # Doenças Urinárias
-            'N30': {  # Cistite
-                'name': 'Cistite',
-                'primary_symptoms': [
-                    'dor ao urinar', 'disúria', 'ardor ao urinar',
-                    'urgência urinária', 'vontade frequente de urinar',
-                    'dor na bexiga', 'dor suprapúbica',
-                    'urina turva', 'urina com odor forte'
-                ],
-                'secondary_symptoms': [
-                    'sangue na urina', 'hematúria',
-                    'febre baixa', 'mal-estar',
-                    'dor nas costas', 'dor lombar'
-                ],
-                'complications': ['pielonefrite', 'sepse urinária']
-            },
-            
-            # Doenças Infecciosas
-            'A90': {  # Dengue
-                'name': 'Dengue clássico',
-                'primary_symptoms': [
-                    'febre alta', 'febre súbita',
-                    'dor de cabeça intensa', 'cefaleia frontal',
-                    'dor atrás dos olhos', 'dor retroorbital',
-                    'dores musculares', 'mialgia',
-                    'dores nas articulações', 'artralgia'
-                ],
-                'secondary_symptoms': [
-                    'náusea', 'vômito',
-                    'manchas vermelhas na pele', 'exantema',
-                    'fadiga', 'mal-estar geral',
-                    'perda de apetite'
-                ],
-                'warning_signs': ['dor abdominal intensa', 'vômitos persistentes', 'sangramento']
-            }
-        }
+        """Carrega base de dados de sintomas por doença (data/knowledge/symptom_database.json)."""
+        return get_table('symptom_database')
     
     def _load_disease_patterns(self) -> Dict:
-        """Carrega padrões de reconhecimento de doenças em texto."""
-        return {
-            'cardiovascular': {
-                'keywords': ['coração', 'cardíaco', 'pressão', 'hipertensão', 'infarto', 'angina'],
-                'symptoms': ['dor no peito', 'palpitações', 'falta de ar', 'tontura']
-            },
-            'respiratory': {
-                'keywords': ['pulmão', 'respiratório', 'tosse', 'pneumonia', 'asma', 'bronquite'],
-                'symptoms': ['tosse', 'falta de ar', 'chiado', 'febre', 'catarro']
-            },
-            'digestive': {
-                'keywords': ['estômago', 'intestino', 'digestivo', 'gastrite', 'úlcera'],
-                'symptoms': ['dor abdominal', 'náusea', 'vômito', 'azia', 'diarreia']
-            },
-            'neurological': {
-                'keywords': ['neurológico', 'cérebro', 'epilepsia', 'convulsão', 'enxaqueca'],
-                'symptoms': ['dor de cabeça', 'convulsões', 'tontura', 'confusão']
-            },
-            'mental': {
-                'keywords': ['depressão', 'ansiedade', 'psiquiátrico', 'mental', 'humor'],
-                'symptoms': ['tristeza', 'ansiedade', 'insônia', 'fadiga', 'irritabilidade']
-            },
-            'endocrine': {
-                'keywords': ['diabetes', 'tireóide', 'hormonal', 'endócrino'],
-                'symptoms': ['sede', 'micção frequente', 'perda de peso', 'fadiga']
-            },
-            'urinary': {
-                'keywords': ['urinário', 'bexiga', 'rim', 'cistite', 'infecção urinária'],
-                'symptoms': ['dor ao urinar', 'urgência urinária', 'sangue na urina']
-            },
-            'infectious': {
-                'keywords': ['infecção', 'vírus', 'bactéria', 'febre', 'gripe', 'dengue'],
-                'symptoms': ['febre', 'mal-estar', 'dor de cabeça', 'fadiga']
-            }
-        }
+        """Carrega padrões de reconhecimento de doenças em texto (data/knowledge/disease_patterns.json)."""
+        return get_table('disease_patterns')
     
     def analyze_symptoms_report(self, report: str) -> List[DiagnosticResult]:
         """Analisa relatório de sintomas e retorna diagnósticos prováveis."""
@@ -295,36 +60,39 @@ class DiagnosticEngine:
         # Calcular probabilidades para cada doença
         diagnostic_results = []
         
-        for cid_code, disease_info in self.symptom_database.items():
-            probability, matching_symptoms = self._calculate_disease_probability(
-                extracted_symptoms, disease_info
-            )
-            
-            if probability > 0.1:  # Threshold mínimo de 10%
-                confidence = self._determine_confidence_level(probability, len(matching_symptoms))
-                
-                result = DiagnosticResult(
-                    cid_code=cid_code,
-                    disease_name=disease_info['name'],
-                    probability=probability,
-                    matching_symptoms=matching_symptoms,
-                    confidence_level=confidence,
-                    additional_info={
-                        'total_symptoms_found': len(extracted_symptoms),
-                        'matching_symptoms_count': len(matching_symptoms),
-                        'primary_symptoms_matched': len([s for s in matching_symptoms 
-                                                       if s in disease_info.get('primary_symptoms', [])]),
-                        'recommendations': self._generate_recommendations(cid_code, probability)
-                    }
+        with span('diagnostic.probability'):
+            for cid_code, disease_info in self.symptom_database.items():
+                probability, matching_symptoms = self._calculate_disease_probability(
+                    extracted_symptoms, disease_info
                 )
                 
-                diagnostic_results.append(result)
+                if probability > 0.1:  # Threshold mínimo de 10%
+                    confidence = self._determine_confidence_level(probability, len(matching_symptoms))
+                    
+                    result = DiagnosticResult(
+                        cid_code=cid_code,
+                        disease_name=disease_info['name'],
+                        probability=probability,
+                        matching_symptoms=matching_symptoms,
+                        confidence_level=confidence,
+                        additional_info={
+                            'total_symptoms_found': len(extracted_symptoms),
+                            'matching_symptoms_count': len(matching_symptoms),
+                            'primary_symptoms_matched': len([s for s in matching_symptoms 
+                                                           if s in disease_info.get('primary_symptoms', [])]),
+                            'recommendations': self._generate_recommendations(cid_code, probability)
+                        }
+                    )
+                    
+                    diagnostic_results.append(result)
         
         # Ordenar por probabilidade
-        diagnostic_results.sort(key=lambda x: x.probability, reverse=True)
+        with span('diagnostic.sort'):
+            diagnostic_results.sort(key=lambda x: x.probability, reverse=True)
         
         return diagnostic_results[:5]  # Retornar top 5 diagnósticos
     
+    @timed('diagnostic.extract_symptoms')
     def _extract_symptoms(self, text: str) -> List[str]:
         """Extrai sintomas do texto usando padrões e palavras-chave."""
         symptoms_found = []
@@ -516,6 +284,7 @@ class DiagnosticEngine:
         
         return recommendations
     
+    @timed('diagnostic.report')
     def generate_medical_report(self, diagnostic_results: List[DiagnosticResult], 
                               original_symptoms: str) -> str:
         """Gera relatório médico baseado nos resultados do diagnóstico."""
@@ -550,6 +319,7 @@ class DiagnosticEngine:
         
         return report
     
+    @timed('diagnostic.advanced_analysis')
     def analyze_medical_report_advanced(self, report: str) -> Dict:
         """Análise avançada de laudo médico com extração de informações estruturadas."""
         analysis = {
@@ -4,115 +4,15 @@ Serviço para fornecer detalhes completos das doenças incluindo gravidade, trat
 import json
 import os
 
+from knowledge_base import get_table
+
 class DiseaseDetailsService:
     def __init__(self):
         self.disease_details = self._load_disease_details()
     
     def _load_disease_details(self):
-        """Carrega base de dados com detalhes das doenças"""
-        return {
-            # Diabetes
-            "E10": {
-                "name": "Diabetes mellitus insulino-dependente",
-                "severity": "Grave",
-                "has_treatment": True,
-                "treatment_type": "Medicamentoso",
-                "medications": ["Insulina", "Metformina"],
-                "non_medication_treatment": ["Dieta controlada", "Exercícios físicos", "Monitoramento glicêmico"],
-                "symptoms": ["polidipsia", "poliúria", "perda de peso", "fadiga"],
-                "complications": ["Cetoacidose diabética", "Neuropatia", "Retinopatia", "Nefropatia"],
-                "prognosis": "Controlável com tratamento adequado"
-            },
-            "E11": {
-                "name": "Diabetes mellitus não-insulino-dependente",
-                "severity": "Moderada a Grave",
-                "has_treatment": True,
-                "treatment_type": "Medicamentoso e não medicamentoso",
-                "medications": ["Metformina", "Glibenclamida", "Insulina (casos avançados)"],
-                "non_medication_treatment": ["Dieta", "Exercícios", "Controle de peso"],
-                "symptoms": ["sede excessiva", "micção frequente", "fadiga", "visão turva"],
-                "complications": ["Complicações cardiovasculares", "Neuropatia", "Problemas renais"],
-                "prognosis": "Bom com controle adequado"
-            },
-            
-            # Hipertensão
-            "I10": {
-                "name": "Hipertensão essencial",
-                "severity": "Moderada a Grave",
-                "has_treatment": True,
-                "treatment_type": "Medicamentoso e não medicamentoso",
-                "medications": ["Enalapril", "Losartana", "Hidroclorotiazida", "Amlodipina"],
-                "non_medication_treatment": ["Dieta hipossódica", "Exercícios", "Redução do estresse"],
-                "symptoms": ["dor de cabeça", "tontura", "palpitações"],
-                "complications": ["AVC", "Infarto", "Insuficiência renal", "Problemas cardíacos"],
-                "prognosis": "Controlável com tratamento contínuo"
-            },
-            
-            # Infecções urinárias
-            "N30": {
-                "name": "Cistite",
-                "severity": "Leve a Moderada",
-                "has_treatment": True,
-                "treatment_type": "Medicamentoso",
-                "medications": ["Nitrofurantoína", "Sulfametoxazol + Trimetoprima", "Ciprofloxacino"],
-                "non_medication_treatment": ["Hidratação abundante", "Higiene adequada"],
-                "symptoms": ["disúria", "urgência urinária", "polaciúria", "dor suprapúbica"],
-                "complications": ["Pielonefrite", "Infecção recorrente"],
-                "prognosis": "Excelente com tratamento adequado"
-            },
-            
-            # Pneumonia
-            "J18": {
-                "name": "Pneumonia não especificada",
-                "severity": "Moderada a Grave",
-                "has_treatment": True,
-                "treatment_type": "Medicamentoso",
-                "medications": ["Amoxicilina", "Azitromicina", "Ceftriaxona"],
-                "non_medication_treatment": ["Repouso", "Hidratação", "Fisioterapia respiratória"],
-                "symptoms": ["tosse", "febre", "dispneia", "dor torácica"],
-                "complications": ["Insuficiência respiratória", "Sepse", "Derrame pleural"],
-                "prognosis": "Bom com tratamento precoce"
-            },
-            
-            # Depressão
-            "F32": {
-                "name": "Episódios depressivos",
-                "severity": "Leve a Grave",
-                "has_treatment": True,
-                "treatment_type": "Medicamentoso e não medicamentoso",
-                "medications": ["Fluoxetina", "Sertralina", "Escitalopram", "Amitriptilina"],
-                "non_medication_treatment": ["Psicoterapia", "Terapia cognitivo-comportamental", "Exercícios"],
-                "symptoms": ["tristeza", "anedonia", "fadiga", "alterações do sono"],
-                "complications": ["Ideação suicida", "Isolamento social", "Prejuízo funcional"],
-                "prognosis": "Bom com tratamento adequado"
-            },
-            
-            # Gastrite
-            "K29": {
-                "name": "Gastrite e duodenite",
-                "severity": "Leve a Moderada",
-                "has_treatment": True,
-                "treatment_type": "Medicamentoso e não medicamentoso",
-                "medications": ["Omeprazol", "Ranitidina", "Sucralfato"],
-                "non_medication_treatment": ["Dieta adequada", "Evitar irritantes", "Controle do estresse"],
-                "symptoms": ["dor epigástrica", "náuseas", "vômitos", "queimação"],
-                "complications": ["Úlcera péptica", "Sangramento", "Perfuração"],
-                "prognosis": "Excelente com mudanças no estilo de vida"
-            },
-            
-            # Asma
-            "J45": {
-                "name": "Asma",
-                "severity": "Leve a Grave",
-                "has_treatment": True,
-                "treatment_type": "Medicamentoso",
-                "medications": ["Salbutamol", "Budesonida", "Formoterol", "Prednisolona"],
-                "non_medication_treatment": ["Evitar alérgenos", "Exercícios respiratórios"],
-                "symptoms": ["dispneia", "sibilos", "tosse", "opressão torácica"],
-                "complications": ["Status asmático", "Insuficiência respiratória"],
-                "prognosis": "Controlável com tratamento adequado"
-            }
-        }
+        """Carrega base de dados com detalhes das doenças (data/knowledge/disease_details.json)"""
+        return get_table('disease_details')
     
     def get_disease_details(self, cid_code):
         """Retorna detalhes completos de uma doença pelo código CID"""
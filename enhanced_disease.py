@@ -4,20 +4,17 @@ Rotas aprimoradas da API com novos serviços integrados.
 from flask import Blueprint, request, jsonify
 import json
 import os
-from src.services.cid_categorizer import CIDCategorizer
-from src.services.diagnostic_engine import DiagnosticEngine
-from src.services.enhanced_drug_interaction_checker import EnhancedDrugInteractionChecker
-from src.services.disease_details_service import DiseaseDetailsService
-from src.services.symptom_selector_service import SymptomSelectorService
+from service_registry import registry
+from comprehensive_analysis import AnalysisContext, analyze
 
 enhanced_disease_bp = Blueprint('enhanced_disease', __name__)
 
-# Inicializar serviços
-cid_categorizer = CIDCategorizer()
-diagnostic_engine = DiagnosticEngine()
-drug_checker = EnhancedDrugInteractionChecker()
-disease_details = DiseaseDetailsService()
-symptom_selector = SymptomSelectorService()
+# Serviços construídos sob demanda (no primeiro uso); ver service_registry.preload_services
+cid_categorizer = registry.register('cid_categorizer', 'cid_categorizer:CIDCategorizer')
+diagnostic_engine = registry.register('diagnostic_engine', 'diagnostic_engine:DiagnosticEngine')
+drug_checker = registry.register('drug_checker', 'enhanced_drug_interaction_checker:EnhancedDrugInteractionChecker')
+disease_details = registry.register('disease_details', 'disease_details_service:DiseaseDetailsService')
+symptom_selector = registry.register('symptom_selector', 'symptom_selector_service:SymptomSelectorService')
 
 @enhanced_disease_bp.route('/categories', methods=['GET'])
 def get_cid_categories():
@@ -127,39 +124,6 @@ def search_disease_by_code():
             'error': f'Erro na busca por código: {str(e)}'
         }), 500
 
-@enhanced_disease_bp.route('/add_custom_cid', methods=['POST'])
-def add_custom_cid():
-    """Permite que médicos adicionem códigos CID personalizados."""
-    try:
-        data = request.get_json()
-        code = data.get('code', '').strip()
-        description = data.get('description', '').strip()
-        user_type = data.get('user_type', 'patient')  # Em produção, viria do token de autenticação
-        
-        if not code or not description:
-            return jsonify({
-                'success': False,
-                'error': 'Código e descrição são obrigatórios'
-            }), 400
-        
-        new_disease = cid_categorizer.add_custom_cid(code, description, user_type)
-        
-        return jsonify({
-            'success': True,
-            'message': 'Código CID personalizado adicionado com sucesso',
-            'disease': new_disease
-        })
-    except ValueError as e:
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 400
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': f'Erro ao adicionar CID personalizado: {str(e)}'
-        }), 500
-
 @enhanced_disease_bp.route('/diagnose/symptoms', methods=['POST'])
 def diagnose_from_symptoms():
     """Diagnostica baseado em relatório de sintomas."""
@@ -256,9 +220,9 @@ def check_drug_interactions():
             'summary': interaction_summary
         }
         
-        # Incluir relatório detalhado se solicitado
+        # Incluir relatório detalhado se solicitado (reaproveita o resumo já calculado)
         if include_report:
-            detailed_report = drug_checker.generate_interaction_report(medications)
+            detailed_report = drug_checker.generate_interaction_report(medications, interaction_summary)
             response['detailed_report'] = detailed_report
         
         return jsonify(response)
@@ -312,15 +276,18 @@ def comprehensive_medical_analysis():
                 'error': 'Relatório de sintomas ou lista de medicamentos é obrigatória'
             }), 400
         
+        # Diagnóstico e interações calculados uma vez cada (em paralelo quando há os dois);
+        # os relatórios reaproveitam os mesmos resultados
+        ctx = analyze(AnalysisContext(symptoms_report, current_medications, include_reports),
+                      diagnostic_engine, drug_checker)
+        
         analysis_result = {
             'success': True,
             'timestamp': str(datetime.now()),
             'analysis_type': 'comprehensive'
         }
         
-        # Análise de sintomas se fornecida
-        if symptoms_report and len(symptoms_report) >= 10:
-            diagnostic_results = diagnostic_engine.analyze_symptoms_report(symptoms_report)
+        if ctx.diagnostic_results is not None:
             analysis_result['diagnostic_analysis'] = {
                 'symptoms_report': symptoms_report,
                 'diagnostic_results': [
@@ -331,46 +298,21 @@ def comprehensive_medical_analysis():
                         'confidence_level': result.confidence_level,
                         'matching_symptoms': result.matching_symptoms
                     }
-                    for result in diagnostic_results
+                    for result in ctx.diagnostic_results
                 ]
             }
-            
-            if include_reports and diagnostic_results:
-                medical_report = diagnostic_engine.generate_medical_report(diagnostic_results, symptoms_report)
-                analysis_result['diagnostic_analysis']['medical_report'] = medical_report
+            if ctx.medical_report is not None:
+                analysis_result['diagnostic_analysis']['medical_report'] = ctx.medical_report
         
-        # Análise de interações se medicamentos fornecidos
-        if current_medications and len(current_medications) >= 2:
-            interaction_summary = drug_checker.get_interaction_summary(current_medications)
+        if ctx.interaction_summary is not None:
             analysis_result['interaction_analysis'] = {
                 'medications': current_medications,
-                'summary': interaction_summary
+                'summary': ctx.interaction_summary
             }
-            
-            if include_reports:
-                interaction_report = drug_checker.generate_interaction_report(current_medications)
-                analysis_result['interaction_analysis']['detailed_report'] = interaction_report
-        
-        # Recomendações integradas
-        integrated_recommendations = []
-        
-        if 'diagnostic_analysis' in analysis_result:
-            if analysis_result['diagnostic_analysis']['diagnostic_results']:
-                top_diagnosis = analysis_result['diagnostic_analysis']['diagnostic_results'][0]
-                if top_diagnosis['probability'] > 50:
-                    integrated_recommendations.append(f"Diagnóstico provável: {top_diagnosis['disease_name']} (CID: {top_diagnosis['cid_code']})")
-        
-        if 'interaction_analysis' in analysis_result:
-            if analysis_result['interaction_analysis']['summary']['requires_immediate_attention']:
-                integrated_recommendations.append("⚠️ ATENÇÃO: Interações medicamentosas graves detectadas")
-        
-        integrated_recommendations.extend([
-            "Consulte um médico para avaliação completa",
-            "Mantenha lista atualizada de medicamentos",
-            "Monitore sintomas e efeitos adversos"
-        ])
+            if ctx.interaction_report is not None:
+                analysis_result['interaction_analysis']['detailed_report'] = ctx.interaction_report
         
-        analysis_result['integrated_recommendations'] = integrated_recommendations
+        analysis_result['integrated_recommendations'] = ctx.recommendations
         
         return jsonify(analysis_result)
     except Exception as e:
@@ -386,9 +328,9 @@ def health_check():
         'status': 'ok',
         'message': 'Med-IA API Aprimorada está funcionando!',
         'services': {
-            'cid_categorizer': 'ativo',
-            'diagnostic_engine': 'ativo',
-            'drug_interaction_checker': 'ativo'
+            'cid_categorizer': 'ativo' if registry.is_loaded('cid_categorizer') else 'sob demanda',
+            'diagnostic_engine': 'ativo' if registry.is_loaded('diagnostic_engine') else 'sob demanda',
+            'drug_interaction_checker': 'ativo' if registry.is_loaded('drug_checker') else 'sob demanda'
         },
         'version': '2.0'
     })
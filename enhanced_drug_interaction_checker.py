@@ -6,6 +6,9 @@ from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass
 import re
 
+from knowledge_base import get_table
+from spans import timed
+
 @dataclass
 class DrugInteraction:
     drug1: str
@@ -26,308 +29,18 @@ class EnhancedDrugInteractionChecker:
         self.drug_aliases = self._load_drug_aliases()
         
     def _load_drug_aliases(self) -> Dict[str, List[str]]:
-        """Carrega aliases e nomes comerciais dos medicamentos."""
-        return {
-            'paracetamol': ['acetaminofeno', 'tylenol', 'parador', 'dôrico', 'febralgin'],
-            'dipirona': ['metamizol', 'novalgina', 'anador', 'dorflex', 'buscopan composto'],
-            'ibuprofeno': ['advil', 'alivium', 'buscofem', 'ibupril', 'motrin'],
-            'aspirina': ['ácido acetilsalicílico', 'aas', 'aspirina', 'somalgin'],
-            'amoxicilina': ['amoxil', 'flemoxon', 'hiconcil', 'amoxicilina'],
-            'azitromicina': ['zitromax', 'azimix', 'azitromicina'],
-            'omeprazol': ['losec', 'peprazol', 'omeprazol'],
-            'sinvastatina': ['zocor', 'sinvastatina', 'vaslip'],
-            'metformina': ['glifage', 'glucoformin', 'metformina'],
-            'losartana': ['cozaar', 'losartec', 'aradois'],
-            'enalapril': ['renitec', 'vasopril', 'enalapril'],
-            'propranolol': ['inderal', 'propranolol'],
-            'varfarina': ['marevan', 'varfarina', 'coumadin'],
-            'digoxina': ['digoxina', 'lanoxin'],
-            'fenitoína': ['hidantal', 'fenitoína', 'epelin'],
-            'carbamazepina': ['tegretol', 'carbamazepina'],
-            'lítio': ['carbolitium', 'lítio'],
-            'fluoxetina': ['prozac', 'daforin', 'fluoxetina'],
-            'sertralina': ['zoloft', 'assert', 'sertralina'],
-            'diazepam': ['valium', 'diazepam', 'compaz'],
-            'clonazepam': ['rivotril', 'clonazepam'],
-            'insulina': ['humulin', 'novolin', 'lantus', 'insulina'],
-            'prednisona': ['meticorten', 'prednisona'],
-            'levotiroxina': ['puran', 'synthroid', 'levotiroxina']
-        }
+        """Carrega aliases e nomes comerciais dos medicamentos (data/knowledge/drug_aliases.json)."""
+        return get_table('drug_aliases')
     
     def _load_interactions_database(self) -> Dict[Tuple[str, str], DrugInteraction]:
-        """Carrega base de dados completa de interações medicamentosas."""
-        interactions = {}
-        
-        # Interações Cardiovasculares
-        interactions[('varfarina', 'aspirina')] = DrugInteraction(
-            drug1='varfarina',
-            drug2='aspirina',
-            severity='Contraindicada',
-            mechanism='Sinergismo anticoagulante - inibição da agregação plaquetária e da coagulação',
-            clinical_effects=[
-                'Aumento significativo do risco de sangramento',
-                'Prolongamento excessivo do tempo de coagulação',
-                'Risco de hemorragias graves'
-            ],
-            adverse_reactions=[
-                'Sangramento gastrointestinal',
-                'Hematomas espontâneos',
-                'Sangramento intracraniano',
-                'Epistaxe',
-                'Hematúria',
-                'Melena'
-            ],
-            management='Contraindicação absoluta. Se anticoagulação necessária, usar apenas varfarina com monitoramento rigoroso do INR',
-            monitoring=['INR diário', 'Hemograma completo', 'Sinais de sangramento'],
-            alternatives=['Clopidogrel (com cautela)', 'Anticoagulantes diretos'],
-            onset_time='2-7 dias',
-            evidence_level='Alto - estudos clínicos controlados'
-        )
-        
-        interactions[('enalapril', 'losartana')] = DrugInteraction(
-            drug1='enalapril',
-            drug2='losartana',
-            severity='Moderada',
-            mechanism='Duplo bloqueio do sistema renina-angiotensina-aldosterona',
-            clinical_effects=[
-                'Hipotensão excessiva',
-                'Hipercalemia',
-                'Deterioração da função renal'
-            ],
-            adverse_reactions=[
-                'Tontura severa',
-                'Síncope',
-                'Arritmias por hipercalemia',
-                'Insuficiência renal aguda'
-            ],
-            management='Evitar combinação. Se necessário, iniciar com doses baixas e monitorar rigorosamente',
-            monitoring=['Pressão arterial', 'Função renal', 'Potássio sérico'],
-            alternatives=['Usar apenas um dos medicamentos', 'Adicionar diurético'],
-            onset_time='1-3 dias',
-            evidence_level='Moderado - estudos observacionais'
-        )
-        
-        # Interações com Antibióticos
-        interactions[('amoxicilina', 'varfarina')] = DrugInteraction(
-            drug1='amoxicilina',
-            drug2='varfarina',
-            severity='Moderada',
-            mechanism='Alteração da flora intestinal reduz síntese de vitamina K',
-            clinical_effects=[
-                'Potencialização do efeito anticoagulante',
-                'Aumento do INR'
-            ],
-            adverse_reactions=[
-                'Sangramento aumentado',
-                'Equimoses',
-                'Sangramento gengival'
-            ],
-            management='Monitorar INR mais frequentemente durante e após o tratamento antibiótico',
-            monitoring=['INR a cada 2-3 dias', 'Sinais de sangramento'],
-            alternatives=['Cefalexina', 'Clindamicina'],
-            onset_time='3-5 dias',
-            evidence_level='Moderado'
-        )
-        
-        interactions[('azitromicina', 'digoxina')] = DrugInteraction(
-            drug1='azitromicina',
-            drug2='digoxina',
-            severity='Grave',
-            mechanism='Inibição do metabolismo da digoxina por bactérias intestinais',
-            clinical_effects=[
-                'Aumento dos níveis séricos de digoxina',
-                'Toxicidade digitálica'
-            ],
-            adverse_reactions=[
-                'Náuseas e vômitos',
-                'Arritmias cardíacas',
-                'Distúrbios visuais (visão amarelada)',
-                'Confusão mental',
-                'Bradicardia'
-            ],
-            management='Reduzir dose de digoxina em 50% ou suspender temporariamente',
-            monitoring=['Níveis séricos de digoxina', 'ECG', 'Sinais de toxicidade'],
-            alternatives=['Claritromicina', 'Doxiciclina'],
-            onset_time='2-4 dias',
-            evidence_level='Alto'
-        )
-        
-        # Interações com Anti-inflamatórios
-        interactions[('ibuprofeno', 'enalapril')] = DrugInteraction(
-            drug1='ibuprofeno',
-            drug2='enalapril',
-            severity='Moderada',
-            mechanism='AINEs reduzem síntese de prostaglandinas vasodilatadoras',
-            clinical_effects=[
-                'Redução do efeito anti-hipertensivo',
-                'Deterioração da função renal',
-                'Retenção de sódio e água'
-            ],
-            adverse_reactions=[
-                'Aumento da pressão arterial',
-                'Edema',
-                'Insuficiência renal',
-                'Hipercalemia'
-            ],
-            management='Evitar uso prolongado. Se necessário, monitorar função renal e pressão arterial',
-            monitoring=['Pressão arterial', 'Creatinina', 'Potássio', 'Peso corporal'],
-            alternatives=['Paracetamol', 'Corticoides tópicos'],
-            onset_time='1-2 semanas',
-            evidence_level='Alto'
-        )
-        
-        interactions[('aspirina', 'ibuprofeno')] = DrugInteraction(
-            drug1='aspirina',
-            drug2='ibuprofeno',
-            severity='Moderada',
-            mechanism='Competição pelo sítio de ligação da COX-1 plaquetária',
-            clinical_effects=[
-                'Redução do efeito antiagregante da aspirina',
-                'Aumento do risco cardiovascular'
-            ],
-            adverse_reactions=[
-                'Perda da proteção cardiovascular',
-                'Aumento do risco de infarto',
-                'Irritação gastrointestinal'
-            ],
-            management='Tomar aspirina pelo menos 2 horas antes do ibuprofeno',
-            monitoring=['Sinais de eventos cardiovasculares', 'Sintomas gastrointestinais'],
-            alternatives=['Paracetamol', 'Celecoxibe'],
-            onset_time='Imediato',
-            evidence_level='Alto'
-        )
-        
-        # Interações com Antidepressivos
-        interactions[('fluoxetina', 'varfarina')] = DrugInteraction(
-            drug1='fluoxetina',
-            drug2='varfarina',
-            severity='Moderada',
-            mechanism='Inibição do CYP2C9 e deslocamento da ligação proteica',
-            clinical_effects=[
-                'Aumento dos níveis de varfarina',
-                'Potencialização do efeito anticoagulante'
-            ],
-            adverse_reactions=[
-                'Sangramento aumentado',
-                'Hematomas',
-                'Sangramento gastrointestinal'
-            ],
-            management='Monitorar INR mais frequentemente e ajustar dose de varfarina',
-            monitoring=['INR semanal', 'Sinais de sangramento'],
-            alternatives=['Sertralina', 'Citalopram'],
-            onset_time='1-2 semanas',
-            evidence_level='Moderado'
-        )
-        
-        interactions[('sertralina', 'tramadol')] = DrugInteraction(
-            drug1='sertralina',
-            drug2='tramadol',
-            severity='Grave',
-            mechanism='Aumento do risco de síndrome serotoninérgica',
-            clinical_effects=[
-                'Excesso de serotonina no SNC',
-                'Síndrome serotoninérgica'
-            ],
-            adverse_reactions=[
-                'Agitação e confusão',
-                'Tremores e rigidez muscular',
-                'Hipertermia',
-                'Taquicardia',
-                'Diaforese',
-                'Convulsões'
-            ],
-            management='Evitar combinação. Se necessário, usar doses baixas e monitorar rigorosamente',
-            monitoring=['Sinais neurológicos', 'Temperatura corporal', 'Frequência cardíaca'],
-            alternatives=['Paracetamol', 'Codeína'],
-            onset_time='Horas a dias',
-            evidence_level='Alto'
-        )
-        
-        # Interações com Diabetes
-        interactions[('metformina', 'propranolol')] = DrugInteraction(
-            drug1='metformina',
-            drug2='propranolol',
-            severity='Leve',
-            mechanism='Mascaramento dos sintomas de hipoglicemia',
-            clinical_effects=[
-                'Redução dos sinais autonômicos de hipoglicemia',
-                'Dificuldade de reconhecer hipoglicemia'
-            ],
-            adverse_reactions=[
-                'Hipoglicemia não reconhecida',
-                'Sudorese como único sintoma',
-                'Risco de hipoglicemia grave'
-            ],
-            management='Educar paciente sobre sintomas atípicos de hipoglicemia',
-            monitoring=['Glicemia capilar mais frequente', 'Sintomas neuroglicopênicos'],
-            alternatives=['Metoprolol', 'Carvedilol'],
-            onset_time='Imediato',
-            evidence_level='Moderado'
-        )
-        
-        # Interações com Anticonvulsivantes
-        interactions[('fenitoína', 'varfarina')] = DrugInteraction(
-            drug1='fenitoína',
-            drug2='varfarina',
-            severity='Moderada',
-            mechanism='Indução enzimática do CYP2C9 e deslocamento proteico',
-            clinical_effects=[
-                'Efeito bifásico: inicial aumento, depois redução do efeito anticoagulante',
-                'Instabilidade do INR'
-            ],
-            adverse_reactions=[
-                'Sangramento inicial',
-                'Posterior risco trombótico',
-                'Dificuldade de controle do INR'
-            ],
-            management='Monitorar INR muito frequentemente e ajustar doses conforme necessário',
-            monitoring=['INR 2-3x por semana', 'Sinais de sangramento e trombose'],
-            alternatives=['Levetiracetam', 'Lamotrigina'],
-            onset_time='1-2 semanas',
-            evidence_level='Alto'
-        )
-        
-        # Interações com Gastroprotetores
-        interactions[('omeprazol', 'clopidogrel')] = DrugInteraction(
-            drug1='omeprazol',
-            drug2='clopidogrel',
-            severity='Moderada',
-            mechanism='Inibição do CYP2C19 reduz ativação do clopidogrel',
-            clinical_effects=[
-                'Redução do efeito antiagregante',
-                'Aumento do risco cardiovascular'
-            ],
-            adverse_reactions=[
-                'Perda da proteção antitrombótica',
-                'Aumento do risco de infarto',
-                'Trombose de stent'
-            ],
-            management='Preferir pantoprazol ou usar com intervalo de 12 horas',
-            monitoring=['Eventos cardiovasculares', 'Função plaquetária se disponível'],
-            alternatives=['Pantoprazol', 'Ranitidina'],
-            onset_time='3-7 dias',
-            evidence_level='Alto'
-        )
-        
-        # Adicionar interações reversas (drug2, drug1)
-        reverse_interactions = {}
-        for (drug1, drug2), interaction in interactions.items():
-            reverse_interactions[(drug2, drug1)] = DrugInteraction(
-                drug1=drug2,
-                drug2=drug1,
-                severity=interaction.severity,
-                mechanism=interaction.mechanism,
-                clinical_effects=interaction.clinical_effects,
-                adverse_reactions=interaction.adverse_reactions,
-                management=interaction.management,
-                monitoring=interaction.monitoring,
-                alternatives=interaction.alternatives,
-                onset_time=interaction.onset_time,
-                evidence_level=interaction.evidence_level
-            )
-        
-        interactions.update(reverse_interactions)
-        return interactions
+        """
+        Carrega base de dados completa de interações medicamentosas (data/knowledge/drug_interactions.json).
+        A tabela compilada já contém os pares reversos (drug2, drug1).
+        """
+        return {
+            pair: DrugInteraction(**record)
+            for pair, record in get_table('drug_interactions').items()
+        }
     
     def normalize_drug_name(self, drug_name: str) -> str:
         """Normaliza nome do medicamento para busca."""
@@ -345,6 +58,7 @@ class EnhancedDrugInteractionChecker:
         
         return drug_name
     
+    @timed('interactions.check')
     def check_interactions(self, medications: List[str]) -> List[Dict]:
         """Verifica interações entre uma lista de medicamentos."""
         if len(medications) < 2:
@@ -413,6 +127,7 @@ class EnhancedDrugInteractionChecker:
         else:
             return 'Baixo'
     
+    @timed('interactions.summary')
     def get_interaction_summary(self, medications: List[str]) -> Dict:
         """Retorna resumo completo das interações encontradas."""
         interactions = self.check_interactions(medications)
@@ -502,9 +217,14 @@ class EnhancedDrugInteractionChecker:
         
         return alternatives_db.get(normalized_drug, [])
     
-    def generate_interaction_report(self, medications: List[str]) -> str:
-        """Gera relatório detalhado de interações medicamentosas."""
-        summary = self.get_interaction_summary(medications)
+    @timed('interactions.report')
+    def generate_interaction_report(self, medications: List[str], summary: Optional[Dict] = None) -> str:
+        """
+        Gera relatório detalhado de interações medicamentosas. Quem já tem o resultado de
+        get_interaction_summary passa `summary` e evita verificar as interações de novo.
+        """
+        if summary is None:
+            summary = self.get_interaction_summary(medications)
         
         report = "RELATÓRIO DE INTERAÇÕES MEDICAMENTOSAS\n"
         report += "=" * 50 + "\n\n"
@@ -1,6 +1,8 @@
 import json
 import time
 
+from catalog_store import save_catalog
+
 def expand_diseases_cache():
     """Expande rapidamente o cache de doenças usando dados do Datasus"""
     
@@ -147,11 +149,9 @@ def expand_diseases_cache():
     
     # Adicionar ao cache existente
     cache_data['doencas'].extend(novas_doencas)
-    cache_data['last_update'] = int(time.time())
     
-    # Salvar arquivo expandido
-    with open('doencas_cache.json', 'w', encoding='utf-8') as f:
-        json.dump(cache_data, f, ensure_ascii=False, indent=2)
+    # Salvar arquivo expandido (gravação atômica com cabeçalho versionado)
+    cache_data.update(save_catalog('doencas_cache.json', cache_data['doencas'], indent=2))
     
     print(f"✅ Cache expandido com sucesso!")
     print(f"📊 Total de doenças: {len(cache_data['doencas'])}")
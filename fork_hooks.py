@@ -0,0 +1,28 @@
+"""
+Funções executadas em cada worker logo após o fork (post_fork do gunicorn.conf.py com preload_app).
+
+O filho herda os locks do mestre no estado em que estavam, possivelmente travados por uma
+thread que não existe no filho, e nenhuma das threads de segundo plano. Cada módulo que guarda
+locks, threads, pools ou conexões registra aqui, na importação, a função que os recria:
+
+    fork_hooks.register(custom_cid_store.reset_after_fork)
+
+As funções rodam na ordem de registro (a de importação dos módulos), que não é garantida; por
+isso cada hook só recria o estado do próprio módulo e não registra mensagens de log (a thread
+de log também é recriada por um hook).
+"""
+from typing import Callable, List
+
+_hooks: List[Callable[[], None]] = []
+
+
+def register(hook: Callable[[], None]) -> Callable[[], None]:
+    """Registra `hook` para rodar no processo filho após o fork (pode ser usado como decorador)."""
+    _hooks.append(hook)
+    return hook
+
+
+def run_after_fork():
+    """Executa os hooks registrados, em ordem."""
+    for hook in list(_hooks):
+        hook()
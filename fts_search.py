@@ -0,0 +1,186 @@
+"""
+Backend de busca do catálogo CID-10 em SQLite FTS5 (MEDIA_SEARCH_BACKEND=fts5).
+
+O padrão continua sendo a pontuação em Python do CIDCategorizer (MEDIA_SEARCH_BACKEND=memory),
+que percorre o catálogo inteiro a cada busca. Com fts5, cada worker monta a partir do snapshot
+um banco SQLite em memória com:
+- names: tabela FTS5 das descrições, com o tokenizador unicode61 remove_diacritics 2
+  ("hipertensao" encontra "Hipertensão") e índices de prefixo de 2 e 3 caracteres, que
+  atendem os termos "hip"* sem varrer o vocabulário;
+- codes: código de cada entrada (maiúsculo) com índice B-tree, para search_by_code_pattern
+  por faixa (code >= 'I1' AND code < 'I1\\U0010ffff').
+
+A linha `id` de codes é o rowid de names: 1..N são as posições do catálogo e as seguintes
+são os CIDs personalizados, trocados de uma vez quando a versão no banco muda.
+
+As buscas por nome são ordenadas por BM25. Todos os termos precisam aparecer (como prefixo de
+uma palavra); se nenhuma descrição tiver todos, a busca é refeita com OR.
+
+A conexão é única por processo, protegida por um lock (as consultas levam microssegundos), e é
+recriada se o processo mudar (fork do gunicorn com preload): conexões SQLite não atravessam fork.
+
+O CIDCategorizer indexa o CID-10 ({'code', 'description'}); a busca por nome de /api/v2 indexa
+as doenças do Datasus ({'cid', 'nome'}) por catalog_index, que reaproveita o índice enquanto a
+lista for a do mesmo snapshot.
+"""
+import os
+import re
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import fork_hooks
+
+SEARCH_BACKEND = os.environ.get('MEDIA_SEARCH_BACKEND', 'memory').strip().lower()
+BACKENDS = ('memory', 'fts5')
+
+SCHEMA = (
+    "CREATE TABLE codes (id INTEGER PRIMARY KEY, code TEXT NOT NULL)",
+    "CREATE INDEX codes_code ON codes (code)",
+    "CREATE VIRTUAL TABLE names USING fts5(description, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')",
+)
+
+_TOKEN_RE = re.compile(r'\w+')
+_CODE_END = '\U0010ffff'
+
+
+def fts5_available() -> bool:
+    """O SQLite do Python foi compilado com FTS5?"""
+    try:
+        conn = sqlite3.connect(':memory:')
+        try:
+            conn.execute("CREATE VIRTUAL TABLE t USING fts5(x)")
+        finally:
+            conn.close()
+    except sqlite3.OperationalError:
+        return False
+    return True
+
+
+def build_match(query: str, operator: str = 'AND') -> Optional[str]:
+    """'Doença pulm' -> '"doença"* AND "pulm"*' (termos de uma letra são ignorados)."""
+    terms = [f'"{token}"*' for token in _TOKEN_RE.findall(query.lower()) if len(token) >= 2]
+    return f' {operator} '.join(terms) or None
+
+
+class FTSSearchIndex:
+    """Índice FTS5 de uma lista de entradas {code_key, text_key} (catálogo do snapshot)."""
+
+    def __init__(self, entries: List[Dict], code_key: str = 'code', text_key: str = 'description'):
+        self._entries = entries
+        self._code_key = code_key
+        self._text_key = text_key
+        self._custom: List[Dict] = []
+        self._custom_version = None
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+
+    def _connection(self) -> sqlite3.Connection:
+        """Conexão do processo atual (chamado com o lock)."""
+        if self._conn is None or self._pid != os.getpid():
+            # A conexão herdada do mestre é só descartada: fechá-la no filho mexeria no estado dele
+            self._conn = self._build()
+            self._pid = os.getpid()
+        return self._conn
+
+    def _build(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(':memory:', check_same_thread=False)
+        for statement in SCHEMA:
+            conn.execute(statement)
+        self._insert(conn, 1, self._entries)
+        self._insert(conn, len(self._entries) + 1, self._custom)
+        conn.execute("INSERT INTO names (names) VALUES ('optimize')")
+        conn.commit()
+        return conn
+
+    def _insert(self, conn: sqlite3.Connection, first_id: int, entries: List[Dict]):
+        rows = [(first_id + i, (entry.get(self._code_key) or '').upper(), entry.get(self._text_key) or '')
+                for i, entry in enumerate(entries)]
+        conn.executemany("INSERT INTO codes (id, code) VALUES (?, ?)", [row[:2] for row in rows])
+        conn.executemany("INSERT INTO names (rowid, description) VALUES (?, ?)", [(row[0], row[2]) for row in rows])
+
+    def _entry(self, rowid: int) -> Dict:
+        n = len(self._entries)
+        return self._entries[rowid - 1] if rowid <= n else self._custom[rowid - 1 - n]
+
+    def build(self):
+        """Monta o índice já (sem esperar a primeira busca)."""
+        with self._lock:
+            self._connection()
+
+    def sync_custom(self, custom: List[Dict], version):
+        """Troca os CIDs personalizados indexados quando a versão muda."""
+        if version == self._custom_version:
+            return
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                first_id = len(self._entries) + 1
+                self._conn.execute("DELETE FROM codes WHERE id >= ?", (first_id,))
+                self._conn.execute("DELETE FROM names WHERE rowid >= ?", (first_id,))
+                self._insert(self._conn, first_id, custom)
+                self._conn.commit()
+            self._custom = list(custom)
+            self._custom_version = version
+
+    def search(self, query: str, limit: int = 20) -> List[Dict]:
+        """Entradas cuja descrição tem os termos da consulta, por BM25 (relevance = -bm25)."""
+        entries, _ = self.search_entries(query, limit)
+        return [{'code': entry.get(self._code_key), 'description': entry.get(self._text_key),
+                 'relevance': relevance}
+                for entry, relevance in entries]
+
+    def search_entries(self, query: str, limit: int = 20) -> Tuple[List[Tuple[Dict, float]], int]:
+        """
+        Os próprios registros (com a relevância) das `limit` melhores correspondências e o total
+        de correspondências. Só esses registros são lidos do catálogo.
+        """
+        sql = "SELECT rowid, bm25(names) AS rank FROM names WHERE names MATCH ? ORDER BY rank LIMIT ?"
+        with self._lock:
+            conn = self._connection()
+            rows, match = [], None
+            for operator in ('AND', 'OR'):
+                match = build_match(query, operator)
+                if match is None:
+                    return [], 0
+                rows = conn.execute(sql, (match, limit)).fetchall()
+                if rows or ' ' not in match:
+                    break
+            if len(rows) < limit:
+                total = len(rows)
+            else:
+                total = conn.execute("SELECT count(*) FROM names WHERE names MATCH ?", (match,)).fetchone()[0]
+            return [(self._entry(rowid), round(-rank, 3)) for rowid, rank in rows], total
+
+    def search_code_prefix(self, prefix: str, limit: int = 20) -> List[Dict]:
+        """Entradas cujo código começa com `prefix` (maiúsculo), em ordem de código."""
+        with self._lock:
+            conn = self._connection()
+            rows = conn.execute(
+                "SELECT id FROM codes WHERE code >= ? AND code < ? ORDER BY code, id LIMIT ?",
+                (prefix, prefix + _CODE_END, limit)).fetchall()
+            return [self._entry(rowid) for rowid, in rows]
+
+
+_catalog_indexes: Dict[Tuple[str, str], Tuple[List[Dict], FTSSearchIndex]] = {}
+_catalog_lock = threading.Lock()
+
+
+@fork_hooks.register
+def _reset_after_fork():
+    global _catalog_lock
+    _catalog_lock = threading.Lock()
+
+
+def catalog_index(entries: List[Dict], code_key: str = 'code', text_key: str = 'description') -> FTSSearchIndex:
+    """Índice de `entries`, reaproveitado enquanto for a mesma lista (um snapshot novo traz outra)."""
+    key = (code_key, text_key)
+    current = _catalog_indexes.get(key)
+    if current is not None and current[0] is entries:
+        return current[1]
+    with _catalog_lock:
+        current = _catalog_indexes.get(key)
+        if current is None or current[0] is not entries:
+            current = _catalog_indexes[key] = (entries, FTSSearchIndex(entries, code_key, text_key))
+        return current[1]
@@ -0,0 +1,73 @@
+"""
+Configuração do gunicorn para produção (Procfile e render.yaml: gunicorn -c gunicorn.conf.py main:app).
+
+- Workers gthread: cada worker atende várias requisições em threads, de modo que uma
+  requisição lenta não prende o processo inteiro.
+- Número de workers derivado das CPUs (2 × CPUs + 1, limitado por MEDIA_MAX_WORKERS),
+  sobrescrevível por WEB_CONCURRENCY.
+- preload_app: catálogo, base de conhecimento e serviços são carregados uma vez no mestre e
+  compartilhados por copy-on-write; post_fork recria locks e threads em cada worker.
+- max_requests com jitter recicla os workers aos poucos, sem reiniciar todos ao mesmo tempo.
+
+Variáveis: PORT, WEB_CONCURRENCY, MEDIA_MAX_WORKERS, MEDIA_GUNICORN_THREADS,
+MEDIA_PRELOAD_SERVICES (padrão 1 aqui), MEDIA_RELOAD_INTERVAL (padrão 5 aqui), MEDIA_MAX_REQUESTS, GUNICORN_TIMEOUT, MEDIA_METRICS_DIR.
+"""
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+# Com preload_app, main.py carrega snapshot e serviços no mestre antes do fork
+os.environ.setdefault('MEDIA_PRELOAD_SERVICES', '1')
+# Diretório em que cada worker grava suas métricas; o /metrics soma todos os workers
+os.environ.setdefault('MEDIA_METRICS_DIR', os.path.join(tempfile.gettempdir(), f'media-metrics-{os.getpid()}'))
+
+from service_registry import preload_enabled  # noqa: E402
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+_max_workers = int(os.environ.get('MEDIA_MAX_WORKERS', 4))
+workers = int(os.environ.get('WEB_CONCURRENCY', min(multiprocessing.cpu_count() * 2 + 1, _max_workers)))
+worker_class = 'gthread'
+threads = int(os.environ.get('MEDIA_GUNICORN_THREADS', 4))
+
+preload_app = preload_enabled()
+
+# Cada worker tem sua cópia do catálogo, das tabelas e dos serviços: a thread de observação
+# (hot_reload) faz uma alteração nos arquivos de origem chegar a todos eles, e não só ao
+# worker que atendeu o POST /api/admin/reload. MEDIA_RELOAD_INTERVAL=0 desliga.
+if workers > 1 or preload_app:
+    os.environ.setdefault('MEDIA_RELOAD_INTERVAL', '5')
+
+max_requests = int(os.environ.get('MEDIA_MAX_REQUESTS', 2000))
+max_requests_jitter = max_requests // 10
+keepalive = 5
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = 20
+
+accesslog = None
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+
+def post_fork(server, worker):
+    """Reinicializa locks e threads de segundo plano herdados do mestre."""
+    if preload_app:
+        import fork_hooks
+        fork_hooks.run_after_fork()
+    server.log.info("Worker %s iniciado (%s threads, preload=%s)", worker.pid, threads, preload_app)
+
+
+def worker_exit(server, worker):
+    from metrics import flush_worker
+    flush_worker()
+
+
+def child_exit(server, worker):
+    """Consolida os contadores do worker encerrado (reciclagem por max_requests, por exemplo)."""
+    from metrics import retire_worker
+    retire_worker(worker.pid)
+
+
+def on_exit(server):
+    shutil.rmtree(os.environ['MEDIA_METRICS_DIR'], ignore_errors=True)
@@ -0,0 +1,178 @@
+"""
+Recarga a quente do catálogo (doencas_cache.json, cid10_datasus.json) e da base de conhecimento
+(data/knowledge/*.json) sem reiniciar os workers do gunicorn.
+
+A recarga compila o novo snapshot e as novas tabelas fora do caminho da requisição (thread de
+observação ou endpoint administrativo), valida tudo e só então troca as referências de uma vez:
+snapshot do catálogo, tabelas e instâncias dos serviços já carregados. Requisições em andamento
+terminam com os objetos anteriores.
+
+MEDIA_RELOAD_INTERVAL (segundos; 0 = desligado) ativa a thread que observa os arquivos em cada
+worker. É o que leva uma alteração a todos os workers: cada um tem sua cópia dos dados e dos
+serviços, e a recarga só troca os do próprio processo. Os artefatos compilados também são
+observados, então a recarga forçada do POST /api/admin/reload, que os regrava, chega aos demais
+workers mesmo sem alteração nas fontes. O padrão é 0 para scripts e `python main.py`;
+gunicorn.conf.py e asgi.py usam 5. Com a thread ativa, a verificação por stat() a cada
+requisição é desligada.
+"""
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import catalog_snapshot
+import fork_hooks
+import knowledge_base
+import media_logging
+from service_registry import ServiceRegistry, registry as default_registry
+
+RELOAD_INTERVAL = float(os.environ.get('MEDIA_RELOAD_INTERVAL', '0') or 0)
+logger = media_logging.get_logger('hot_reload')
+
+
+class ReloadError(RuntimeError):
+    """Falha ao compilar/validar os novos dados; os dados anteriores continuam em uso."""
+
+
+def source_stamps() -> Dict[str, Optional[tuple]]:
+    """
+    (mtime_ns, tamanho) de todos os arquivos observados: as fontes e os artefatos compilados,
+    regravados por uma recarga com persist=True (POST /api/admin/reload) ou pelo update_cache.
+    """
+    paths = {
+        'doencas': catalog_snapshot.DOENCAS_PATH,
+        'cid10': catalog_snapshot.CID10_PATH,
+        'snapshot': catalog_snapshot.SNAPSHOT_PATH,
+        'knowledge': knowledge_base.COMPILED_PATH,
+    }
+    for table in knowledge_base.TABLES:
+        paths[table] = knowledge_base.source_path(table)
+    return {name: catalog_snapshot._source_stamp(path) for name, path in paths.items()}
+
+
+class HotReloader:
+    """Coordena recompilação, troca atômica e notificação de assinantes."""
+
+    def __init__(self, registry: ServiceRegistry, interval: float = RELOAD_INTERVAL):
+        self.registry = registry
+        self.interval = interval
+        self.generation = 0
+        self.last_reload: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._stamps = source_stamps()
+        self._failed_stamps = None
+        self._subscribers: List[Callable[[int], None]] = []
+        self._reload_lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        self._watcher_pid: Optional[int] = None
+        self._stop = threading.Event()
+
+    def subscribe(self, callback: Callable[[int], None]):
+        """Registra um callback chamado com a nova geração após cada troca."""
+        self._subscribers.append(callback)
+
+    def changed(self) -> bool:
+        return source_stamps() != self._stamps
+
+    def reload(self, force: bool = False, persist: bool = False) -> Dict:
+        """
+        Recompila e troca os dados se algum arquivo mudou (ou se force=True).
+        Com persist=True também regrava os artefatos compilados em disco, para que outros
+        workers e reinícios carreguem a nova versão com uma única leitura.
+        """
+        with self._reload_lock:
+            stamps = source_stamps()
+            if not force and stamps in (self._stamps, self._failed_stamps):
+                return self.status(reloaded=False)
+
+            started = time.perf_counter()
+            try:
+                snapshot = catalog_snapshot.build_snapshot()
+                tables = knowledge_base.compile_knowledge()
+            except (OSError, ValueError) as e:
+                self.last_error = str(e)
+                self._failed_stamps = stamps
+                logger.error("Recarga abortada, mantendo dados atuais: %s", e)
+                raise ReloadError(str(e)) from e
+
+            if persist:
+                catalog_snapshot.write_artifacts(snapshot)
+                knowledge_base.write_compiled(tables)
+                # Os artefatos regravados avisam os demais workers; este já está em dia
+                stamps = source_stamps()
+
+            catalog_snapshot.install_snapshot(catalog_snapshot.share(snapshot))
+            knowledge_base.install_tables(tables)
+            rebuilt = self.registry.rebuild()
+
+            self._stamps = stamps
+            self.generation += 1
+            self.last_reload = time.time()
+            self.last_error = None
+            for callback in self._subscribers:
+                try:
+                    callback(self.generation)
+                except Exception as e:
+                    logger.error("Assinante da recarga falhou: %s", e)
+
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            logger.info("Recarga %d concluída em %.1f ms (serviços: %s)", self.generation, elapsed_ms,
+                        ', '.join(rebuilt) or 'nenhum', extra={'generation': self.generation})
+            return self.status(reloaded=True, services=rebuilt)
+
+    def status(self, **extra) -> Dict:
+        snapshot = catalog_snapshot.get_snapshot()
+        return dict({
+            'generation': self.generation,
+            'last_reload': self.last_reload,
+            'last_error': self.last_error,
+            'doencas_version': snapshot.doencas_version,
+            'knowledge_versions': {table: knowledge_base.table_version(table) for table in knowledge_base.TABLES},
+            'watcher': self.watcher_running(),
+        }, **extra)
+
+    # --- Observação de arquivos ----------------------------------------------
+
+    def watcher_running(self) -> bool:
+        return self._watcher is not None and self._watcher.is_alive() and self._watcher_pid == os.getpid()
+
+    def start_watcher(self) -> bool:
+        """Inicia a thread de observação no processo atual (idempotente)."""
+        if self.interval <= 0 or self.watcher_running():
+            return False
+        self._stop.clear()
+        self._watcher_pid = os.getpid()
+        self._watcher = threading.Thread(target=self._watch, name='media-hot-reload', daemon=True)
+        self._watcher.start()
+        catalog_snapshot.set_auto_refresh(False)
+        knowledge_base.set_auto_refresh(False)
+        return True
+
+    def reset_after_fork(self):
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def stop_watcher(self):
+        self._stop.set()
+        catalog_snapshot.set_auto_refresh(True)
+        knowledge_base.set_auto_refresh(True)
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.reload()
+            except ReloadError:
+                pass  # já registrado; tenta de novo quando os arquivos mudarem outra vez
+            except Exception as e:
+                logger.exception("Erro inesperado na thread de recarga: %s", e)
+
+
+reloader = HotReloader(default_registry)
+
+
+@fork_hooks.register
+def _restart_after_fork():
+    """Lock de recarga novo e, se o mestre observava os arquivos, a thread de observação no worker."""
+    reloader.reset_after_fork()
+    if reloader._watcher is not None:
+        reloader.start_watcher()
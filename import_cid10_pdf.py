@@ -5,9 +5,14 @@ from pathlib import Path
 import PyPDF2
 import requests
 
+from catalog_store import save_catalog
+from media_logging import configure_logging, get_logger
+
+logger = get_logger('import_cid10')
+
 def extract_from_pdf(pdf_path):
     """Extrai dados do PDF do CID-10"""
-    print(f"📖 Extraindo dados do PDF: {pdf_path}")
+    logger.info("📖 Extraindo dados do PDF: %s", pdf_path)
     
     try:
         with open(pdf_path, 'rb') as file:
@@ -41,14 +46,15 @@ def extract_from_pdf(pdf_path):
                     
                     diseases.append(disease)
                     codigo_seq += 1
+                    logger.debug("Linha: %s - %s", cid_code, description, extra={'sample': 500})
                     
                     if codigo_seq % 100 == 0:
-                        print(f"✅ Processadas {codigo_seq} doenças...")
+                        logger.info("✅ Processadas %d doenças...", codigo_seq)
             
             return diseases
             
     except Exception as e:
-        print(f"❌ Erro ao processar PDF: {e}")
+        logger.error("❌ Erro ao processar PDF: %s", e)
         return []
 
 def get_categoria_by_cid(cid_code):
@@ -85,7 +91,7 @@ def get_categoria_by_cid(cid_code):
 
 def import_to_cache(diseases):
     """Importa as doenças para o cache existente"""
-    print("🔄 Importando para o cache...")
+    logger.info("🔄 Importando para o cache...")
     
     # Carregar cache atual
     try:
@@ -102,31 +108,26 @@ def import_to_cache(diseases):
         cache_data['doencas'].append(disease)
         codigo_seq += 1
     
-    # Atualizar timestamp
-    cache_data['last_update'] = int(time.time())
-    
-    # Salvar cache atualizado
-    with open('doencas_cache.json', 'w', encoding='utf-8') as f:
-        json.dump(cache_data, f, ensure_ascii=False, indent=2)
+    # Salvar cache atualizado (gravação atômica; atualiza timestamp e versão)
+    save_catalog('doencas_cache.json', cache_data['doencas'], indent=2)
     
-    print(f"✅ Cache atualizado com sucesso!")
-    print(f"📊 Total de doenças: {len(cache_data['doencas'])}")
-    print(f"🆕 Novas doenças adicionadas: {len(diseases)}")
+    logger.info("✅ Cache atualizado: %d doenças no total, %d novas", len(cache_data['doencas']), len(diseases))
 
 def main():
     downloads_path = Path.home() / "Downloads"
     pdf_path = downloads_path / "CID10_oficial.pdf"
     if not pdf_path.exists():
-        print(f"❌ Arquivo {pdf_path} não encontrado.")
+        logger.error("❌ Arquivo %s não encontrado.", pdf_path)
         return
-    print(f"🎯 Processando: {pdf_path.name}")
+    logger.info("🎯 Processando: %s", pdf_path.name)
     diseases = extract_from_pdf(pdf_path)
     if diseases:
-        print(f"📈 Extraídas {len(diseases)} doenças do PDF")
+        logger.info("📈 Extraídas %d doenças do PDF", len(diseases))
         import_to_cache(diseases)
-        print("🎉 Processo concluído com sucesso!")
+        logger.info("🎉 Processo concluído com sucesso!")
     else:
-        print("❌ Nenhuma doença foi extraída do PDF")
+        logger.warning("❌ Nenhuma doença foi extraída do PDF")
 
 if __name__ == "__main__":
+    configure_logging()
     main() 
\ No newline at end of file
@@ -0,0 +1,92 @@
+"""
+Provedor JSON do Flask com codificador rápido.
+Usa orjson ou msgspec quando instalados e cai para o json da stdlib caso contrário.
+"""
+import dataclasses
+import decimal
+import uuid
+from datetime import date
+
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.http import http_date
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+# Argumentos que o caminho rápido sabe tratar; qualquer outro cai para a stdlib
+_FAST_KWARGS = {'sort_keys', 'default', 'ensure_ascii', 'indent'}
+
+
+def _default(o):
+    """Mesma conversão de tipos do provedor padrão do Flask."""
+    if isinstance(o, date):
+        return http_date(o)
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if dataclasses.is_dataclass(o):
+        return dataclasses.asdict(o)
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def detect_backend() -> str:
+    """Retorna o nome do codificador disponível, em ordem de preferência."""
+    if orjson is not None:
+        return 'orjson'
+    if msgspec is not None:
+        return 'msgspec'
+    return 'json'
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Substitui `app.json`: serializa com orjson/msgspec e produz o corpo da resposta
+    direto em bytes, sem o passo intermediário por str.
+    Obs.: com msgspec, datas saem em ISO 8601 (não há passthrough para o hook).
+    """
+    default = staticmethod(_default)
+
+    def __init__(self, app, backend: str = None):
+        super().__init__(app)
+        self.backend = backend or detect_backend()
+        if self.backend == 'msgspec':
+            self._msgspec_encoder = msgspec.json.Encoder(enc_hook=_default, order='sorted')
+            self._msgspec_decoder = msgspec.json.Decoder()
+
+    def dumps_bytes(self, obj, indent: bool = False) -> bytes:
+        """Serializa direto para bytes UTF-8."""
+        if self.backend == 'orjson':
+            option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+            if self.sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            if indent:
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(obj, default=_default, option=option)
+        if self.backend == 'msgspec' and not indent:
+            return self._msgspec_encoder.encode(obj)
+        return super().dumps(obj, indent=2 if indent else None).encode('utf-8')
+
+    def dumps(self, obj, **kwargs) -> str:
+        if self.backend == 'json' or not set(kwargs) <= _FAST_KWARGS or 'default' in kwargs:
+            return super().dumps(obj, **kwargs)
+        return self.dumps_bytes(obj, indent=bool(kwargs.get('indent'))).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if kwargs or self.backend == 'json':
+            return super().loads(s, **kwargs)
+        if self.backend == 'orjson':
+            return orjson.loads(s)
+        return self._msgspec_decoder.decode(s.encode('utf-8') if isinstance(s, str) else s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self.dumps_bytes(obj, indent=indent) + b"\n", mimetype=self.mimetype)
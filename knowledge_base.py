@@ -0,0 +1,256 @@
+"""
+Base de conhecimento estática (sintomas, padrões, interações, detalhes de doenças) em arquivos de dados.
+
+As tabelas ficam em data/knowledge/<tabela>.json, cada uma com cabeçalho versionado:
+    {"format_version": 1, "version": N, "description": "...", "data": ...}
+
+`python knowledge_base.py` valida todas as tabelas e grava a forma compilada
+(data/knowledge/knowledge.pickle), carregada com uma única leitura pelos workers.
+Se um JSON for alterado depois da compilação, a verificação por stat() detecta a mudança e
+a tabela é relida do JSON — basta editar o arquivo, sem redeploy.
+"""
+import json
+import os
+import pickle
+import threading
+from typing import Dict, Iterable, Optional
+
+import fork_hooks
+from catalog_store import write_bytes_atomic
+from media_logging import get_logger
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+KNOWLEDGE_DIR = os.environ.get('MEDIA_KNOWLEDGE_DIR', os.path.join(BASE_DIR, 'data', 'knowledge'))
+COMPILED_PATH = os.environ.get('MEDIA_KNOWLEDGE_COMPILED', os.path.join(KNOWLEDGE_DIR, 'knowledge.pickle'))
+
+FORMAT_VERSION = 1
+COMPILED_MAGIC = b'MEDIAKB'
+
+
+class KnowledgeBaseError(ValueError):
+    """Tabela ausente, malformada ou em formato não suportado."""
+
+
+# --- Validação -------------------------------------------------------------
+
+def _require(condition: bool, table: str, message: str):
+    if not condition:
+        raise KnowledgeBaseError(f"{table}: {message}")
+
+
+def _is_str_list(value) -> bool:
+    return isinstance(value, list) and all(isinstance(item, str) for item in value)
+
+
+def _validate_str_list_map(table: str, data):
+    _require(isinstance(data, dict), table, "esperado um objeto")
+    for key, values in data.items():
+        _require(_is_str_list(values), table, f"'{key}' deve ser uma lista de textos")
+
+
+def _validate_symptom_database(table: str, data):
+    _require(isinstance(data, dict), table, "esperado um objeto por código CID")
+    for cid, info in data.items():
+        _require(isinstance(info, dict) and isinstance(info.get('name'), str), table, f"{cid}: 'name' obrigatório")
+        _require(_is_str_list(info.get('primary_symptoms')), table, f"{cid}: 'primary_symptoms' deve ser uma lista de textos")
+        for field in ('secondary_symptoms', 'risk_factors', 'severity_indicators',
+                      'emergency_indicators', 'warning_signs'):
+            if field in info:
+                _require(_is_str_list(info[field]), table, f"{cid}: '{field}' deve ser uma lista de textos")
+
+
+def _validate_disease_patterns(table: str, data):
+    _require(isinstance(data, dict), table, "esperado um objeto por sistema")
+    for system, pattern in data.items():
+        _require(isinstance(pattern, dict), table, f"{system}: esperado um objeto")
+        for field in ('keywords', 'symptoms'):
+            _require(_is_str_list(pattern.get(field)), table, f"{system}: '{field}' deve ser uma lista de textos")
+
+
+INTERACTION_TEXT_FIELDS = ('drug1', 'drug2', 'severity', 'mechanism', 'management', 'onset_time', 'evidence_level')
+INTERACTION_LIST_FIELDS = ('clinical_effects', 'adverse_reactions', 'monitoring', 'alternatives')
+INTERACTION_SEVERITIES = ('Leve', 'Moderada', 'Grave', 'Contraindicada')
+
+
+def _validate_drug_interactions(table: str, data):
+    _require(isinstance(data, list), table, "esperada uma lista de interações")
+    seen = set()
+    for i, record in enumerate(data):
+        _require(isinstance(record, dict), table, f"item {i}: esperado um objeto")
+        for field in INTERACTION_TEXT_FIELDS:
+            _require(isinstance(record.get(field), str), table, f"item {i}: '{field}' obrigatório")
+        for field in INTERACTION_LIST_FIELDS:
+            _require(_is_str_list(record.get(field)), table, f"item {i}: '{field}' deve ser uma lista de textos")
+        _require(record['severity'] in INTERACTION_SEVERITIES, table,
+                 f"item {i}: gravidade '{record['severity']}' inválida")
+        pair = (record['drug1'], record['drug2'])
+        _require(pair not in seen and pair[::-1] not in seen, table, f"item {i}: par {pair} duplicado")
+        seen.add(pair)
+
+
+def _validate_disease_details(table: str, data):
+    _require(isinstance(data, dict), table, "esperado um objeto por código CID")
+    for cid, details in data.items():
+        _require(isinstance(details, dict), table, f"{cid}: esperado um objeto")
+        for field in ('name', 'severity', 'treatment_type'):
+            _require(isinstance(details.get(field), str), table, f"{cid}: '{field}' obrigatório")
+        _require(isinstance(details.get('has_treatment'), bool), table, f"{cid}: 'has_treatment' deve ser booleano")
+
+
+# --- Compilação ------------------------------------------------------------
+
+def _compile_drug_interactions(data):
+    """Indexa por par (drug1, drug2), incluindo o par reverso."""
+    interactions = {}
+    for record in data:
+        interactions[(record['drug1'], record['drug2'])] = record
+    for record in data:
+        interactions[(record['drug2'], record['drug1'])] = dict(record, drug1=record['drug2'], drug2=record['drug1'])
+    return interactions
+
+
+# tabela -> (validador, compilador opcional)
+TABLES: Dict[str, tuple] = {
+    'symptom_database': (_validate_symptom_database, None),
+    'disease_patterns': (_validate_disease_patterns, None),
+    'drug_interactions': (_validate_drug_interactions, _compile_drug_interactions),
+    'drug_aliases': (_validate_str_list_map, None),
+    'disease_details': (_validate_disease_details, None),
+    'symptom_disease_map': (_validate_str_list_map, None),
+}
+
+
+def source_path(table: str) -> str:
+    return os.path.join(KNOWLEDGE_DIR, f"{table}.json")
+
+
+def _source_stamp(path: str):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def load_source(table: str) -> Dict:
+    """Lê e valida o JSON da tabela; retorna {'version', 'data', 'source'} já compilado."""
+    if table not in TABLES:
+        raise KnowledgeBaseError(f"Tabela desconhecida: {table}")
+    path = source_path(table)
+    stamp = _source_stamp(path)
+    try:
+        with open(path, encoding='utf-8') as f:
+            document = json.load(f)
+    except FileNotFoundError:
+        raise KnowledgeBaseError(f"{table}: arquivo {path} não encontrado")
+    except json.JSONDecodeError as e:
+        raise KnowledgeBaseError(f"{table}: JSON inválido ({e})")
+
+    _require(isinstance(document, dict) and 'data' in document, table, "cabeçalho sem 'data'")
+    format_version = document.get('format_version', 1)
+    _require(format_version <= FORMAT_VERSION, table, f"formato {format_version} não suportado (máximo {FORMAT_VERSION})")
+
+    validate, compile_table = TABLES[table]
+    validate(table, document['data'])
+    data = compile_table(document['data']) if compile_table else document['data']
+    return {'version': document.get('version', 0), 'data': data, 'source': stamp}
+
+
+def compile_knowledge(tables: Optional[Iterable[str]] = None) -> Dict[str, Dict]:
+    """Valida e compila as tabelas indicadas (todas, por padrão)."""
+    return {table: load_source(table) for table in (tables or TABLES)}
+
+
+def write_compiled(compiled: Dict[str, Dict], path: str = COMPILED_PATH):
+    payload = COMPILED_MAGIC + bytes([FORMAT_VERSION]) + pickle.dumps(compiled, protocol=pickle.HIGHEST_PROTOCOL)
+    write_bytes_atomic(path, payload)
+
+
+def read_compiled(path: str = COMPILED_PATH) -> Dict[str, Dict]:
+    """Forma compilada em disco; {} se ausente ou incompatível."""
+    try:
+        with open(path, 'rb') as f:
+            payload = f.read()
+    except OSError:
+        return {}
+    header = COMPILED_MAGIC + bytes([FORMAT_VERSION])
+    if not payload.startswith(header):
+        return {}
+    return pickle.loads(payload[len(header):])
+
+
+_tables: Dict[str, Dict] = {}
+_lock = threading.Lock()
+_auto_refresh = True
+
+
+@fork_hooks.register
+def _reset_after_fork():
+    global _lock
+    _lock = threading.Lock()
+
+
+def _current_entry(table: str) -> Dict:
+    entry = _tables.get(table)
+    if entry is not None and (not _auto_refresh or entry['source'] == _source_stamp(source_path(table))):
+        return entry
+
+    with _lock:
+        entry = _tables.get(table)
+        stamp = _source_stamp(source_path(table))
+        if entry is not None and entry['source'] == stamp:
+            return entry
+        if not _tables:
+            # Primeira carga no processo: aproveita tudo o que ainda estiver em dia na forma compilada
+            for name, compiled in read_compiled().items():
+                if name in TABLES and compiled['source'] == _source_stamp(source_path(name)):
+                    _tables[name] = compiled
+            entry = _tables.get(table)
+            if entry is not None and entry['source'] == stamp:
+                return entry
+        try:
+            new_entry = load_source(table)
+        except KnowledgeBaseError as e:
+            if entry is None:
+                raise
+            # Edição inválida não derruba as requisições: mantém a versão anterior até o arquivo mudar de novo
+            get_logger('knowledge_base').warning("Tabela %s inválida, mantendo versão %s: %s",
+                                                 table, entry['version'], e)
+            new_entry = dict(entry, source=stamp)
+        _tables[table] = new_entry
+        return new_entry
+
+
+def get_table(table: str):
+    """Dados da tabela (compartilhados no processo; não altere o objeto retornado)."""
+    return _current_entry(table)['data']
+
+
+def table_version(table: str) -> int:
+    return _current_entry(table)['version']
+
+
+def install_tables(compiled: Dict[str, Dict]):
+    """Troca atomicamente as tabelas do processo (resultado de compile_knowledge)."""
+    global _tables
+    with _lock:
+        _tables = dict(_tables, **compiled)
+
+
+def set_auto_refresh(enabled: bool):
+    """Liga/desliga a verificação por stat() a cada get_table (ver hot_reload)."""
+    global _auto_refresh
+    _auto_refresh = enabled
+
+
+def main():
+    """Valida todas as tabelas e grava a forma compilada (etapa de build)."""
+    compiled = compile_knowledge()
+    write_compiled(compiled)
+    for table, entry in compiled.items():
+        print(f"{table}: versão {entry['version']}, {len(entry['data'])} entradas")
+    print(f"Base de conhecimento compilada em {COMPILED_PATH}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,27 +1,68 @@
 import os
-from flask import Flask, send_from_directory, jsonify
+from flask import Flask, jsonify
 from flask_cors import CORS
+from json_provider import FastJSONProvider
+from compression import CompressionMiddleware
+from service_registry import preload_enabled, preload_services
+from catalog_snapshot import get_snapshot
+from hot_reload import reloader
+from response_cache import catalog_cache
+from static_assets import static_assets
+import metrics
+import spans
+import profiler
+from media_logging import configure_logging
 
 # Importar blueprints
 from src.routes.disease import disease_bp
 from src.routes.enhanced_disease import enhanced_disease_bp
 from src.routes.symptoms import symptoms_bp
+from src.routes.admin import admin_bp
 
-app = Flask(__name__, static_folder='static', static_url_path='')
+# Logs dos módulos "media.*" passam por uma fila; a escrita no stderr fica em uma thread
+configure_logging()
+
+# Arquivos estáticos servidos por static_assets (em memória, comprimidos); sem a rota static do Flask
+app = Flask(__name__, static_folder=None)
+app.json = FastJSONProvider(app)
 CORS(app)
+# Comprime (gzip/brotli) as respostas JSON de /api/ que ainda não vêm comprimidas
+app.wsgi_app = CompressionMiddleware(app.wsgi_app)
 
 # Registrar blueprints ANTES das rotas catch-all
 app.register_blueprint(disease_bp, url_prefix='/api')
 app.register_blueprint(enhanced_disease_bp, url_prefix='/api/v2')
 app.register_blueprint(symptoms_bp, url_prefix='/api')
+app.register_blueprint(admin_bp, url_prefix='/api/admin')
+
+# Histogramas de latência por endpoint e rota /metrics (Prometheus)
+metrics.init_app(app)
+# Spans dos serviços: histograma no /metrics e cabeçalho Server-Timing (X-Debug-Timing: 1)
+spans.init_app(app, metrics.request_metrics)
+# Profiler por amostragem sob demanda (POST /api/admin/profile)
+profiler.init_app(app)
+
+# Com gunicorn --preload, carrega catálogo, arquivos estáticos e serviços no mestre antes do fork (copy-on-write)
+if preload_enabled():
+    get_snapshot()
+    static_assets.assets
+    preload_services()
+
+# Recarga a quente: respostas em cache da geração anterior são descartadas após a troca
+reloader.subscribe(lambda generation: catalog_cache.clear())
+reloader.start_watcher()
+
+def spa_index():
+    """index.html em memória (comprimido, com ETag), usado também no fallback da SPA"""
+    asset = static_assets.get('index.html')
+    if asset is None:
+        return "Aplicativo Med-IA - Página não encontrada", 404
+    return asset.response()
 
 @app.route('/')
 def index():
     """Serve a página principal"""
-    try:
-        return send_from_directory(app.static_folder, 'index.html')
-    except Exception as e:
-        return f"Erro ao carregar página: {str(e)}", 500
+    return spa_index()
 
 @app.route('/health')
 def health():
@@ -29,8 +70,8 @@ def health():
     return jsonify({
         "status": "healthy",
         "message": "Med-IA API está funcionando!",
-        "static_folder": app.static_folder,
-        "static_files": os.listdir(app.static_folder) if app.static_folder and os.path.exists(app.static_folder) else [],
+        "static_folder": static_assets.directory,
+        "static_files": sorted(static_assets.assets),
         "blueprints": list(app.blueprints.keys()),
         "total_routes": len(list(app.url_map.iter_rules()))
     })
@@ -39,17 +80,16 @@ def health():
 @app.route('/<path:filename>')
 def serve_static(filename):
     """Serve arquivos estáticos específicos"""
-    # Só serve arquivos que realmente existem
-    if app.static_folder and os.path.exists(os.path.join(app.static_folder, filename)):
-        return send_from_directory(app.static_folder, filename)
-    else:
-        # Para rotas que não existem, retorna a página principal (SPA behavior)
-        # MAS apenas se não for uma rota de API
-        if not filename.startswith('api/'):
-            return send_from_directory(app.static_folder, 'index.html')
-        else:
-            # Se for uma rota de API que não existe, retorna 404 JSON
-            return jsonify({"error": "API endpoint not found"}), 404
+    # Só serve arquivos que realmente existem (carregados em memória na primeira requisição)
+    asset = static_assets.get(filename)
+    if asset is not None:
+        return asset.response()
+    # Para rotas que não existem, retorna a página principal (SPA behavior)
+    # MAS apenas se não for uma rota de API
+    if not filename.startswith('api/'):
+        return spa_index()
+    # Se for uma rota de API que não existe, retorna 404 JSON
+    return jsonify({"error": "API endpoint not found"}), 404
 
 @app.errorhandler(404)
 def not_found(error):
@@ -59,10 +99,7 @@ def not_found(error):
         return jsonify({"error": "API endpoint not found"}), 404
     else:
         # Caso contrário, retorna a página principal
-        try:
-            return send_from_directory(app.static_folder, 'index.html')
-        except Exception:
-            return "Aplicativo Med-IA - Página não encontrada", 404
+        return spa_index()
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
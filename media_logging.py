@@ -0,0 +1,146 @@
+"""
+Logging estruturado e não bloqueante da aplicação (loggers "media.*").
+
+- As requisições só enfileiram o registro (QueueHandler). Uma thread (QueueListener) formata e
+  grava no stderr, então a escrita síncrona não fica no caminho da requisição.
+- MEDIA_LOG_LEVEL (padrão INFO) controla o nível. Chamadas abaixo dele são descartadas antes
+  de montar a mensagem.
+- MEDIA_LOG_FORMAT=json grava uma linha JSON por evento, com os campos passados em
+  extra={...}. O padrão é texto com os campos extras no formato chave=valor.
+- Amostragem para eventos de alta frequência:
+  logger.debug("Linha %s", i, extra={'sample': 100}) mantém 1 a cada 100 registros da mesma
+  mensagem, e o registro mantido informa quantos foram omitidos (campo sampled).
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+
+import fork_hooks
+
+LOG_LEVEL = os.environ.get('MEDIA_LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = os.environ.get('MEDIA_LOG_FORMAT', 'text').lower()
+ROOT_LOGGER = 'media'
+
+# Atributos padrão de LogRecord; os demais vieram de extra={...}
+_RESERVED = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'sample', 'taskName'}
+
+
+def _extra_fields(record):
+    return {key: value for key, value in vars(record).items() if key not in _RESERVED}
+
+
+class JsonFormatter(logging.Formatter):
+    """Uma linha JSON por registro: horário, nível, logger, mensagem e campos extras."""
+
+    def format(self, record):
+        event = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+            'pid': record.process,
+            **_extra_fields(record),
+        }
+        if record.exc_info:
+            event['exc'] = self.formatException(record.exc_info)
+        return json.dumps(event, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Texto legível com os campos extras no fim (chave=valor)."""
+
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)s [%(process)d] %(name)s: %(message)s')
+
+    def format(self, record):
+        text = super().format(record)
+        fields = _extra_fields(record)
+        if fields:
+            text += ' ' + ' '.join(f'{key}={value}' for key, value in fields.items())
+        return text
+
+
+class SamplingFilter(logging.Filter):
+    """Mantém 1 a cada N registros com extra={'sample': N}, por logger e mensagem."""
+
+    def __init__(self):
+        super().__init__()
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        every = getattr(record, 'sample', None)
+        if not every or every <= 1:
+            return True
+        key = (record.name, record.msg)
+        with self._lock:
+            count = self._counts.get(key, 0)
+            self._counts[key] = count + 1
+        if count % every:
+            return False
+        if count:
+            record.sampled = every - 1
+        return True
+
+
+_listener = None
+_queue_handler = None
+_lock = threading.Lock()
+
+
+def configure_logging(level: str = LOG_LEVEL, fmt: str = LOG_FORMAT, stream=None, force: bool = False):
+    """Instala o QueueHandler no logger "media" e inicia a thread de escrita (idempotente)."""
+    global _listener, _queue_handler
+    with _lock:
+        if _listener is not None and not force:
+            return
+        stop_logging()
+        output = logging.StreamHandler(stream or sys.stderr)
+        output.setFormatter(JsonFormatter() if fmt == 'json' else TextFormatter())
+        log_queue = queue.SimpleQueue()
+        # O QueueHandler já monta a mensagem no produtor; formatação final e I/O ficam na thread
+        _queue_handler = logging.handlers.QueueHandler(log_queue)
+        _queue_handler.addFilter(SamplingFilter())
+        root = logging.getLogger(ROOT_LOGGER)
+        root.handlers[:] = [_queue_handler]
+        root.setLevel(level)
+        root.propagate = False
+        _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=False)
+        _listener.start()
+
+
+def stop_logging():
+    """Esvazia a fila e encerra a thread de escrita."""
+    global _listener
+    if _listener is not None:
+        try:
+            _listener.stop()
+        except AttributeError:
+            pass  # thread herdada de outro processo (fork)
+        _listener = None
+
+
+def restart_after_fork():
+    """A thread do QueueListener não sobrevive ao fork; recria no processo filho."""
+    global _listener, _lock
+    _lock = threading.Lock()
+    if _listener is not None:
+        # Fila nova (a herdada pode ter registros do mestre), mesma saída e mesmo formato
+        log_queue = queue.SimpleQueue()
+        _queue_handler.queue = log_queue
+        _listener = logging.handlers.QueueListener(log_queue, *_listener.handlers, respect_handler_level=False)
+        _listener.start()
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger filho de "media" (ex.: get_logger('catalog') -> media.catalog)."""
+    return logging.getLogger(f'{ROOT_LOGGER}.{name}')
+
+
+atexit.register(stop_logging)
+fork_hooks.register(restart_after_fork)
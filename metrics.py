@@ -0,0 +1,334 @@
+"""
+Instrumentação das requisições e endpoint /metrics no formato texto do Prometheus.
+
+Por endpoint (rótulos blueprint, endpoint, método) registra:
+- media_http_requests_total: requisições por status;
+- media_http_request_duration_seconds: histograma de latência;
+- media_http_response_size_bytes: histograma do tamanho das respostas com Content-Length;
+- media_http_requests_in_flight: requisições em andamento por blueprint;
+- media_span_duration_seconds: tempo por requisição em cada span dos serviços (spans.py).
+
+O custo por requisição é um perf_counter, uma busca binária nos buckets e um lock por
+atualização. Com vários workers (gunicorn), cada worker grava periodicamente seus contadores
+em MEDIA_METRICS_DIR (um arquivo por pid), e o /metrics soma todos os arquivos. Sem
+MEDIA_METRICS_DIR, o /metrics mostra apenas o processo que respondeu. Contadores de workers
+encerrados são consolidados em retired.json (retire_worker, chamado pelo child_exit do gunicorn).
+
+MEDIA_METRICS=0 desliga a instrumentação e a rota.
+"""
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from flask import Response, g, request
+
+import fork_hooks
+from catalog_store import write_bytes_atomic
+from media_logging import get_logger
+
+METRICS_ENABLED = os.environ.get('MEDIA_METRICS', '1').lower() not in ('0', 'false', 'no')
+METRICS_DIR = os.environ.get('MEDIA_METRICS_DIR') or None
+FLUSH_INTERVAL = float(os.environ.get('MEDIA_METRICS_FLUSH', 5))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+RETIRED_FILE = 'retired.json'
+
+
+class Histogram:
+    """Histograma de buckets fixos (contagens não cumulativas; a última é o +Inf)."""
+    __slots__ = ('counts', 'sum')
+
+    def __init__(self, size: int):
+        self.counts = [0] * (size + 1)
+        self.sum = 0.0
+
+    def observe(self, buckets: Tuple[float, ...], value: float):
+        self.counts[bisect_left(buckets, value)] += 1
+        self.sum += value
+
+    def merge(self, counts: List[int], total: float):
+        for i, count in enumerate(counts):
+            self.counts[i] += count
+        self.sum += total
+
+
+class RequestMetrics:
+    """Contadores do processo atual; snapshot() é serializável e somável entre processos."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.requests: Dict[Tuple[str, ...], int] = {}
+        self.latency: Dict[Tuple[str, ...], Histogram] = {}
+        self.sizes: Dict[Tuple[str, ...], Histogram] = {}
+        self.spans: Dict[Tuple[str, ...], Histogram] = {}
+        self.in_flight: Dict[str, int] = {}
+
+    def reset_after_fork(self):
+        """O worker não herda os contadores nem o lock do mestre."""
+        self._lock = threading.Lock()
+        self.reset()
+
+    def started(self, blueprint: str):
+        with self._lock:
+            self.in_flight[blueprint] = self.in_flight.get(blueprint, 0) + 1
+
+    def finished(self, blueprint: str):
+        with self._lock:
+            self.in_flight[blueprint] = self.in_flight.get(blueprint, 1) - 1
+
+    def observe(self, blueprint: str, endpoint: str, method: str, status: int,
+                seconds: float, size: Optional[int]):
+        key = (blueprint, endpoint, method)
+        with self._lock:
+            status_key = key + (str(status),)
+            self.requests[status_key] = self.requests.get(status_key, 0) + 1
+            histogram = self.latency.get(key)
+            if histogram is None:
+                histogram = self.latency[key] = Histogram(len(LATENCY_BUCKETS))
+            histogram.observe(LATENCY_BUCKETS, seconds)
+            if size is not None:
+                histogram = self.sizes.get(key)
+                if histogram is None:
+                    histogram = self.sizes[key] = Histogram(len(SIZE_BUCKETS))
+                histogram.observe(SIZE_BUCKETS, size)
+
+    def observe_spans(self, spans: Dict[str, List[float]]):
+        """Soma o tempo de cada span da requisição ({nome: [segundos, chamadas]})."""
+        with self._lock:
+            for name, (seconds, _) in spans.items():
+                histogram = self.spans.get((name,))
+                if histogram is None:
+                    histogram = self.spans[(name,)] = Histogram(len(LATENCY_BUCKETS))
+                histogram.observe(LATENCY_BUCKETS, seconds)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                'requests': [list(key) + [count] for key, count in self.requests.items()],
+                'latency': [list(key) + [h.counts[:], h.sum] for key, h in self.latency.items()],
+                'sizes': [list(key) + [h.counts[:], h.sum] for key, h in self.sizes.items()],
+                'spans': [list(key) + [h.counts[:], h.sum] for key, h in self.spans.items()],
+                'in_flight': dict(self.in_flight),
+            }
+
+
+def merge_snapshots(snapshots: Iterable[Dict]) -> Dict:
+    """Soma snapshots de vários processos em um só."""
+    requests: Dict[Tuple[str, ...], int] = {}
+    histograms = {'latency': {}, 'sizes': {}, 'spans': {}}
+    sizes = {'latency': len(LATENCY_BUCKETS), 'sizes': len(SIZE_BUCKETS), 'spans': len(LATENCY_BUCKETS)}
+    in_flight: Dict[str, int] = {}
+    for snapshot in snapshots:
+        for *labels, count in snapshot.get('requests', ()):
+            requests[tuple(labels)] = requests.get(tuple(labels), 0) + count
+        for name, merged in histograms.items():
+            for *labels, counts, total in snapshot.get(name, ()):
+                histogram = merged.get(tuple(labels))
+                if histogram is None:
+                    histogram = merged[tuple(labels)] = Histogram(sizes[name])
+                histogram.merge(counts, total)
+        for blueprint, count in snapshot.get('in_flight', {}).items():
+            in_flight[blueprint] = in_flight.get(blueprint, 0) + count
+    return {
+        'requests': [list(key) + [count] for key, count in requests.items()],
+        'latency': [list(key) + [h.counts, h.sum] for key, h in histograms['latency'].items()],
+        'sizes': [list(key) + [h.counts, h.sum] for key, h in histograms['sizes'].items()],
+        'spans': [list(key) + [h.counts, h.sum] for key, h in histograms['spans'].items()],
+        'in_flight': in_flight,
+    }
+
+
+# --- Formato texto do Prometheus ---------------------------------------------
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names: Tuple[str, ...], values) -> str:
+    return ','.join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+
+
+def _format_number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _render_histogram(lines: List[str], name: str, help_text: str, buckets, entries,
+                      names: Tuple[str, ...] = ('blueprint', 'endpoint', 'method')):
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} histogram')
+    for *labels, counts, total in sorted(entries, key=lambda entry: entry[:len(names)]):
+        base = _labels(names, labels)
+        cumulative = 0
+        for bound, count in zip(buckets, counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{base},le="{bound}"}} {cumulative}')
+        cumulative += counts[-1]
+        lines.append(f'{name}_bucket{{{base},le="+Inf"}} {cumulative}')
+        lines.append(f'{name}_sum{{{base}}} {_format_number(total)}')
+        lines.append(f'{name}_count{{{base}}} {cumulative}')
+
+
+def render(snapshot: Dict) -> str:
+    lines = [
+        '# HELP media_http_requests_total Requisições HTTP por endpoint, método e status.',
+        '# TYPE media_http_requests_total counter',
+    ]
+    names = ('blueprint', 'endpoint', 'method', 'status')
+    for *labels, count in sorted(snapshot['requests'], key=lambda entry: entry[:4]):
+        lines.append(f'media_http_requests_total{{{_labels(names, labels)}}} {count}')
+    _render_histogram(lines, 'media_http_request_duration_seconds',
+                      'Latência das requisições em segundos.', LATENCY_BUCKETS, snapshot['latency'])
+    _render_histogram(lines, 'media_http_response_size_bytes',
+                      'Tamanho do corpo das respostas em bytes (antes do middleware de compressão).', SIZE_BUCKETS, snapshot['sizes'])
+    _render_histogram(lines, 'media_span_duration_seconds',
+                      'Tempo por requisição em cada span dos serviços.', LATENCY_BUCKETS,
+                      snapshot.get('spans', ()), names=('span',))
+    lines.append('# HELP media_http_requests_in_flight Requisições em andamento por blueprint.')
+    lines.append('# TYPE media_http_requests_in_flight gauge')
+    for blueprint, count in sorted(snapshot['in_flight'].items()):
+        lines.append(f'media_http_requests_in_flight{{blueprint="{_escape(blueprint)}"}} {count}')
+    return '\n'.join(lines) + '\n'
+
+
+# --- Agregação entre workers -------------------------------------------------
+
+def _worker_path(directory: str, pid: int) -> str:
+    return os.path.join(directory, f'worker-{pid}.json')
+
+
+def _read_json(path: str) -> Optional[Dict]:
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def collect(metrics: RequestMetrics, directory: Optional[str] = METRICS_DIR) -> Dict:
+    """Snapshot do processo atual somado aos dos demais workers (e dos já encerrados)."""
+    own = metrics.snapshot()
+    if not directory or not os.path.isdir(directory):
+        return own
+    snapshots = [own]
+    for filename in os.listdir(directory):
+        if filename == RETIRED_FILE:
+            retired = _read_json(os.path.join(directory, filename))
+            if retired:
+                snapshots.append(dict(retired, in_flight={}))
+            continue
+        if not (filename.startswith('worker-') and filename.endswith('.json')):
+            continue
+        pid = int(filename[len('worker-'):-len('.json')])
+        if pid == os.getpid():
+            continue
+        snapshot = _read_json(os.path.join(directory, filename))
+        if snapshot:
+            if not _pid_alive(pid):
+                snapshot['in_flight'] = {}
+            snapshots.append(snapshot)
+    return merge_snapshots(snapshots)
+
+
+def retire_worker(pid: int, directory: Optional[str] = METRICS_DIR):
+    """Consolida os contadores de um worker encerrado em retired.json (hook child_exit)."""
+    if not directory:
+        return
+    path = _worker_path(directory, pid)
+    snapshot = _read_json(path)
+    if snapshot is None:
+        return
+    retired_path = os.path.join(directory, RETIRED_FILE)
+    merged = merge_snapshots([_read_json(retired_path) or {}, dict(snapshot, in_flight={})])
+    write_bytes_atomic(retired_path, json.dumps(merged).encode('utf-8'))
+    os.remove(path)
+
+
+class _Flusher:
+    """Thread que grava o snapshot do worker em MEDIA_METRICS_DIR; iniciada na 1ª requisição."""
+
+    def __init__(self, metrics: RequestMetrics, directory: Optional[str], interval: float):
+        self.metrics = metrics
+        self.directory = directory
+        self.interval = interval
+        self._pid = None
+
+    def ensure_running(self):
+        if not self.directory or self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        os.makedirs(self.directory, exist_ok=True)
+        threading.Thread(target=self._run, name='media-metrics-flush', daemon=True).start()
+
+    def flush(self):
+        data = json.dumps(self.metrics.snapshot()).encode('utf-8')
+        write_bytes_atomic(_worker_path(self.directory, os.getpid()), data)
+
+    def _run(self):
+        pid = os.getpid()
+        while self._pid == pid:
+            time.sleep(self.interval)
+            try:
+                self.flush()
+            except OSError as e:
+                get_logger('metrics').error("Erro ao gravar métricas do worker: %s", e)
+
+
+request_metrics = RequestMetrics()
+fork_hooks.register(request_metrics.reset_after_fork)
+_flusher = _Flusher(request_metrics, METRICS_DIR, FLUSH_INTERVAL)
+
+
+def flush_worker():
+    """Grava o snapshot final do worker (hook worker_exit), sem esperar o próximo intervalo."""
+    if METRICS_DIR and os.path.isdir(METRICS_DIR):
+        _flusher.flush()
+
+
+def init_app(app, metrics: RequestMetrics = request_metrics):
+    """Registra os hooks de instrumentação e a rota /metrics na aplicação."""
+    if not METRICS_ENABLED:
+        return
+
+    @app.before_request
+    def _metrics_start():
+        _flusher.ensure_running()
+        g._metrics_blueprint = request.blueprint or 'app'
+        g._metrics_start = time.perf_counter()
+        metrics.started(g._metrics_blueprint)
+
+    @app.after_request
+    def _metrics_observe(response):
+        start = g.get('_metrics_start')
+        if start is not None:
+            metrics.observe(g._metrics_blueprint, request.endpoint or 'unmatched', request.method,
+                            response.status_code, time.perf_counter() - start, response.content_length)
+        return response
+
+    @app.teardown_request
+    def _metrics_finish(exc):
+        blueprint = g.pop('_metrics_blueprint', None)
+        if blueprint is not None:
+            metrics.finished(blueprint)
+
+    @app.route('/metrics')
+    def prometheus_metrics():
+        """Métricas de requisições no formato texto do Prometheus"""
+        return Response(render(collect(metrics)), content_type=CONTENT_TYPE)
@@ -0,0 +1,114 @@
+"""
+Paginação por offset/cursor e streaming NDJSON para as listagens grandes do catálogo.
+"""
+import base64
+from collections.abc import Sequence
+from itertools import islice
+from typing import Iterable, Optional
+
+from flask import Response, current_app
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+class PaginationError(ValueError):
+    """Parâmetros de paginação inválidos."""
+
+
+class PageRequest:
+    """Janela solicitada pelo cliente (offset + limit) e modo de saída."""
+    __slots__ = ('offset', 'limit', 'stream')
+
+    def __init__(self, offset: int = 0, limit: Optional[int] = None, stream: bool = False):
+        self.offset = offset
+        self.limit = limit
+        self.stream = stream
+
+    @property
+    def cache_key(self) -> str:
+        return f"{self.offset}:{self.limit}"
+
+
+def encode_cursor(offset: int) -> str:
+    """Cursor opaco para a próxima página."""
+    return base64.urlsafe_b64encode(f"o:{offset}".encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        prefix, offset = raw.split(':', 1)
+        if prefix != 'o' or int(offset) < 0:
+            raise ValueError
+        return int(offset)
+    except ValueError:
+        raise PaginationError("Cursor inválido")
+
+
+def _parse_int(value: str, name: str, minimum: int = 0, maximum: Optional[int] = None) -> int:
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise PaginationError(f"Parâmetro '{name}' deve ser um inteiro")
+    if number < minimum or (maximum is not None and number > maximum):
+        limits = f"entre {minimum} e {maximum}" if maximum is not None else f"maior ou igual a {minimum}"
+        raise PaginationError(f"Parâmetro '{name}' deve estar {limits}")
+    return number
+
+
+def parse_page_request(args, accept_mimetypes=None) -> Optional[PageRequest]:
+    """
+    Lê limit/offset/cursor/format da query string.
+    Retorna None quando nenhum parâmetro foi enviado, mantendo a resposta completa legada.
+    """
+    stream = args.get('format') == 'ndjson' or bool(
+        accept_mimetypes and accept_mimetypes.best == NDJSON_MIMETYPE
+    )
+    if not stream and not any(name in args for name in ('limit', 'offset', 'cursor')):
+        return None
+
+    if 'cursor' in args:
+        offset = decode_cursor(args['cursor'])
+    else:
+        offset = _parse_int(args.get('offset', 0), 'offset')
+
+    limit = args.get('limit')
+    if limit is not None:
+        limit = _parse_int(limit, 'limit', minimum=1, maximum=MAX_LIMIT)
+    elif not stream:
+        limit = DEFAULT_LIMIT
+
+    return PageRequest(offset=offset, limit=limit, stream=stream)
+
+
+def paginate(items: list, page: PageRequest):
+    """Retorna (itens da página, cursor da próxima página ou None)."""
+    end = len(items) if page.limit is None else page.offset + page.limit
+    next_cursor = encode_cursor(end) if end < len(items) else None
+    return items[page.offset:end], next_cursor
+
+
+def iter_page(records: Iterable, page: PageRequest) -> Iterable:
+    """
+    Registros da janela, sob demanda. Em sequências (lista ou RecordView do catálogo mapeado)
+    o acesso é por posição, sem decodificar os registros anteriores ao offset.
+    """
+    stop = None if page.limit is None else page.offset + page.limit
+    if isinstance(records, Sequence):
+        return (records[i] for i in range(*slice(page.offset, stop).indices(len(records))))
+    return islice(records, page.offset, stop)
+
+
+def ndjson_response(records: Iterable, page: PageRequest = None, headers: dict = None) -> Response:
+    """Resposta em streaming, um registro JSON por linha, gerada sob demanda."""
+    if page is not None:
+        records = iter_page(records, page)
+    provider = current_app.json
+
+    def generate():
+        for record in records:
+            yield provider.dumps(record) + "\n"
+
+    return Response(generate(), mimetype=NDJSON_MIMETYPE, headers=headers)
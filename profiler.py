@@ -0,0 +1,150 @@
+"""
+Profiler por amostragem para o worker em produção, acionado pelo endpoint administrativo.
+
+Uma thread lê a pilha das threads que estão atendendo requisições (sys._current_frames) a
+cada `interval` segundos, por N segundos ou até N requisições terminarem. O resultado sai no
+formato "collapsed stacks" (uma linha por pilha: `quadro;quadro;quadro contagem`), aceito por
+flamegraph.pl, speedscope e inferno. Threads ociosas do servidor não entram na amostra, só as
+que estão dentro de uma requisição (registradas pelos hooks de init_app).
+
+Fora de uma sessão os hooks só testam um booleano, e uma sessão por worker roda de cada vez.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+import fork_hooks
+
+DEFAULT_INTERVAL = 0.005
+MAX_SECONDS = float(os.environ.get('MEDIA_PROFILE_MAX_SECONDS', 60))
+
+
+class ProfilerBusy(RuntimeError):
+    """Já existe uma sessão de profiling em andamento neste worker."""
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def collapse_stack(frame) -> str:
+    """Pilha da raiz até o quadro atual, no formato collapsed."""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return ';'.join(labels)
+
+
+class SamplingProfiler:
+    """Amostrador de pilhas das threads em requisição."""
+
+    def __init__(self):
+        self.active = False
+        self._session_lock = threading.Lock()
+        self._threads_lock = threading.Lock()
+        self._request_threads: Dict[int, int] = {}
+        self._finished = 0
+        self._done = threading.Event()
+        self._target_requests: Optional[int] = None
+
+    # --- Hooks de requisição -------------------------------------------------
+
+    def request_started(self):
+        if self.active:
+            ident = threading.get_ident()
+            with self._threads_lock:
+                self._request_threads[ident] = self._request_threads.get(ident, 0) + 1
+
+    def request_finished(self):
+        if self.active:
+            ident = threading.get_ident()
+            with self._threads_lock:
+                depth = self._request_threads.pop(ident, 0) - 1
+                if depth > 0:
+                    self._request_threads[ident] = depth
+                self._finished += 1
+                if self._target_requests is not None and self._finished >= self._target_requests:
+                    self._done.set()
+
+    # --- Sessão --------------------------------------------------------------
+
+    def profile(self, seconds: Optional[float] = None, requests: Optional[int] = None,
+                interval: float = DEFAULT_INTERVAL) -> Dict:
+        """
+        Amostra por `seconds` segundos ou até `requests` requisições terminarem (limitado a
+        MEDIA_PROFILE_MAX_SECONDS). Bloqueia a thread chamadora durante a sessão.
+        """
+        if not self._session_lock.acquire(blocking=False):
+            raise ProfilerBusy("já existe uma sessão de profiling em andamento neste worker")
+        try:
+            limit = min(seconds if seconds else MAX_SECONDS, MAX_SECONDS)
+            stacks: Counter = Counter()
+            self._finished = 0
+            self._target_requests = requests
+            self._done.clear()
+            own = threading.get_ident()
+            with self._threads_lock:
+                self._request_threads.clear()
+            self.active = True
+
+            started = time.perf_counter()
+            deadline = started + limit
+            samples = 0
+            while not self._done.is_set() and time.perf_counter() < deadline:
+                with self._threads_lock:
+                    idents = [ident for ident in self._request_threads if ident != own]
+                if idents:
+                    frames = sys._current_frames()
+                    for ident in idents:
+                        frame = frames.get(ident)
+                        if frame is not None:
+                            stacks[collapse_stack(frame)] += 1
+                    samples += 1
+                self._done.wait(interval)
+            elapsed = time.perf_counter() - started
+        finally:
+            self.active = False
+            self._target_requests = None
+            self._session_lock.release()
+
+        return {
+            'pid': os.getpid(),
+            'seconds': round(elapsed, 3),
+            'interval_ms': interval * 1000,
+            'samples': samples,
+            'requests': self._finished,
+            'stacks': stacks,
+        }
+
+    def reset_after_fork(self):
+        self.__init__()
+
+
+def render_collapsed(stacks: Counter) -> str:
+    return ''.join(f'{stack} {count}\n' for stack, count in stacks.most_common())
+
+
+def top_functions(stacks: Counter, limit: int = 20):
+    """Funções mais vistas no topo da pilha (tempo próprio), para a saída JSON."""
+    own: Counter = Counter()
+    for stack, count in stacks.items():
+        own[stack.rsplit(';', 1)[-1]] += count
+    total = sum(own.values()) or 1
+    return [{'function': name, 'samples': count, 'percent': round(100 * count / total, 1)}
+            for name, count in own.most_common(limit)]
+
+
+sampling_profiler = SamplingProfiler()
+fork_hooks.register(sampling_profiler.reset_after_fork)
+
+
+def init_app(app, profiler: SamplingProfiler = sampling_profiler):
+    """Registra os hooks que marcam as threads em requisição durante uma sessão."""
+    app.before_request(profiler.request_started)
+    app.teardown_request(lambda exc: profiler.request_finished())
@@ -0,0 +1,110 @@
+"""
+Cache de respostas JSON pré-serializadas para os endpoints de catálogo (somente leitura).
+Guarda os bytes já codificados, e as variantes gzip/brotli, por versão do catálogo.
+"""
+import gzip
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from flask import Response, current_app, request
+
+import fork_hooks
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional; sem ele servimos apenas gzip/identity
+    brotli = None
+
+_DEFAULT_MAX_AGE = int(os.environ.get('MEDIA_CATALOG_MAX_AGE', 300))
+
+
+class CachedPayload:
+    """Corpo JSON codificado e suas variantes comprimidas."""
+    __slots__ = ('version', 'body', 'gzip_body', 'br_body', 'etag')
+
+    def __init__(self, version: str, body: bytes):
+        self.version = version
+        self.body = body
+        self.gzip_body = gzip.compress(body, compresslevel=9, mtime=0)
+        self.br_body = brotli.compress(body, quality=11) if brotli else None
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+
+    def select(self, accept_encodings):
+        """Escolhe a melhor codificação aceita pelo cliente."""
+        if self.br_body is not None and accept_encodings['br']:
+            return 'br', self.br_body
+        if accept_encodings['gzip']:
+            return 'gzip', self.gzip_body
+        return None, self.body
+
+
+class ResponseCache:
+    """LRU de respostas JSON indexadas por chave e versão do catálogo."""
+
+    def __init__(self, max_entries: int = 256, max_age: int = _DEFAULT_MAX_AGE):
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, version: str) -> Optional[CachedPayload]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.version != version:
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, entry: CachedPayload):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def reset_lock(self):
+        """Recria o lock no processo filho após um fork."""
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def cached_json(self, key: str, version: Optional[str], builder: Callable) -> Optional[Response]:
+        """
+        Retorna a resposta JSON em cache para (key, version).
+        `builder()` monta o payload em caso de miss; se retornar None a resposta não é
+        cacheada e o chamador deve produzir o próprio erro.
+        """
+        entry = self.get(key, version) if version is not None else None
+        if entry is None:
+            payload = builder()
+            if payload is None:
+                return None
+            body = current_app.json.response(payload).get_data()
+            entry = CachedPayload(version, body)
+            if version is not None:
+                self.put(key, entry)
+        return self._make_response(entry)
+
+    def _make_response(self, entry: CachedPayload) -> Response:
+        headers = {
+            'ETag': f'"{entry.etag}"',
+            'Cache-Control': f'public, max-age={self.max_age}',
+            'Vary': 'Accept-Encoding',
+        }
+        if request.if_none_match.contains(entry.etag):
+            return Response(status=304, headers=headers)
+
+        encoding, body = entry.select(request.accept_encodings)
+        if encoding:
+            headers['Content-Encoding'] = encoding
+        return Response(body, mimetype=current_app.json.mimetype, headers=headers)
+
+
+# Instância compartilhada pelos blueprints de catálogo
+catalog_cache = ResponseCache()
+fork_hooks.register(catalog_cache.reset_lock)
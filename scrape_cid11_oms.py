@@ -5,12 +5,16 @@ import time
 import re
 from urllib.parse import urljoin
 
+from media_logging import configure_logging, get_logger
+
+logger = get_logger('cid11')
+
 def scrape_cid11_oms():
     """Faz scraping do site da OMS para obter doenças do CID-11"""
     
     base_url = "https://icd.who.int/browse/2024-01/mms/pt"
     
-    print("🌐 Conectando ao site da OMS...")
+    logger.info("🌐 Conectando ao site da OMS...")
     
     try:
         # Fazer requisição inicial
@@ -21,7 +25,7 @@ def scrape_cid11_oms():
         response = requests.get(base_url, headers=headers, timeout=30)
         response.raise_for_status()
         
-        print("✅ Conexão estabelecida com sucesso!")
+        logger.info("✅ Conexão estabelecida com sucesso!")
         
         # Parsear o HTML
         soup = BeautifulSoup(response.content, 'html.parser')
@@ -37,7 +41,7 @@ def scrape_cid11_oms():
         links = soup.find_all('a', href=True)
         elementos_texto = soup.find_all(['span', 'div', 'li'], class_=re.compile(r'.*disease.*|.*condition.*|.*code.*', re.I))
         
-        print(f"🔍 Encontrados {len(links)} links e {len(elementos_texto)} elementos de texto")
+        logger.info("🔍 Encontrados %d links e %d elementos de texto", len(links), len(elementos_texto))
         
         # Processar links que podem conter doenças
         for link in links:
@@ -54,7 +58,7 @@ def scrape_cid11_oms():
                             "categoria": "CID-11 - OMS"
                         }
                         doencas.append(doenca)
-                        print(f"📋 Encontrada: {codigo} - {texto}")
+                        logger.debug("📋 Encontrada: %s - %s", codigo, texto, extra={'sample': 50})
         
         # Processar elementos de texto
         for elemento in elementos_texto:
@@ -70,11 +74,11 @@ def scrape_cid11_oms():
                             "categoria": "CID-11 - OMS"
                         }
                         doencas.append(doenca)
-                        print(f"📋 Encontrada: {codigo} - {texto}")
+                        logger.debug("📋 Encontrada: %s - %s", codigo, texto, extra={'sample': 50})
         
         # Se não encontrou muitas doenças, vamos tentar uma abordagem diferente
         if len(doencas) < 10:
-            print("🔄 Tentando abordagem alternativa...")
+            logger.info("🔄 Tentando abordagem alternativa...")
             
             # Procurar por qualquer texto que possa ser uma doença
             todos_textos = soup.get_text()
@@ -100,11 +104,11 @@ def scrape_cid11_oms():
                                 "categoria": "CID-11 - OMS"
                             }
                             doencas.append(doenca)
-                            print(f"📋 Encontrada: {codigo} - {nome}")
+                            logger.debug("📋 Encontrada: %s - %s", codigo, nome, extra={'sample': 50})
         
         # Adicionar doenças comuns do CID-11 se não encontrou muitas
         if len(doencas) < 50:
-            print("📝 Adicionando doenças comuns do CID-11...")
+            logger.info("📝 Adicionando doenças comuns do CID-11...")
             
             doencas_cid11_comuns = [
                 {"nome": "Diabetes mellitus tipo 1", "cid": "5A10.0", "categoria": "Doenças endócrinas"},
@@ -231,16 +235,15 @@ def scrape_cid11_oms():
         with open('doencas_cache_cid11.json', 'w', encoding='utf-8') as f:
             json.dump(cache_data, f, ensure_ascii=False, indent=2)
         
-        print(f"✅ Scraping concluído com sucesso!")
-        print(f"📊 Total de doenças CID-11: {len(doencas_unicas)}")
-        print(f"⏰ Última atualização: {time.strftime('%d/%m/%Y %H:%M:%S', time.localtime(cache_data['last_update']))}")
-        print(f"💾 Arquivo salvo: doencas_cache_cid11.json")
+        logger.info("✅ Scraping concluído: %d doenças CID-11 salvas em doencas_cache_cid11.json",
+                    len(doencas_unicas), extra={'last_update': cache_data['last_update']})
         
         return doencas_unicas
         
     except Exception as e:
-        print(f"❌ Erro durante o scraping: {str(e)}")
+        logger.error("❌ Erro durante o scraping: %s", e)
         return []
 
 if __name__ == "__main__":
+    configure_logging()
     scrape_cid11_oms() 
\ No newline at end of file
@@ -0,0 +1,134 @@
+"""
+Registro de serviços com construção preguiçosa (no primeiro uso) e thread-safe.
+
+Os serviços (CIDCategorizer, DiagnosticEngine, ...) montam bases grandes em memória no
+construtor. Registrá-los aqui adia esse custo até a primeira requisição que precisar deles,
+de modo que um worker que só atende o catálogo não paga pelos demais.
+
+Com gunicorn --preload, definir MEDIA_PRELOAD_SERVICES=1 constrói todos os serviços no
+processo mestre (preload_services) antes do fork; os workers compartilham essas páginas
+via copy-on-write.
+"""
+import gc
+import importlib
+import os
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+import fork_hooks
+
+Factory = Union[str, Callable[[], object]]
+
+
+def _resolve(factory: Factory) -> Callable[[], object]:
+    """Aceita um callable ou o caminho 'modulo:Classe' (importado só na construção)."""
+    if callable(factory):
+        return factory
+    module_name, _, attr = factory.partition(':')
+    return getattr(importlib.import_module(module_name), attr)
+
+
+class ServiceRegistry:
+    """Constrói cada serviço uma única vez por processo, sob demanda."""
+
+    def __init__(self):
+        self._factories: Dict[str, Factory] = {}
+        self._instances: Dict[str, object] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._registry_lock = threading.Lock()
+
+    def register(self, name: str, factory: Factory) -> 'LazyService':
+        """Registra a fábrica do serviço e retorna um proxy preguiçoso para ele."""
+        with self._registry_lock:
+            self._factories[name] = factory
+            self._locks.setdefault(name, threading.Lock())
+        return LazyService(self, name)
+
+    def get(self, name: str):
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        with self._locks[name]:
+            instance = self._instances.get(name)
+            if instance is None:
+                # Se a construção falhar nada fica em cache; a próxima chamada tenta de novo
+                instance = self.factory(name)()
+                self._instances[name] = instance
+        return instance
+
+    def factory(self, name: str) -> Callable[[], object]:
+        """Fábrica do serviço já resolvida (importa o módulo, sem construir o serviço)."""
+        return _resolve(self._factories[name])
+
+    def reset_locks(self):
+        """Recria os locks no processo filho após um fork (podem ter sido copiados travados)."""
+        self._registry_lock = threading.Lock()
+        self._locks = {name: threading.Lock() for name in self._locks}
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._instances
+
+    def status(self) -> Dict[str, bool]:
+        return {name: self.is_loaded(name) for name in self._factories}
+
+    def preload(self, names: Optional[Iterable[str]] = None):
+        """Constrói os serviços indicados (todos, por padrão)."""
+        for name in (names if names is not None else list(self._factories)):
+            self.get(name)
+
+    def rebuild(self) -> List[str]:
+        """
+        Reconstrói os serviços já carregados (após troca de snapshot/tabelas) e troca a
+        referência de cada um. A construção ocorre fora do caminho da requisição; chamadas em
+        andamento terminam na instância anterior. Estado em memória que precise sobreviver
+        (ex.: CIDs personalizados) é transferido por `adopt_state(anterior)`, se existir.
+        """
+        rebuilt = []
+        for name in list(self._instances):
+            previous = self._instances[name]
+            instance = self.factory(name)()
+            if hasattr(instance, 'adopt_state'):
+                instance.adopt_state(previous)
+            with self._locks[name]:
+                self._instances[name] = instance
+            rebuilt.append(name)
+        return rebuilt
+
+
+class LazyService:
+    """Proxy que repassa atributos ao serviço, construindo-o no primeiro acesso."""
+    __slots__ = ('_registry', '_name')
+
+    def __init__(self, registry: ServiceRegistry, name: str):
+        object.__setattr__(self, '_registry', registry)
+        object.__setattr__(self, '_name', name)
+
+    def __getattr__(self, attr):
+        return getattr(self._registry.get(self._name), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._registry.get(self._name), attr, value)
+
+    def __repr__(self):
+        state = 'carregado' if self._registry.is_loaded(self._name) else 'não carregado'
+        return f"<LazyService {self._name} ({state})>"
+
+
+registry = ServiceRegistry()
+fork_hooks.register(registry.reset_locks)
+
+
+def preload_enabled() -> bool:
+    return os.environ.get('MEDIA_PRELOAD_SERVICES', '').lower() in ('1', 'true', 'yes')
+
+
+def preload_services():
+    """
+    Constrói todos os serviços registrados no processo atual (mestre do gunicorn --preload)
+    e congela os objetos sobreviventes, para que as coletas do GC nos workers não
+    toquem essas páginas e quebrem o compartilhamento copy-on-write.
+    """
+    registry.preload()
+    gc.collect()
+    if hasattr(gc, 'freeze'):
+        gc.freeze()
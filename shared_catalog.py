@@ -0,0 +1,190 @@
+"""
+Catálogo somente leitura em arquivo mapeado em memória (mmap), compartilhado entre os workers.
+
+O arquivo é um artefato de build (como catalog_snapshot.pickle), e todos os workers mapeiam o
+mesmo arquivo. As páginas ficam no page cache do sistema e são compartilhadas, em vez de cada
+worker manter sua própria cópia das listas e dos índices. Os registros só viram dict quando
+acessados, e as buscas por código fazem busca binária sobre as chaves gravadas no mapeamento.
+
+Layout (inteiros u32 na ordem de bytes nativa, registrada no cabeçalho):
+    MAGIC | formato (u8) | 3 bytes | tamanho do meta (u32) | meta JSON | seções | blob
+    - tabela:            count × (offset, tamanho) do registro JSON no blob
+    - índice por código: count × (offset, tamanho da chave no blob, posição), ordenado pela chave
+    - índice por grupo:  posições (u32) de cada grupo, contíguas; faixas descritas no meta
+"""
+import json
+import mmap
+import sys
+from array import array
+from collections.abc import Sequence
+from typing import Dict, List, Optional
+
+from catalog_store import write_bytes_atomic
+
+try:
+    import orjson
+    _loads = orjson.loads  # aceita memoryview sem cópia intermediária
+except ImportError:
+    orjson = None
+
+    def _loads(data):
+        return json.loads(bytes(data))
+
+SHARED_MAGIC = b'MEDIASHM'
+SHARED_FORMAT = 1
+_PREFIX_SIZE = len(SHARED_MAGIC) + 8
+
+
+class RecordView(Sequence):
+    """Sequência de registros decodificados sob demanda a partir do mapeamento."""
+
+    def __init__(self, catalog: 'SharedCatalog', spans: memoryview):
+        self._catalog = catalog
+        self._spans = spans
+        self._count = len(spans) // 2
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        offset = self._spans[2 * index]
+        return _loads(self._catalog.blob[offset:offset + self._spans[2 * index + 1]])
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self[i]
+
+
+class CodeIndex:
+    """Índice chave -> posição com busca binária sobre as chaves no mapeamento."""
+
+    def __init__(self, catalog: 'SharedCatalog', entries: memoryview):
+        self._catalog = catalog
+        self._entries = entries
+        self._count = len(entries) // 3
+
+    def __len__(self):
+        return self._count
+
+    def _key(self, i: int) -> memoryview:
+        offset = self._entries[3 * i]
+        return self._catalog.blob[offset:offset + self._entries[3 * i + 1]]
+
+    def get(self, key: str, default=None):
+        target = key.encode('utf-8')
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if bytes(self._key(mid)) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._count and self._key(lo) == target:
+            return self._entries[3 * lo + 2]
+        return default
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+
+class GroupIndex:
+    """Índice grupo (letra) -> posições, como fatia do mapeamento."""
+
+    def __init__(self, positions: memoryview, ranges: Dict[str, List[int]]):
+        self._positions = positions
+        self._ranges = ranges
+
+    def get(self, group: str, default=()):
+        bounds = self._ranges.get(group)
+        if bounds is None:
+            return default
+        start, count = bounds
+        return self._positions[start:start + count]
+
+    def keys(self):
+        return self._ranges.keys()
+
+    def items(self):
+        return ((group, self.get(group)) for group in self._ranges)
+
+
+class SharedCatalog:
+    """Abre o arquivo com mmap (somente leitura) e expõe tabelas e índices sem cópia."""
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buf = memoryview(self._mmap)
+        if len(buf) < _PREFIX_SIZE or buf[:len(SHARED_MAGIC)] != SHARED_MAGIC or buf[len(SHARED_MAGIC)] != SHARED_FORMAT:
+            raise ValueError(f"{path}: formato de catálogo compartilhado incompatível")
+        meta_len = int.from_bytes(buf[_PREFIX_SIZE - 4:_PREFIX_SIZE], sys.byteorder)
+        self.meta = json.loads(bytes(buf[_PREFIX_SIZE:_PREFIX_SIZE + meta_len]))
+        if self.meta['byteorder'] != sys.byteorder:
+            raise ValueError(f"{path}: gerado em máquina com outra ordem de bytes")
+
+        base = _PREFIX_SIZE + meta_len
+        base += -base % 8
+        blob_offset, blob_len = self.meta['blob']
+        self.blob = buf[base + blob_offset:base + blob_offset + blob_len]
+        u32 = lambda offset, count: buf[base + offset:base + offset + 4 * count].cast('I')
+
+        self.tables = {name: RecordView(self, u32(offset, 2 * count))
+                       for name, (offset, count) in self.meta['tables'].items()}
+        self.indexes = {}
+        for name, (offset, count) in self.meta['code_indexes'].items():
+            self.indexes[name] = CodeIndex(self, u32(offset, 3 * count))
+        for name, spec in self.meta['group_indexes'].items():
+            self.indexes[name] = GroupIndex(u32(spec['offset'], spec['count']), spec['ranges'])
+
+
+def write_shared_catalog(path: str, tables: Dict[str, list], indexes: Dict[str, dict], meta: Optional[Dict] = None):
+    """
+    Serializa tabelas e índices no layout acima, de forma atômica.
+    Índices cujos valores são posições (int) viram índices por código; os de listas de
+    posições viram índices por grupo. Offsets no meta são relativos ao início das seções.
+    """
+    blob = bytearray()
+
+    def put(data: bytes):
+        offset = len(blob)
+        blob.extend(data)
+        return offset, len(data)
+
+    layout = dict(meta or {}, byteorder=sys.byteorder, tables={}, code_indexes={}, group_indexes={})
+    sections = bytearray()
+
+    for name, records in tables.items():
+        spans = array('I')
+        for record in records:
+            spans.extend(put(json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode('utf-8')))
+        layout['tables'][name] = [len(sections), len(records)]
+        sections.extend(spans.tobytes())
+
+    for name, index in indexes.items():
+        if all(isinstance(value, int) for value in index.values()):
+            entries = array('I')
+            for key in sorted(index, key=lambda k: k.encode('utf-8')):
+                entries.extend(put(key.encode('utf-8')) + (index[key],))
+            layout['code_indexes'][name] = [len(sections), len(index)]
+            sections.extend(entries.tobytes())
+        else:
+            positions = array('I')
+            ranges = {}
+            for group, group_positions in index.items():
+                ranges[group] = [len(positions), len(group_positions)]
+                positions.extend(group_positions)
+            layout['group_indexes'][name] = {'offset': len(sections), 'count': len(positions), 'ranges': ranges}
+            sections.extend(positions.tobytes())
+
+    layout['blob'] = [len(sections), len(blob)]
+    meta_bytes = json.dumps(layout, ensure_ascii=False).encode('utf-8')
+    header = bytearray(SHARED_MAGIC + bytes([SHARED_FORMAT, 0, 0, 0]) + len(meta_bytes).to_bytes(4, sys.byteorder))
+    header.extend(meta_bytes)
+    header.extend(b'\0' * (-len(header) % 8))
+    write_bytes_atomic(path, bytes(header + sections + blob))
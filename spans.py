@@ -0,0 +1,155 @@
+"""
+Spans de tempo nos trechos quentes das rotas e dos serviços (varredura do catálogo, extração de
+sintomas, pontuação, ordenação, geração de relatórios).
+
+Uso:
+    with span('diagnostic.probability'):
+        ...
+
+    @timed('interactions.check')
+    def check_interactions(self, medications): ...
+
+Durante uma requisição (init_app), os tempos são somados por nome de span. Ao final eles
+alimentam o histograma media_span_duration_seconds do /metrics e, quando pedido, o
+cabeçalho Server-Timing da resposta. Esse cabeçalho aparece nas DevTools do navegador e é
+enviado com MEDIA_SERVER_TIMING=1 ou quando a requisição traz X-Debug-Timing: 1. Fora de
+uma requisição (scripts, testes) os spans não registram nada.
+
+O dicionário da requisição também é alcançado pelas threads a que ela repassa o contexto
+(comprehensive_analysis roda etapas em paralelo com contextvars.copy_context), por isso as
+somas são feitas sob um lock.
+
+MEDIA_SPANS=0 desliga tudo: @timed devolve a função original e span() um contexto vazio.
+"""
+import os
+import threading
+import time
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, Dict, List, Optional
+
+import fork_hooks
+
+SPANS_ENABLED = os.environ.get('MEDIA_SPANS', '1').lower() not in ('0', 'false', 'no')
+SERVER_TIMING = os.environ.get('MEDIA_SERVER_TIMING', '').lower() in ('1', 'true', 'yes')
+
+# nome -> [segundos acumulados, chamadas] da requisição atual
+_current: ContextVar[Optional[Dict[str, List[float]]]] = ContextVar('media_spans', default=None)
+_lock = threading.Lock()
+
+
+@fork_hooks.register
+def _reset_after_fork():
+    global _lock
+    _lock = threading.Lock()
+
+
+class _Span:
+    __slots__ = ('name', 'spans', 'start')
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.spans = _current.get()
+        if self.spans is not None:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.spans is not None:
+            elapsed = time.perf_counter() - self.start
+            with _lock:
+                entry = self.spans.get(self.name)
+                if entry is None:
+                    entry = self.spans[self.name] = [0.0, 0]
+                entry[0] += elapsed
+                entry[1] += 1
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def span(name: str):
+    """Context manager que soma o tempo do bloco ao span `name` da requisição atual."""
+    return _Span(name) if SPANS_ENABLED else _NOOP
+
+
+def timed(name: str) -> Callable[[Callable], Callable]:
+    """Decorator equivalente a envolver o corpo da função em span(name)."""
+    def decorator(func):
+        if not SPANS_ENABLED:
+            return func
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with _Span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def begin():
+    """Inicia a coleta para a requisição (ou tarefa) atual; retorna o token para end()."""
+    return _current.set({})
+
+
+def end(token) -> Dict[str, List[float]]:
+    """Encerra a coleta e retorna {nome: [segundos, chamadas]}."""
+    spans = _current.get() or {}
+    _current.reset(token)
+    # Cópia: uma thread auxiliar que ainda não terminou não altera o que já foi publicado
+    with _lock:
+        return {name: entry[:] for name, entry in spans.items()}
+
+
+def server_timing(spans: Dict[str, List[float]]) -> str:
+    """Valor do cabeçalho Server-Timing (durações em ms)."""
+    parts = []
+    for name, (seconds, calls) in sorted(spans.items(), key=lambda item: -item[1][0]):
+        part = f'{name};dur={seconds * 1000:.2f}'
+        if calls > 1:
+            part += f';desc="{int(calls)}x"'
+        parts.append(part)
+    return ', '.join(parts)
+
+
+def init_app(app, metrics=None):
+    """Coleta os spans de cada requisição, publica no /metrics e no Server-Timing."""
+    if not SPANS_ENABLED:
+        return
+    from flask import g, request
+
+    @app.before_request
+    def _spans_begin():
+        g._spans_token = begin()
+
+    @app.after_request
+    def _spans_end(response):
+        token = g.pop('_spans_token', None)
+        if token is None:
+            return response
+        spans = end(token)
+        if spans:
+            if metrics is not None:
+                metrics.observe_spans(spans)
+            if SERVER_TIMING or request.headers.get('X-Debug-Timing') == '1':
+                response.headers['Server-Timing'] = server_timing(spans)
+        return response
+
+    @app.teardown_request
+    def _spans_discard(exc):
+        token = g.pop('_spans_token', None)
+        if token is not None:
+            end(token)
@@ -0,0 +1,85 @@
+from flask import Blueprint, Response, request, jsonify
+from functools import wraps
+import hmac
+import os
+
+from hot_reload import ReloadError, reloader
+from profiler import ProfilerBusy, render_collapsed, sampling_profiler, top_functions
+
+admin_bp = Blueprint('admin', __name__)
+
+def admin_token():
+    """Token administrativo; sem MEDIA_ADMIN_TOKEN definido as rotas de admin ficam desativadas"""
+    return os.environ.get('MEDIA_ADMIN_TOKEN', '')
+
+def requer_token_admin(view):
+    """Exige o token no cabeçalho X-Admin-Token (ou Authorization: Bearer <token>)"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        token = admin_token()
+        if not token:
+            return jsonify({"success": False, "error": "Rotas administrativas desativadas"}), 404
+
+        enviado = request.headers.get('X-Admin-Token', '')
+        auth = request.headers.get('Authorization', '')
+        if not enviado and auth.startswith('Bearer '):
+            enviado = auth[len('Bearer '):]
+        if not hmac.compare_digest(enviado.encode(), token.encode()):
+            return jsonify({"success": False, "error": "Token administrativo inválido"}), 401
+        return view(*args, **kwargs)
+    return wrapper
+
+@admin_bp.route('/reload', methods=['POST'])
+@requer_token_admin
+def reload_knowledge():
+    """
+    Recompila catálogo e base de conhecimento e troca os dados neste worker, regravando os
+    artefatos compilados em disco. Os demais workers veem os artefatos novos pela thread de
+    observação (MEDIA_RELOAD_INTERVAL, ativa por padrão no gunicorn.conf.py e no asgi.py) e
+    trocam os seus em até um intervalo.
+    """
+    force = request.args.get('force', '1') != '0'
+    try:
+        status = reloader.reload(force=force, persist=True)
+        return jsonify({"success": True, **status})
+    except ReloadError as e:
+        return jsonify({
+            "success": False,
+            "error": f"Recarga rejeitada, dados anteriores mantidos: {str(e)}"
+        }), 422
+
+@admin_bp.route('/reload/status', methods=['GET'])
+@requer_token_admin
+def reload_status():
+    """Geração atual dos dados carregados neste worker"""
+    return jsonify({"success": True, "pid": os.getpid(), **reloader.status()})
+
+@admin_bp.route('/profile', methods=['POST'])
+@requer_token_admin
+def profile_worker():
+    """
+    Profiling por amostragem deste worker: ?seconds=N ou ?requests=N (próximas N requisições),
+    &interval_ms=5. Retorna collapsed stacks (flamegraph.pl, speedscope) ou, com format=json,
+    as funções com mais amostras.
+    """
+    try:
+        seconds = float(request.args['seconds']) if 'seconds' in request.args else None
+        requests_count = int(request.args['requests']) if 'requests' in request.args else None
+        interval = float(request.args.get('interval_ms', 5)) / 1000
+    except ValueError:
+        return jsonify({"success": False, "error": "Parâmetros seconds, requests e interval_ms devem ser numéricos"}), 400
+    if seconds is None and requests_count is None:
+        seconds = 10.0
+    if (seconds is not None and seconds <= 0) or (requests_count is not None and requests_count <= 0) or interval <= 0:
+        return jsonify({"success": False, "error": "Parâmetros devem ser positivos"}), 400
+
+    try:
+        result = sampling_profiler.profile(seconds=seconds, requests=requests_count, interval=interval)
+    except ProfilerBusy as e:
+        return jsonify({"success": False, "error": str(e)}), 409
+
+    stacks = result.pop('stacks')
+    if request.args.get('format') == 'json':
+        return jsonify({"success": True, **result, "top": top_functions(stacks)})
+    headers = {f'X-Profile-{key.replace("_", "-").title()}': str(value) for key, value in result.items()}
+    return Response(render_collapsed(stacks), mimetype='text/plain', headers=headers)
@@ -1,35 +1,47 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
 import requests
 from bs4 import BeautifulSoup
 import os
-import json
 import time
-import re
+import catalog_snapshot
+from catalog_snapshot import get_snapshot
+from catalog_refresh import schedule_refresh
+from catalog_store import save_catalog
+from response_cache import catalog_cache
+from pagination import PaginationError, parse_page_request, paginate, ndjson_response
+from media_logging import get_logger
+from spans import timed
 
 # Definição do blueprint
 disease_bp = Blueprint('disease', __name__)
+logger = get_logger('datasus')
 
-_DOENCAS_CACHE_FILE = 'doencas_cache.json'
 _DOENCAS_UPDATE_INTERVAL = 24 * 60 * 60  # 24 horas
 _doencas_last_update = 0
 
 def carregar_doencas_local():
     global _doencas_last_update
-    if os.path.exists(_DOENCAS_CACHE_FILE):
-        try:
-            with open(_DOENCAS_CACHE_FILE, encoding='utf-8') as f:
-                data = json.load(f)
-                _doencas_last_update = data.get('last_update', 0)
-                return data.get('doencas', [])
-        except Exception:
-            return []
-    return []
+    try:
+        snapshot = get_snapshot()
+    except Exception:
+        return []
+    if not snapshot.has_doencas:
+        return []
+    _doencas_last_update = snapshot.last_update or 0
+    return snapshot.doencas
+
+def versao_doencas_local():
+    """Token barato da versão do cache em disco (mtime + tamanho), sem parsear o JSON."""
+    try:
+        st = os.stat(catalog_snapshot.DOENCAS_PATH)
+    except OSError:
+        return None
+    return f"{st.st_mtime_ns:x}-{st.st_size:x}"
 
 def salvar_doencas_local(doencas):
     global _doencas_last_update
-    _doencas_last_update = int(time.time())
-    with open(_DOENCAS_CACHE_FILE, 'w', encoding='utf-8') as f:
-        json.dump({'doencas': doencas, 'last_update': _doencas_last_update}, f, ensure_ascii=False)
+    header = save_catalog(catalog_snapshot.DOENCAS_PATH, doencas)
+    _doencas_last_update = header['last_update']
 
 def scraping_doencas():
     """Faz scraping das doenças do Datasus - Tabela 2"""
@@ -37,19 +49,19 @@ def scraping_doencas():
     headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"}
     
     try:
-        print("Iniciando scraping do Datasus...")
+        logger.info("Iniciando scraping do Datasus")
         response = requests.get(url, timeout=30, headers=headers)
         response.encoding = 'latin1'
         soup = BeautifulSoup(response.text, 'html.parser')
         tables = soup.find_all('table')
         
-        print(f'Encontradas {len(tables)} tabelas no HTML do Datasus')
+        logger.debug('Encontradas %d tabelas no HTML do Datasus', len(tables))
         
         # Usar a Tabela 2 (índice 1) que contém as doenças
         if len(tables) > 1:
             table = tables[1]  # Tabela 2
             rows = table.find_all('tr')
-            print(f'Tabela 2 tem {len(rows)} linhas')
+            logger.debug('Tabela 2 tem %d linhas', len(rows))
             
             doencas = []
             for i, row in enumerate(rows[1:], 1):  # Pular cabeçalho
@@ -110,39 +122,69 @@ def scraping_doencas():
                             'categoria': categoria
                         }
                         doencas.append(doenca)
-                        
-                        if i <= 10:  # Mostrar apenas as primeiras 10 para debug
-                            print(f"Linha {i}: {codigo_seq} - {nome_doenca} ({cid}) - {categoria}")
-            
-            print(f"Total de doenças extraídas: {len(doencas)}")
+                        # Uma linha por doença só em DEBUG, e amostrada (milhares de linhas por scraping)
+                        logger.debug("Linha %d: %s - %s (%s) - %s", i, codigo_seq, nome_doenca, cid, categoria,
+                                     extra={'sample': 500})
             
             if doencas:
                 # Salvar no cache
                 salvar_doencas_local(doencas)
-                print(f"Cache salvo com {len(doencas)} doenças")
+                logger.info("Cache salvo com %d doenças", len(doencas), extra={'doencas': len(doencas)})
                 return doencas
             else:
-                print("Nenhuma doença foi extraída")
+                logger.warning("Nenhuma doença foi extraída do Datasus")
                 return None
         else:
-            print("Tabela 2 não encontrada")
+            logger.warning("Tabela 2 não encontrada no HTML do Datasus")
             return None
             
     except Exception as e:
-        print(f'Erro ao fazer scraping do Datasus: {e}')
+        logger.error('Erro ao fazer scraping do Datasus: %s', e)
         return None
 
 def atualizar_doencas_automaticamente():
-    global _doencas_last_update
+    """Agenda o scraping em segundo plano quando o cache expira; a requisição não espera."""
+    if not _doencas_last_update:
+        carregar_doencas_local()  # primeira requisição do worker: usa a data do catálogo em disco
     agora = int(time.time())
     if (agora - _doencas_last_update) > _DOENCAS_UPDATE_INTERVAL:
-        scraping_doencas()
+        schedule_refresh(scraping_doencas)
 
 @disease_bp.route('/doencas', methods=['GET'])
 def get_doencas():
     atualizar_doencas_automaticamente()
-    doencas = carregar_doencas_local()
-    if doencas:
-        return jsonify(doencas)
+    try:
+        page = parse_page_request(request.args, request.accept_mimetypes)
+    except PaginationError as e:
+        return jsonify({"erro": str(e)}), 400
+
+    if page is None:
+        # Lista completa (formato legado)
+        response = catalog_cache.cached_json('doencas', versao_doencas_local(), lambda: list(carregar_doencas_local()) or None)
+    elif page.stream:
+        # Registros lidos do snapshot um a um, à medida que a resposta é enviada
+        doencas = carregar_doencas_local()
+        response = ndjson_response(doencas, page) if doencas else None
+    else:
+        response = catalog_cache.cached_json(
+            f'doencas:{page.cache_key}', versao_doencas_local(), lambda: _pagina_doencas(page)
+        )
+
+    if response is not None:
+        return response
     else:
-        return jsonify({"erro": "Lista de doenças não encontrada. Tente novamente mais tarde."}), 404
\ No newline at end of file
+        return jsonify({"erro": "Lista de doenças não encontrada. Tente novamente mais tarde."}), 404
+
+@timed('disease.list_page')
+def _pagina_doencas(page):
+    doencas = carregar_doencas_local()
+    if not doencas:
+        return None
+    itens, next_cursor = paginate(doencas, page)
+    return {
+        'doencas': itens,
+        'total': len(doencas),
+        'offset': page.offset,
+        'limit': page.limit,
+        'next_cursor': next_cursor
+    }
\ No newline at end of file
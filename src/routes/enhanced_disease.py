@@ -1,52 +1,72 @@
 from flask import Blueprint, jsonify, request
-import json
 import os
-from datetime import datetime, timedelta
+from datetime import datetime
 import time
 import sys
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-from .disease import scraping_doencas, salvar_doencas_local
+from .disease import scraping_doencas, versao_doencas_local
+from catalog_snapshot import DOENCAS_PATH, get_snapshot
+from catalog_changes import changelog_path, changes_since, current_changelog
+from catalog_refresh import schedule_refresh
+from catalog_store import record_change
+from response_cache import catalog_cache
+from pagination import PaginationError, parse_page_request, paginate, ndjson_response
+from media_logging import get_logger
+from service_registry import registry
+from comprehensive_analysis import AnalysisContext, analyze, run_diagnosis, run_interactions
+from spans import span, timed
+from fts_search import SEARCH_BACKEND, catalog_index, fts5_available
 
 enhanced_disease_bp = Blueprint('enhanced_disease', __name__)
+logger = get_logger('datasus')
+
+# Busca por nome no índice FTS5 (MEDIA_SEARCH_BACKEND=fts5), como no CIDCategorizer
+SEARCH_FTS = SEARCH_BACKEND == 'fts5' and fts5_available()
+
+# Serviços construídos sob demanda (no primeiro uso); ver service_registry.preload_services
+cid_categorizer = registry.register('cid_categorizer', 'cid_categorizer:CIDCategorizer')
+diagnostic_engine = registry.register('diagnostic_engine', 'diagnostic_engine:DiagnosticEngine')
+drug_checker = registry.register('drug_checker', 'enhanced_drug_interaction_checker:EnhancedDrugInteractionChecker')
 
 # Cache para doenças
 doencas_cache = []
 last_update = None
 
 def load_doencas_cache():
-    """Carrega o cache de doenças do arquivo JSON. Se não existir, faz scraping e salva."""
+    """Carrega o cache de doenças do snapshot compilado. Se não existir, faz scraping e salva."""
     global doencas_cache, last_update
     try:
-        if os.path.exists('doencas_cache.json'):
-            with open('doencas_cache.json', 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                doencas_cache = data.get('doencas', [])
-                last_update = data.get('last_update')
-                
-                # Verificar se precisa atualizar (a cada 24 horas)
-                agora = int(time.time())
-                if last_update and (agora - last_update) > (24 * 60 * 60):
-                    print("Cache expirado. Atualizando dados do Datasus...")
-                    doencas = scraping_doencas()
-                    if doencas:
-                        salvar_doencas_local(doencas)
-                        doencas_cache = doencas
-                        last_update = agora
+        snapshot = get_snapshot()
+        if snapshot.has_doencas:
+            doencas_cache = snapshot.doencas
+            last_update = snapshot.last_update
+            
+            # Verificar se precisa atualizar (a cada 24 horas); o scraping roda em segundo plano
+            # e esta requisição continua com o catálogo atual
+            agora = int(time.time())
+            if last_update and (agora - last_update) > (24 * 60 * 60):
+                if schedule_refresh(scraping_doencas):
+                    logger.info("Cache expirado. Atualizando dados do Datasus em segundo plano")
         else:
             # Se não existe, faz scraping e salva
-            print('Arquivo doencas_cache.json não encontrado. Fazendo scraping do Datasus...')
-            doencas = scraping_doencas()
+            logger.warning('Arquivo doencas_cache.json não encontrado. Fazendo scraping do Datasus')
+            doencas = scraping_doencas()  # já grava o cache em disco
             if doencas:
-                salvar_doencas_local(doencas)
                 doencas_cache = doencas
                 last_update = int(time.time())
             else:
                 doencas_cache = []
                 last_update = None
     except Exception as e:
-        print(f"Erro ao carregar cache: {e}")
-        doencas_cache = []
-        last_update = None
+        # Mantém o catálogo já carregado em memória em vez de zerar a lista
+        logger.error("Erro ao carregar cache: %s", e)
+
+def _coluna(doencas, campo):
+    """Valores de `campo` em cada doença, na ordem das posições (ver CatalogSnapshot.column)."""
+    snapshot = get_snapshot()
+    if doencas is snapshot.doencas:
+        return snapshot.column('doencas', campo)
+    return tuple(doenca.get(campo) for doenca in doencas)
 
 @enhanced_disease_bp.route('/health', methods=['GET'])
 def health():
@@ -57,12 +77,23 @@ def health():
         "timestamp": datetime.now().isoformat()
     })
 
+def _parse_include(data):
+    """Blocos opcionais pedidos em ?include=details ou {"include": "details"} (lista ou vírgulas)."""
+    include = request.args.get('include') or data.get('include') or []
+    if isinstance(include, str):
+        include = include.split(',')
+    return {item.strip().lower() for item in include if isinstance(item, str)}
+
 @enhanced_disease_bp.route('/search/name', methods=['POST'])
 def search_disease_by_name():
-    """Busca doenças por nome"""
+    """
+    Busca doenças por nome. Com include=details cada resultado traz os detalhes da doença
+    (mesmo conteúdo de /disease/<code>/details), evitando uma requisição por resultado.
+    """
     try:
         data = request.get_json()
         query = data.get('query', '').strip().lower()
+        include = _parse_include(data)
         
         if not query:
             return jsonify({
@@ -73,153 +104,283 @@ def search_disease_by_name():
         # Carregar cache se necessário
         load_doencas_cache()
         
-        # Buscar doenças que correspondem à query
+        # Buscar doenças que correspondem à query (limitado a 20 resultados)
+        encontrados, total_found = _buscar_por_nome(doencas_cache, query, 20)
+        
         results = []
-        for doenca in doencas_cache:
-            nome_doenca = doenca.get('nome', '').lower()
+        for doenca, relevance in encontrados:
+            result = {
+                "code": doenca.get('cid', ''),
+                "description": doenca.get('nome', ''),
+                "relevance": relevance,
+                "subcategory": {
+                    "category": doenca.get('categoria', 'Não especificada')
+                }
+            }
+            if 'details' in include:
+                result["details"] = _detalhes_da_doenca(doenca)
+            results.append(result)
+        
+        return jsonify({
+            "success": True,
+            "total_found": total_found,
+            "results": results
+        })
+        
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "message": f"Erro na busca: {str(e)}"
+        }), 500
+
+def _buscar_por_nome(doencas, query, limit):
+    """
+    As `limit` doenças mais relevantes para a query, com a relevância, e o total encontrado.
+    Com MEDIA_SEARCH_BACKEND=fts5 a busca vai ao índice FTS5 dos nomes (termos como prefixo de
+    palavra, sem acentos, ordem BM25); senão, substring na coluna de nomes. Nos dois casos só
+    as doenças retornadas são lidas do catálogo e a relevância vai de 0 a 100 (a pontuação
+    BM25 é proporcional à do melhor resultado).
+    """
+    if SEARCH_FTS:
+        with span('disease.search.fts'):
+            encontrados, total = catalog_index(doencas, 'cid', 'nome').search_entries(query, limit)
+        melhor = encontrados[0][1] if encontrados else 0
+        return [(doenca, round(100 * score / melhor) if melhor > 0 else 100)
+                for doenca, score in encontrados], total
+    
+    matches = []
+    with span('disease.search.scan'):
+        for i, nome in enumerate(_coluna(doencas, 'nome')):
+            nome_doenca = (nome or '').lower()
             if query in nome_doenca:
                 # Calcular relevância baseada na similaridade
                 relevance = 100 if query == nome_doenca else 80
                 if nome_doenca.startswith(query):
                     relevance = 90
                 
-                results.append({
-                    "code": doenca.get('cid', ''),
-                    "description": doenca.get('nome', ''),
-                    "relevance": relevance,
-                    "subcategory": {
-                        "category": doenca.get('categoria', 'Não especificada')
-                    }
-                })
-        
-        # Ordenar por relevância
-        results.sort(key=lambda x: x['relevance'], reverse=True)
+                matches.append((relevance, i))
+    
+    # Ordenar por relevância
+    with span('disease.search.sort'):
+        matches.sort(key=lambda x: x[0], reverse=True)
+    return [(doencas[i], relevance) for relevance, i in matches[:limit]], len(matches)
+
+@enhanced_disease_bp.route('/search/code', methods=['POST'])
+def search_disease_by_code():
+    """Busca por código CID-10 exato (inclusive personalizados) ou, se não existir, por prefixo"""
+    try:
+        data = request.get_json()
+        code = data.get('code', '').strip()
         
+        if not code:
+            return jsonify({
+                "success": False,
+                "message": "Código CID é obrigatório"
+            }), 400
+        
+        disease = cid_categorizer.search_by_code(code)
+        if disease:
+            disease['subcategory'] = cid_categorizer.get_subcategory_info(code)
+            return jsonify({
+                "success": True,
+                "disease": disease
+            })
+        
+        # Códigos semelhantes pelo índice por letra (ou pela faixa de códigos do FTS5)
         return jsonify({
             "success": True,
-            "total_found": len(results),
-            "results": results[:20]  # Limitar a 20 resultados
+            "exact_match": False,
+            "pattern_results": cid_categorizer.search_by_code_pattern(code, 10),
+            "message": f'Código exato não encontrado. Mostrando códigos similares a "{code}"'
         })
         
     except Exception as e:
         return jsonify({
             "success": False,
-            "message": f"Erro na busca: {str(e)}"
+            "message": f"Erro na busca por código: {str(e)}"
         }), 500
 
-@enhanced_disease_bp.route('/disease/<code>/details', methods=['GET'])
-def get_disease_details(code):
-    """Obtém detalhes de uma doença específica"""
+@enhanced_disease_bp.route('/add_custom_cid', methods=['POST'])
+def add_custom_cid():
+    """Permite que médicos adicionem códigos CID personalizados (gravados no banco, vistos por todos os workers)"""
     try:
-        # Carregar cache se necessário
-        load_doencas_cache()
-        
-        # Buscar doença pelo código
-        doenca = None
-        for d in doencas_cache:
-            if d.get('cid', '').upper() == code.upper():
-                doenca = d
-                break
+        data = request.get_json()
+        code = data.get('code', '').strip()
+        description = data.get('description', '').strip()
+        user_type = data.get('user_type', 'patient')  # Em produção, viria do token de autenticação
         
-        if not doenca:
+        if not code or not description:
             return jsonify({
                 "success": False,
-                "message": "Doença não encontrada"
-            }), 404
+                "message": "Código e descrição são obrigatórios"
+            }), 400
         
-        # Simular detalhes baseados no nome da doença
-        nome = doenca.get('nome', '').lower()
-        
-        # Determinar gravidade baseada em palavras-chave
-        severity = "Leve"
-        if any(word in nome for word in ['câncer', 'tumor', 'maligno', 'grave', 'crítico', 'infarto', 'acidente vascular']):
-            severity = "Grave"
-        elif any(word in nome for word in ['moderado', 'crônico', 'agudo', 'insuficiência']):
-            severity = "Moderada"
-        
-        # Determinar se tem tratamento
-        has_treatment = True
-        treatment_type = "Medicamentoso"
-        
-        # Medicamentos comuns baseados no tipo de doença
-        medications = []
-        if 'diabetes' in nome:
-            medications = ['Metformina', 'Insulina', 'Glimepirida']
-        elif 'hipertensão' in nome:
-            medications = ['Captopril', 'Losartana', 'Amlodipina']
-        elif 'asma' in nome:
-            medications = ['Salbutamol', 'Budesonida', 'Formoterol']
-        elif 'câncer' in nome:
-            medications = ['Quimioterapia', 'Radioterapia', 'Terapia alvo']
-        elif 'depressão' in nome:
-            medications = ['Sertralina', 'Fluoxetina', 'Escitalopram']
-        
-        # Sintomas típicos
-        symptoms = []
-        if 'diabetes' in nome:
-            symptoms = ['Sede excessiva', 'Fome excessiva', 'Micção frequente']
-        elif 'hipertensão' in nome:
-            symptoms = ['Dor de cabeça', 'Tontura', 'Náusea']
-        elif 'asma' in nome:
-            symptoms = ['Falta de ar', 'Tosse', 'Chiado no peito']
-        elif 'câncer' in nome:
-            symptoms = ['Perda de peso', 'Fadiga', 'Dor']
-        elif 'depressão' in nome:
-            symptoms = ['Tristeza', 'Perda de interesse', 'Alterações do sono']
-        
-        # Prognóstico
-        prognosis = "Bom com tratamento adequado"
-        if severity == "Grave":
-            prognosis = "Requer acompanhamento médico intensivo"
+        new_disease = cid_categorizer.add_custom_cid(code, description, user_type)
+        # Entra no log de alterações para que clientes sincronizados recebam o novo CID; o CID
+        # já está gravado no banco, então uma falha aqui não muda a resposta
+        try:
+            record_change(DOENCAS_PATH, 'custom', added=[new_disease['code']],
+                          records={new_disease['code']: new_disease})
+        except (OSError, ValueError) as e:
+            logger.error("CID personalizado %s gravado, mas não entrou no log de alterações: %s",
+                         new_disease['code'], e)
         
         return jsonify({
             "success": True,
-            "disease_details": {
-                "severity": severity,
-                "has_treatment": has_treatment,
-                "treatment_type": treatment_type,
-                "medications": medications,
-                "non_medication_treatment": ["Dieta", "Exercícios", "Controle de peso"],
-                "symptoms": symptoms,
-                "prognosis": prognosis
-            }
+            "message": "Código CID personalizado adicionado com sucesso",
+            "disease": new_disease
         })
         
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "message": str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "message": f"Erro ao adicionar CID personalizado: {str(e)}"
+        }), 500
+
+@enhanced_disease_bp.route('/disease/<code>/details', methods=['GET'])
+def get_disease_details(code):
+    """Obtém detalhes de uma doença específica"""
+    try:
+        response = catalog_cache.cached_json(
+            f'detalhes:{code.upper()}', versao_doencas_local(), lambda: _montar_detalhes_doenca(code)
+        )
+        if response is None:
+            return jsonify({
+                "success": False,
+                "message": "Doença não encontrada"
+            }), 404
+        return response
+        
     except Exception as e:
         return jsonify({
             "success": False,
             "message": f"Erro ao obter detalhes: {str(e)}"
         }), 500
 
+@timed('disease.details')
+def _montar_detalhes_doenca(code):
+    """Monta o payload de detalhes da doença; None se o código não existir."""
+    # Carregar cache se necessário
+    load_doencas_cache()
+    
+    # Buscar doença pelo código (índice pré-construído no snapshot)
+    doenca = get_snapshot().doenca_por_cid(code)
+    
+    if not doenca:
+        return None
+    
+    return {
+        "success": True,
+        "disease_details": _detalhes_da_doenca(doenca)
+    }
+
+def _detalhes_da_doenca(doenca):
+    """Detalhes derivados do nome da doença (usados pelo endpoint de detalhes e pela busca)."""
+    # Simular detalhes baseados no nome da doença
+    nome = doenca.get('nome', '').lower()
+    
+    # Determinar gravidade baseada em palavras-chave
+    severity = "Leve"
+    if any(word in nome for word in ['câncer', 'tumor', 'maligno', 'grave', 'crítico', 'infarto', 'acidente vascular']):
+        severity = "Grave"
+    elif any(word in nome for word in ['moderado', 'crônico', 'agudo', 'insuficiência']):
+        severity = "Moderada"
+    
+    # Determinar se tem tratamento
+    has_treatment = True
+    treatment_type = "Medicamentoso"
+    
+    # Medicamentos comuns baseados no tipo de doença
+    medications = []
+    if 'diabetes' in nome:
+        medications = ['Metformina', 'Insulina', 'Glimepirida']
+    elif 'hipertensão' in nome:
+        medications = ['Captopril', 'Losartana', 'Amlodipina']
+    elif 'asma' in nome:
+        medications = ['Salbutamol', 'Budesonida', 'Formoterol']
+    elif 'câncer' in nome:
+        medications = ['Quimioterapia', 'Radioterapia', 'Terapia alvo']
+    elif 'depressão' in nome:
+        medications = ['Sertralina', 'Fluoxetina', 'Escitalopram']
+    
+    # Sintomas típicos
+    symptoms = []
+    if 'diabetes' in nome:
+        symptoms = ['Sede excessiva', 'Fome excessiva', 'Micção frequente']
+    elif 'hipertensão' in nome:
+        symptoms = ['Dor de cabeça', 'Tontura', 'Náusea']
+    elif 'asma' in nome:
+        symptoms = ['Falta de ar', 'Tosse', 'Chiado no peito']
+    elif 'câncer' in nome:
+        symptoms = ['Perda de peso', 'Fadiga', 'Dor']
+    elif 'depressão' in nome:
+        symptoms = ['Tristeza', 'Perda de interesse', 'Alterações do sono']
+    
+    # Prognóstico
+    prognosis = "Bom com tratamento adequado"
+    if severity == "Grave":
+        prognosis = "Requer acompanhamento médico intensivo"
+    
+    return {
+        "severity": severity,
+        "has_treatment": has_treatment,
+        "treatment_type": treatment_type,
+        "medications": medications,
+        "non_medication_treatment": ["Dieta", "Exercícios", "Controle de peso"],
+        "symptoms": symptoms,
+        "prognosis": prognosis
+    }
+
+@enhanced_disease_bp.route('/catalog/changes', methods=['GET'])
+def get_catalog_changes():
+    """
+    Alterações do catálogo desde a versão `since` do log (incluídos, removidos e alterados por
+    CID, com o registro atual). Sem `since`, ou com uma versão já compactada, a resposta pede
+    o download completo (full_snapshot_required) e informa a versão a partir da qual sincronizar.
+    """
+    try:
+        since = request.args.get('since', type=int)
+        log = current_changelog(changelog_path(DOENCAS_PATH))
+        if since is None or changes_since(log, since) is None:
+            return jsonify({
+                "success": True,
+                "full_snapshot_required": True,
+                "version": log['version'],
+                "snapshot_url": "/api/doencas"
+            })
+        return catalog_cache.cached_json(
+            f'changes:{since}', f"{log['version']}:{versao_doencas_local()}", lambda: _montar_alteracoes(log, since)
+        )
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "message": f"Erro ao obter alterações do catálogo: {str(e)}"
+        }), 500
+
+def _montar_alteracoes(log, since):
+    delta = changes_since(log, since)
+    snapshot = get_snapshot()
+    for item in delta['added'] + delta['modified']:
+        if item['source'] == 'catalog':
+            item['record'] = snapshot.doenca_por_cid(item['cid'])
+    return {
+        "success": True,
+        "full_snapshot_required": False,
+        "since": since,
+        "version": log['version'],
+        **delta
+    }
+
 @enhanced_disease_bp.route('/categories', methods=['GET'])
 def get_categories():
     """Obtém categorias CID-10"""
     try:
-        # Carregar cache se necessário
-        load_doencas_cache()
-        
-        # Agrupar doenças por categoria
-        categories = {}
-        for doenca in doencas_cache:
-            categoria = doenca.get('categoria', 'Não especificada')
-            if categoria not in categories:
-                categories[categoria] = []
-            categories[categoria].append(doenca)
-        
-        # Criar lista de categorias
-        category_list = []
-        for categoria, doencas in categories.items():
-            category_list.append({
-                "letter": categoria[:1] if categoria else "?",
-                "title": categoria,
-                "description": f"{len(doencas)} doenças nesta categoria"
-            })
-        
-        return jsonify({
-            "success": True,
-            "total_categories": len(category_list),
-            "categories": category_list
-        })
+        return catalog_cache.cached_json('categorias', versao_doencas_local(), _montar_categorias)
         
     except Exception as e:
         return jsonify({
@@ -227,39 +388,102 @@ def get_categories():
             "message": f"Erro ao obter categorias: {str(e)}"
         }), 500
 
+@timed('disease.categories')
+def _montar_categorias():
+    """Agrupa o cache de doenças por categoria."""
+    # Carregar cache se necessário
+    load_doencas_cache()
+    
+    # Contar doenças por categoria
+    categories = {}
+    for categoria in _coluna(doencas_cache, 'categoria'):
+        if categoria is None:
+            categoria = 'Não especificada'
+        categories[categoria] = categories.get(categoria, 0) + 1
+    
+    # Criar lista de categorias
+    category_list = []
+    for categoria, total in categories.items():
+        category_list.append({
+            "letter": categoria[:1] if categoria else "?",
+            "title": categoria,
+            "description": f"{total} doenças nesta categoria"
+        })
+    
+    return {
+        "success": True,
+        "total_categories": len(category_list),
+        "categories": category_list
+    }
+
 @enhanced_disease_bp.route('/categories/<letter>/diseases', methods=['GET'])
 def get_diseases_by_category(letter):
     """Obtém doenças de uma categoria específica"""
     try:
-        # Carregar cache se necessário
-        load_doencas_cache()
+        page = parse_page_request(request.args, request.accept_mimetypes)
+        if page is not None and page.stream:
+            load_doencas_cache()
+            return ndjson_response(_iter_doencas_categoria(letter), page)
         
-        # Filtrar doenças pela categoria
-        category_diseases = []
-        for doenca in doencas_cache:
-            categoria = doenca.get('categoria', '')
-            if categoria and categoria.upper().startswith(letter.upper()):
-                category_diseases.append({
-                    "code": doenca.get('cid', ''),
-                    "description": doenca.get('nome', ''),
-                    "severity": "Leve",  # Simulado
-                    "has_treatment": True,
-                    "treatment_type": "Medicamentoso"
-                })
+        key = f'categoria:{letter.upper()}' if page is None else f'categoria:{letter.upper()}:{page.cache_key}'
+        return catalog_cache.cached_json(
+            key, versao_doencas_local(), lambda: _montar_doencas_categoria(letter, page)
+        )
         
+    except PaginationError as e:
         return jsonify({
-            "success": True,
-            "category": letter.upper(),
-            "total_diseases": len(category_diseases),
-            "diseases": category_diseases
-        })
-        
+            "success": False,
+            "message": str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             "success": False,
             "message": f"Erro ao obter doenças da categoria: {str(e)}"
         }), 500
 
+def _iter_doencas_categoria(letter):
+    """Gera, sob demanda, as doenças do cache cuja categoria começa pela letra."""
+    letter = letter.upper()
+    # Letra única usa o índice por categoria do snapshot; prefixos maiores varrem a coluna de
+    # categorias e só leem as doenças selecionadas
+    if len(letter) == 1:
+        candidatos = get_snapshot().doencas_por_letra(letter)
+    else:
+        doencas = doencas_cache
+        candidatos = (doencas[i] for i, categoria in enumerate(_coluna(doencas, 'categoria'))
+                      if categoria and categoria.upper().startswith(letter))
+    for doenca in candidatos:
+        categoria = doenca.get('categoria', '')
+        if categoria and categoria.upper().startswith(letter):
+            yield {
+                "code": doenca.get('cid', ''),
+                "description": doenca.get('nome', ''),
+                "severity": "Leve",  # Simulado
+                "has_treatment": True,
+                "treatment_type": "Medicamentoso"
+            }
+
+@timed('disease.category_diseases')
+def _montar_doencas_categoria(letter, page=None):
+    """Filtra o cache de doenças pela letra da categoria."""
+    # Carregar cache se necessário
+    load_doencas_cache()
+    
+    # Filtrar doenças pela categoria
+    category_diseases = list(_iter_doencas_categoria(letter))
+    
+    payload = {
+        "success": True,
+        "category": letter.upper(),
+        "total_diseases": len(category_diseases),
+        "diseases": category_diseases
+    }
+    if page is not None:
+        payload["diseases"], payload["next_cursor"] = paginate(category_diseases, page)
+        payload["offset"] = page.offset
+        payload["limit"] = page.limit
+    return payload
+
 @enhanced_disease_bp.route('/symptoms/categories', methods=['GET'])
 def get_symptom_categories():
     """Obtém categorias de sintomas"""
@@ -293,7 +517,7 @@ def get_symptom_categories():
 
 @enhanced_disease_bp.route('/diagnose/symptoms', methods=['POST'])
 def diagnose_symptoms():
-    """Diagnóstico por sintomas (texto livre)"""
+    """Diagnóstico por sintomas (texto livre), pela etapa de diagnóstico da análise abrangente"""
     try:
         data = request.get_json()
         symptoms_report = data.get('symptoms_report', '').strip()
@@ -305,36 +529,9 @@ def diagnose_symptoms():
                 "message": "Relatório de sintomas não fornecido"
             }), 400
         
-        # Simular diagnóstico baseado em palavras-chave
-        symptoms_lower = symptoms_report.lower()
-        diagnoses = []
-        
-        if any(word in symptoms_lower for word in ['diabetes', 'açúcar', 'sede']):
-            diagnoses.append({
-                "disease_name": "Diabetes Mellitus",
-                "cid_code": "E11",
-                "probability": 85,
-                "confidence_level": "Alta",
-                "matching_symptoms": ["Sede excessiva", "Fome excessiva", "Micção frequente"]
-            })
-        
-        if any(word in symptoms_lower for word in ['hipertensão', 'pressão', 'cabeça']):
-            diagnoses.append({
-                "disease_name": "Hipertensão Arterial",
-                "cid_code": "I10",
-                "probability": 80,
-                "confidence_level": "Alta",
-                "matching_symptoms": ["Dor de cabeça", "Tontura", "Náusea"]
-            })
-        
-        if any(word in symptoms_lower for word in ['asma', 'respirar', 'chiado']):
-            diagnoses.append({
-                "disease_name": "Asma",
-                "cid_code": "J45",
-                "probability": 75,
-                "confidence_level": "Média",
-                "matching_symptoms": ["Falta de ar", "Chiado no peito", "Tosse"]
-            })
+        ctx = AnalysisContext(symptoms_report, [], include_reports=include_report)
+        run_diagnosis(ctx, diagnostic_engine)
+        diagnoses = _diagnosticos(ctx.diagnostic_results)
         
         if not diagnoses:
             diagnoses.append({
@@ -352,25 +549,7 @@ def diagnose_symptoms():
         }
         
         if include_report:
-            response["medical_report"] = f"""
-RELATÓRIO MÉDICO
-
-Data: {datetime.now().strftime('%d/%m/%Y %H:%M')}
-
-SINTOMAS RELATADOS:
-{symptoms_report}
-
-DIAGNÓSTICOS POSSÍVEIS:
-{chr(10).join([f"- {d['disease_name']} ({d['cid_code']}) - Probabilidade: {d['probability']}%" for d in diagnoses])}
-
-RECOMENDAÇÕES:
-- Consulte um médico para confirmação diagnóstica
-- Mantenha registro dos sintomas
-- Evite automedicação
-- Procure atendimento de emergência se sintomas graves
-
-Este é um diagnóstico preliminar baseado em IA. Consulte sempre um profissional de saúde.
-"""
+            response["medical_report"] = ctx.medical_report or diagnostic_engine.generate_medical_report([], symptoms_report)
         
         return jsonify(response)
         
@@ -380,7 +559,21 @@ Este é um diagnóstico preliminar baseado em IA. Consulte sempre um profissiona
             "message": f"Erro no diagnóstico: {str(e)}"
         }), 500
 
+def _diagnosticos(diagnostic_results):
+    """DiagnosticResult -> dicts da resposta (probabilidade em porcentagem)."""
+    return [
+        {
+            "disease_name": result.disease_name,
+            "cid_code": result.cid_code,
+            "probability": round(result.probability * 100, 1),
+            "confidence_level": result.confidence_level,
+            "matching_symptoms": result.matching_symptoms
+        }
+        for result in diagnostic_results or []
+    ]
+
 @enhanced_disease_bp.route('/diagnose/objective_symptoms', methods=['POST'])
+@timed('diagnose.objective_symptoms')
 def diagnose_objective_symptoms():
     """Diagnóstico por sintomas objetivos"""
     try:
@@ -476,7 +669,7 @@ Este é um diagnóstico preliminar baseado em IA. Consulte sempre um profissiona
 
 @enhanced_disease_bp.route('/interactions/check', methods=['POST'])
 def check_interactions():
-    """Verifica interações medicamentosas"""
+    """Verifica interações medicamentosas, pela etapa de interações da análise abrangente"""
     try:
         data = request.get_json()
         medications = data.get('medications', [])
@@ -488,81 +681,17 @@ def check_interactions():
                 "message": "Adicione pelo menos 2 medicamentos"
             }), 400
         
-        # Simular verificação de interações
-        interactions = []
-        severity_levels = ["Leve", "Moderada", "Grave", "Contraindicada"]
-        
-        # Verificar interações conhecidas
-        for i in range(len(medications)):
-            for j in range(i + 1, len(medications)):
-                med1, med2 = medications[i], medications[j]
-                
-                # Simular algumas interações conhecidas
-                if any(word in med1.lower() for word in ['aspirina', 'aas']) and any(word in med2.lower() for word in ['varfarina', 'coumadin']):
-                    interactions.append({
-                        "drug1": med1,
-                        "drug2": med2,
-                        "severity": "Grave",
-                        "mechanism": "Aumento do risco de sangramento",
-                        "clinical_effects": ["Sangramento", "Hemorragia", "Hematomas"]
-                    })
-                elif any(word in med1.lower() for word in ['omeprazol', 'pantoprazol']) and any(word in med2.lower() for word in ['clopidogrel', 'plavix']):
-                    interactions.append({
-                        "drug1": med1,
-                        "drug2": med2,
-                        "severity": "Moderada",
-                        "mechanism": "Redução da eficácia do clopidogrel",
-                        "clinical_effects": ["Redução da proteção cardiovascular", "Aumento do risco de eventos cardíacos"]
-                    })
-                else:
-                    # Interação genérica
-                    interactions.append({
-                        "drug1": med1,
-                        "drug2": med2,
-                        "severity": "Leve",
-                        "mechanism": "Interação farmacocinética potencial",
-                        "clinical_effects": ["Monitoramento necessário", "Ajuste de dose pode ser necessário"]
-                    })
-        
-        # Resumo
-        summary = {
-            "total_interactions": len(interactions),
-            "highest_severity": max([i["severity"] for i in interactions]) if interactions else "Nenhuma",
-            "interactions": interactions
-        }
+        # Um único check_interactions; o relatório reaproveita o resumo
+        ctx = AnalysisContext('', medications, include_reports=include_report)
+        run_interactions(ctx, drug_checker)
         
         response = {
             "success": True,
-            "summary": summary
+            "summary": ctx.interaction_summary
         }
         
         if include_report:
-            response["detailed_report"] = f"""
-RELATÓRIO DE INTERAÇÕES MEDICAMENTOSAS
-
-Data: {datetime.now().strftime('%d/%m/%Y %H:%M')}
-
-MEDICAMENTOS ANALISADOS:
-{chr(10).join([f"- {med}" for med in medications])}
-
-INTERAÇÕES ENCONTRADAS: {len(interactions)}
-
-{chr(10).join([f"""
-INTERAÇÃO {idx + 1}:
-- Medicamentos: {interaction['drug1']} + {interaction['drug2']}
-- Gravidade: {interaction['severity']}
-- Mecanismo: {interaction['mechanism']}
-- Efeitos Clínicos: {', '.join(interaction['clinical_effects'])}
-""" for idx, interaction in enumerate(interactions)])}
-
-RECOMENDAÇÕES:
-- Consulte sempre um médico ou farmacêutico
-- Não interrompa medicamentos sem orientação médica
-- Mantenha lista atualizada de todos os medicamentos
-- Informe sobre suplementos e fitoterápicos
-
-Este relatório é informativo. Sempre consulte um profissional de saúde.
-"""
+            response["detailed_report"] = ctx.interaction_report
         
         return jsonify(response)
         
@@ -572,6 +701,56 @@ Este relatório é informativo. Sempre consulte um profissional de saúde.
             "message": f"Erro na verificação de interações: {str(e)}"
         }), 500
 
+@enhanced_disease_bp.route('/comprehensive_analysis', methods=['POST'])
+def comprehensive_medical_analysis():
+    """Análise abrangente: diagnóstico e interações calculados uma vez cada, em paralelo quando há os dois"""
+    try:
+        data = request.get_json()
+        symptoms_report = data.get('symptoms_report', '').strip()
+        current_medications = data.get('current_medications', [])
+        include_reports = data.get('include_reports', False)
+        
+        if not symptoms_report and not current_medications:
+            return jsonify({
+                "success": False,
+                "message": "Relatório de sintomas ou lista de medicamentos é obrigatória"
+            }), 400
+        
+        ctx = analyze(AnalysisContext(symptoms_report, current_medications, include_reports),
+                      diagnostic_engine, drug_checker)
+        
+        analysis_result = {
+            "success": True,
+            "timestamp": datetime.now().isoformat(),
+            "analysis_type": "comprehensive"
+        }
+        
+        if ctx.diagnostic_results is not None:
+            analysis_result["diagnostic_analysis"] = {
+                "symptoms_report": symptoms_report,
+                "diagnostic_results": _diagnosticos(ctx.diagnostic_results)
+            }
+            if ctx.medical_report is not None:
+                analysis_result["diagnostic_analysis"]["medical_report"] = ctx.medical_report
+        
+        if ctx.interaction_summary is not None:
+            analysis_result["interaction_analysis"] = {
+                "medications": current_medications,
+                "summary": ctx.interaction_summary
+            }
+            if ctx.interaction_report is not None:
+                analysis_result["interaction_analysis"]["detailed_report"] = ctx.interaction_report
+        
+        analysis_result["integrated_recommendations"] = ctx.recommendations
+        
+        return jsonify(analysis_result)
+        
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "message": f"Erro na análise abrangente: {str(e)}"
+        }), 500
+
 @enhanced_disease_bp.route('/enhanced_disease/test', methods=['GET'])
 def test_enhanced_disease():
     return jsonify({"message": "Rota /api/v2/enhanced_disease/test funcionando!"}) 
\ No newline at end of file
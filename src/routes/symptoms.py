@@ -1,8 +1,8 @@
 from flask import Blueprint, request, jsonify
-from enhanced_symptom_service import EnhancedSymptomService
+from service_registry import registry
 
 symptoms_bp = Blueprint('symptoms', __name__)
-symptom_service = EnhancedSymptomService()
+symptom_service = registry.register('symptom_service', 'enhanced_symptom_service:EnhancedSymptomService')
 
 @symptoms_bp.route('/symptoms/categories', methods=['GET'])
 def get_symptom_categories():
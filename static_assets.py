@@ -0,0 +1,179 @@
+"""
+Arquivos estáticos da SPA (static/) servidos a partir da memória, com variantes comprimidas.
+
+A etapa de build (`python static_assets.py`) grava ao lado de cada arquivo as versões .gz e
+.br (esta só com o pacote brotli instalado). Na primeira requisição cada worker carrega os
+arquivos e as variantes pré-comprimidas uma única vez. Variantes ausentes ou mais antigas que
+o arquivo são comprimidas em memória. As respostas levam ETag e Cache-Control:
+- HTML (index.html, também usado no fallback da SPA) e manifestos (*.manifest.json, que apontam
+  para arquivos com hash): no-cache, revalidados pelo ETag;
+- arquivos com hash no nome (app.3f2a9c1d.js): um ano, immutable;
+- demais arquivos: MEDIA_STATIC_MAX_AGE segundos (padrão 1 dia).
+"""
+import gzip
+import hashlib
+import os
+import re
+import threading
+from typing import Dict, Optional
+
+from flask import Response, request
+
+import fork_hooks
+from catalog_store import write_bytes_atomic
+from response_cache import CachedPayload, brotli
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(BASE_DIR, 'static')
+STATIC_MAX_AGE = int(os.environ.get('MEDIA_STATIC_MAX_AGE', 86400))
+INDEX_FILE = 'index.html'
+
+_COMPRESSED_SUFFIXES = ('.gz', '.br')
+_MIN_COMPRESS_SIZE = 512
+_FINGERPRINT = re.compile(r'\.[0-9a-f]{8,}\.[a-z0-9]+$')
+_MIMETYPES = {
+    '.html': 'text/html; charset=utf-8',
+    '.js': 'text/javascript; charset=utf-8',
+    '.css': 'text/css; charset=utf-8',
+    '.json': 'application/json',
+    '.svg': 'image/svg+xml',
+    '.ico': 'image/x-icon',
+    '.png': 'image/png',
+    '.jpg': 'image/jpeg',
+    '.webp': 'image/webp',
+    '.txt': 'text/plain; charset=utf-8',
+    '.webmanifest': 'application/manifest+json',
+}
+_COMPRESSIBLE = ('.html', '.js', '.css', '.json', '.svg', '.txt', '.webmanifest', '.ico')
+
+
+def _cache_control(name: str) -> str:
+    if name.endswith(('.html', '.manifest.json')):
+        return 'no-cache'
+    if _FINGERPRINT.search(name):
+        return 'public, max-age=31536000, immutable'
+    return f'public, max-age={STATIC_MAX_AGE}'
+
+
+def _compressible(name: str, body: bytes) -> bool:
+    return name.endswith(_COMPRESSIBLE) and len(body) >= _MIN_COMPRESS_SIZE
+
+
+def _read_variant(path: str, source_mtime: int) -> Optional[bytes]:
+    """Lê a variante pré-comprimida se existir e não for mais antiga que o arquivo."""
+    try:
+        if os.stat(path).st_mtime_ns < source_mtime:
+            return None
+        with open(path, 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+class StaticAsset(CachedPayload):
+    """Arquivo estático com variantes comprimidas, ETag e cabeçalhos de cache."""
+    __slots__ = ('mimetype', 'cache_control')
+
+    def __init__(self, name: str, path: str):
+        with open(path, 'rb') as f:
+            body = f.read()
+        mtime = os.stat(path).st_mtime_ns
+        self.version = str(mtime)
+        self.body = body
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+        self.mimetype = _MIMETYPES.get(os.path.splitext(name)[1], 'application/octet-stream')
+        self.cache_control = _cache_control(name)
+        self.gzip_body = self.br_body = None
+        if _compressible(name, body):
+            self.gzip_body = _read_variant(path + '.gz', mtime) or gzip.compress(body, compresslevel=9, mtime=0)
+            self.br_body = _read_variant(path + '.br', mtime) or (brotli.compress(body, quality=11) if brotli else None)
+
+    def select(self, accept_encodings):
+        if self.gzip_body is None:
+            return None, self.body
+        return super().select(accept_encodings)
+
+    def response(self) -> Response:
+        headers = {
+            'ETag': f'"{self.etag}"',
+            'Cache-Control': self.cache_control,
+            'Vary': 'Accept-Encoding',
+        }
+        if request.if_none_match.contains(self.etag):
+            return Response(status=304, headers=headers)
+        encoding, body = self.select(request.accept_encodings)
+        if encoding:
+            headers['Content-Encoding'] = encoding
+        return Response(body, content_type=self.mimetype, headers=headers)
+
+
+class StaticAssets:
+    """Conjunto dos arquivos de static/, carregado uma vez por processo."""
+
+    def __init__(self, directory: str = STATIC_DIR):
+        self.directory = directory
+        self._assets: Optional[Dict[str, StaticAsset]] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, StaticAsset]:
+        assets = {}
+        for root, _, files in os.walk(self.directory):
+            for filename in files:
+                if filename.endswith(_COMPRESSED_SUFFIXES):
+                    continue
+                path = os.path.join(root, filename)
+                name = os.path.relpath(path, self.directory).replace(os.sep, '/')
+                assets[name] = StaticAsset(name, path)
+        return assets
+
+    @property
+    def assets(self) -> Dict[str, StaticAsset]:
+        assets = self._assets
+        if assets is None:
+            with self._lock:
+                if self._assets is None:
+                    self._assets = self._load() if os.path.isdir(self.directory) else {}
+                assets = self._assets
+        return assets
+
+    def get(self, name: str) -> Optional[StaticAsset]:
+        return self.assets.get(name)
+
+    def reset_lock(self):
+        """Recria o lock no processo filho após um fork."""
+        self._lock = threading.Lock()
+
+    def clear(self):
+        """Descarta os arquivos carregados; a próxima requisição relê static/."""
+        with self._lock:
+            self._assets = None
+
+
+def write_compressed(directory: str = STATIC_DIR) -> int:
+    """Grava as variantes .gz/.br de cada arquivo comprimível (etapa de build)."""
+    written = 0
+    for name, asset in StaticAssets(directory)._load().items():
+        path = os.path.join(directory, name)
+        if asset.gzip_body is None:
+            continue
+        write_bytes_atomic(path + '.gz', gzip.compress(asset.body, compresslevel=9, mtime=0))
+        written += 1
+        if brotli:
+            write_bytes_atomic(path + '.br', brotli.compress(asset.body, quality=11))
+            written += 1
+    return written
+
+
+# Instância usada pelas rotas estáticas de main.py
+static_assets = StaticAssets()
+fork_hooks.register(static_assets.reset_lock)
+
+
+def main():
+    written = write_compressed()
+    print(f"{written} variantes comprimidas gravadas em {STATIC_DIR}"
+          f"{'' if brotli else ' (brotli não instalado: apenas gzip)'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Script de teste para o ponto de entrada ASGI (asgi.app) sobre a aplicação Flask
+"""
+
+import asyncio
+import json
+
+from asgi import app
+
+def _scope(method, path, headers=()):
+    return {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': method, 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+        'query_string': b'', 'root_path': '', 'server': ('testserver', 80), 'client': ('127.0.0.1', 50000),
+        'headers': [(name.encode(), value.encode()) for name, value in headers],
+    }
+
+async def _chamar(method, path, body=b'', headers=(), partes=1):
+    """Envia uma requisição ao app ASGI (corpo em `partes` mensagens) e devolve status, cabeçalhos e corpo."""
+    tamanho = -(-len(body) // partes) if body else 0
+    mensagens = [{'type': 'http.request', 'body': body[i:i + tamanho], 'more_body': i + tamanho < len(body)}
+                 for i in range(0, len(body), tamanho)] if body else [{'type': 'http.request', 'body': b''}]
+    enviadas = []
+
+    async def receive():
+        return mensagens.pop(0) if mensagens else {'type': 'http.disconnect'}
+
+    async def send(message):
+        enviadas.append(message)
+
+    await app(_scope(method, path, headers), receive, send)
+    inicio = enviadas[0]
+    assert inicio['type'] == 'http.response.start'
+    corpo = b''.join(m.get('body', b'') for m in enviadas[1:])
+    assert not enviadas[-1].get('more_body')
+    return inicio['status'], dict(inicio['headers']), corpo
+
+async def _ciclo_de_vida():
+    """Executa o lifespan (startup) como o servidor ASGI faria e depois as requisições."""
+    fila = asyncio.Queue()
+    respostas = []
+
+    async def send(message):
+        respostas.append(message['type'])
+
+    await fila.put({'type': 'lifespan.startup'})
+    await fila.put({'type': 'lifespan.shutdown'})
+    await app({'type': 'lifespan', 'asgi': {'version': '3.0'}}, fila.get, send)
+    return respostas
+
+def test_get_e_post():
+    """Testa GET e POST com corpo (Content-Length) passando pelo adaptador ASGI"""
+    print("🧪 Testando asgi.app")
+
+    async def cenario():
+        assert await _ciclo_de_vida() == ['lifespan.startup.complete', 'lifespan.shutdown.complete']
+
+        status, headers, corpo = await _chamar('GET', '/api/v2/health')
+        assert status == 200 and headers[b'content-type'] == b'application/json'
+        assert json.loads(corpo)['status'] == 'healthy'
+        assert int(headers[b'content-length']) == len(corpo)
+
+        body = json.dumps({'query': 'tuberculose'}).encode()
+        headers_post = [('content-type', 'application/json'), ('content-length', str(len(body)))]
+        status, _, corpo = await _chamar('POST', '/api/v2/search/name', body, headers_post)
+        resultado = json.loads(corpo)
+        assert status == 200 and resultado['success'] and resultado['total_found'] > 0
+        assert all('tuberculose' in r['description'].lower() for r in resultado['results'])
+
+        # Corpo recebido em várias mensagens http.request (more_body)
+        status, _, corpo_partes = await _chamar('POST', '/api/v2/search/name', body, headers_post, partes=3)
+        assert status == 200 and json.loads(corpo_partes) == resultado
+
+        status, _, corpo = await _chamar('POST', '/api/v2/search/name', b'{}',
+                                         [('content-type', 'application/json'), ('content-length', '2')])
+        assert status == 400 and not json.loads(corpo)['success']
+
+    asyncio.run(cenario())
+    print("✅ GET e POST respondidos pelo adaptador ASGI")
+
+if __name__ == "__main__":
+    test_get_e_post()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Script de teste para o índice de autocomplete gerado no build
+"""
+
+import json
+import os
+import tempfile
+
+from autocomplete_index import MANIFEST_NAME, build_index, normalize, write_index
+from static_assets import StaticAssets
+
+def test_build_index():
+    """Testa normalização, listas paralelas e baldes por início de palavra"""
+    print("🧪 Testando construção do índice de autocomplete")
+
+    doencas = [
+        {'nome': 'Hipertensão arterial essencial', 'cid': 'I10'},
+        {'nome': 'Diabetes mellitus tipo 2', 'cid': 'E11'},
+        {'nome': '', 'cid': 'X00'},
+        {'nome': 'Hérnia de hiato', 'cid': 'K44'},
+    ]
+    index = build_index(doencas, 'v1')
+    assert normalize('Hérnia ÁGUDA') == 'hernia aguda'
+    assert index['names'] == ['Hipertensão arterial essencial', 'Diabetes mellitus tipo 2', 'Hérnia de hiato']
+    assert index['codes'] == ['I10', 'E11', 'K44'] and index['keys'][2] == 'hernia de hiato'
+    assert index['buckets']['hi'] == [0, 2] and index['buckets']['he'] == [2]
+    print(f"✅ {len(index['names'])} entradas, {len(index['buckets'])} baldes")
+
+def test_write_index():
+    """Testa o arquivo com hash, o manifesto e os cabeçalhos de cache servidos"""
+    with tempfile.TemporaryDirectory() as directory:
+        antigo = os.path.join(directory, 'autocomplete.000000000000.json')
+        for path in (antigo, antigo + '.gz'):
+            with open(path, 'w') as f:
+                f.write('{}')
+
+        manifest = write_index(directory)
+        with open(os.path.join(directory, MANIFEST_NAME)) as f:
+            assert json.load(f)['index'] == manifest['index']
+        assert not os.path.exists(antigo) and not os.path.exists(antigo + '.gz')
+
+        assets = StaticAssets(directory)
+        assert 'immutable' in assets.get(manifest['index']).cache_control
+        assert assets.get(MANIFEST_NAME).cache_control == 'no-cache'
+        assert write_index(directory)['index'] == manifest['index']  # mesmo catálogo, mesmo nome
+    print(f"✅ Índice {manifest['index']} com {manifest['entries']} doenças")
+
+if __name__ == "__main__":
+    test_build_index()
+    test_write_index()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Script de teste para o log de alterações do catálogo e o endpoint de sincronização incremental
+"""
+
+import os
+import tempfile
+
+import catalog_changes
+from catalog_changes import changelog_path, changes_since, read_changelog
+from catalog_store import record_change, save_catalog
+
+ASMA = {'cid': 'J45', 'nome': 'Asma', 'categoria': 'Doenças do aparelho respiratório'}
+HIPERTENSAO = {'cid': 'I10', 'nome': 'Hipertensão', 'categoria': 'Doenças do aparelho circulatório'}
+DIABETES = {'cid': 'E11', 'nome': 'Diabetes', 'categoria': 'Doenças endócrinas'}
+
+def test_log_de_alteracoes():
+    """Testa o diff por CID gravado a cada save_catalog e a combinação das entradas"""
+    print("🧪 Testando log de alterações do catálogo")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'doencas_cache.json')
+        save_catalog(path, [ASMA, HIPERTENSAO])  # primeira gravação: base do log
+        log = read_changelog(changelog_path(path))
+        assert log['version'] == 1 and log['entries'] == []
+
+        save_catalog(path, [dict(ASMA, nome='Asma brônquica'), DIABETES])
+        save_catalog(path, [dict(ASMA, nome='Asma brônquica'), DIABETES])  # sem mudanças: sem entrada
+        record_change(path, 'custom', added=['Z99.9'], records={'Z99.9': {'code': 'Z99.9', 'description': 'Teste'}})
+        log = read_changelog(changelog_path(path))
+        assert log['version'] == 3 and len(log['entries']) == 2
+        assert log['entries'][0] == dict(log['entries'][0], added=['E11'], removed=['I10'], modified=['J45'],
+                                         catalog_version=2)
+
+        delta = changes_since(log, 1)
+        assert [(i['source'], i['cid']) for i in delta['added']] == [('catalog', 'E11'), ('custom', 'Z99.9')]
+        assert delta['added'][1]['record']['description'] == 'Teste'
+        assert [i['cid'] for i in delta['removed']] == ['I10']
+        assert changes_since(log, 3) == {'added': [], 'removed': [], 'modified': []}
+        assert changes_since(log, 0) is None and changes_since(log, 4) is None
+
+        # Incluído e removido depois de `since` não aparece; removido e incluído vira alterado
+        save_catalog(path, [dict(ASMA, nome='Asma brônquica'), HIPERTENSAO])
+        delta = changes_since(read_changelog(changelog_path(path)), 1)
+        assert 'E11' not in [i['cid'] for i in delta['added'] + delta['removed']]
+        assert [i['cid'] for i in delta['modified']] == ['I10', 'J45']
+    print("✅ Diferenças por CID combinadas desde a versão pedida")
+
+def test_compactacao():
+    """Testa que versões anteriores às entradas descartadas exigem o catálogo inteiro"""
+    original = catalog_changes.MAX_ENTRIES
+    catalog_changes.MAX_ENTRIES = 3
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'doencas_cache.json')
+            for i in range(5):
+                record_change(path, 'custom', added=[f'Z0{i}'])
+            log = read_changelog(changelog_path(path))
+            assert log['version'] == 6 and log['base'] == 3 and len(log['entries']) == 3
+            assert changes_since(log, 2) is None
+            assert [i['cid'] for i in changes_since(log, 3)['added']] == ['Z02', 'Z03', 'Z04']
+    finally:
+        catalog_changes.MAX_ENTRIES = original
+    print("✅ Log compactado pede o catálogo inteiro")
+
+def test_endpoint():
+    """Testa GET /api/v2/catalog/changes com e sem `since`"""
+    import src.routes.enhanced_disease as rotas
+    from main import app
+    from response_cache import catalog_cache
+
+    original = rotas.DOENCAS_PATH
+    with tempfile.TemporaryDirectory() as tmp:
+        rotas.DOENCAS_PATH = os.path.join(tmp, 'doencas_cache.json')
+        catalog_cache.clear()
+        try:
+            record_change(rotas.DOENCAS_PATH, 'custom', added=['Z98'], records={'Z98': {'code': 'Z98'}})
+            client = app.test_client()
+            completo = client.get('/api/v2/catalog/changes').json
+            assert completo['full_snapshot_required'] and completo['version'] == 2
+            delta = client.get('/api/v2/catalog/changes?since=1').json
+            assert not delta['full_snapshot_required'] and delta['added'][0]['cid'] == 'Z98'
+            assert client.get('/api/v2/catalog/changes?since=2').json['added'] == []
+        finally:
+            rotas.DOENCAS_PATH = original
+            catalog_cache.clear()
+    print("✅ Endpoint de sincronização incremental")
+
+if __name__ == "__main__":
+    test_log_de_alteracoes()
+    test_compactacao()
+    test_endpoint()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Script de teste para o snapshot binário do catálogo
+"""
+
+import json
+import os
+import tempfile
+
+from catalog_snapshot import CID10_PATH, build_snapshot, get_snapshot, read_snapshot, write_snapshot
+
+def test_catalog_snapshot():
+    """Testa ida e volta do snapshot e consistência dos índices"""
+    print("🧪 Testando catalog_snapshot")
+
+    snapshot = build_snapshot()
+    assert snapshot.is_current()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'catalog_snapshot.pickle')
+        write_snapshot(snapshot, path)
+        loaded = read_snapshot(path)
+        assert loaded is not None
+        assert loaded.doencas == snapshot.doencas and loaded.cid10 == snapshot.cid10
+        print(f"✅ Snapshot relido: {len(loaded.doencas)} doenças, {len(loaded.cid10)} códigos CID-10")
+
+        # Arquivo com cabeçalho desconhecido é ignorado
+        with open(path, 'wb') as f:
+            f.write(b'lixo')
+        assert read_snapshot(path) is None
+        print("✅ Cabeçalho inválido ignorado")
+
+    # Índices equivalem à busca linear (primeira ocorrência)
+    for doenca in snapshot.doencas[:50]:
+        primeira = next(d for d in snapshot.doencas if d['cid'] == doenca['cid'])
+        assert snapshot.doenca_por_cid(doenca['cid']) is primeira
+    for item in snapshot.cid10[:50]:
+        assert snapshot.cid10_por_codigo(item['code'])['code'] == item['code']
+    print("✅ Índices consistentes com a busca linear")
+
+def test_fonte_do_cid10():
+    """
+    Testa que os serviços usam o cid10_datasus.json da raiz do repositório. Antes do snapshot
+    eles procuravam o arquivo três diretórios acima do módulo e caíam nos 10 códigos de exemplo.
+    """
+    from cid_categorizer import CIDCategorizer
+    from diagnostic_engine import DiagnosticEngine
+
+    raiz = os.path.dirname(os.path.abspath(__file__))
+    assert CID10_PATH == os.path.join(raiz, 'cid10_datasus.json')
+    with open(CID10_PATH, encoding='utf-8') as f:
+        arquivo = json.load(f)
+
+    assert len(arquivo) == 49 and get_snapshot().cid10 == arquivo
+    categorizer, engine = CIDCategorizer(), DiagnosticEngine()
+    assert len(categorizer.cid10_data) == len(engine.cid10_data) == 49
+    assert categorizer.search_by_code('A00')['description'] == 'Cólera'  # ausente dos dados de exemplo
+    print(f"✅ CIDCategorizer e DiagnosticEngine com os {len(arquivo)} códigos de {os.path.basename(CID10_PATH)}")
+
+if __name__ == "__main__":
+    test_catalog_snapshot()
+    test_fonte_do_cid10()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Script de teste para a gravação atômica do cache de doenças
+"""
+
+import json
+import os
+import stat
+import tempfile
+
+from catalog_store import FORMAT_VERSION, CatalogFormatError, read_catalog, save_catalog, write_bytes_atomic
+
+def test_catalog_store():
+    """Testa cabeçalho versionado, compatibilidade legada e ausência de temporários"""
+    print("🧪 Testando catalog_store")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'doencas_cache.json')
+
+        # Arquivo legado, sem cabeçalho
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'doencas': [{'cid': 'J45', 'nome': 'Asma'}], 'last_update': 1}, f)
+        legacy = read_catalog(path)
+        assert legacy['version'] == 0 and legacy['doencas'][0]['cid'] == 'J45'
+        print("✅ Cache legado lido como versão 0")
+
+        # Gravações sucessivas incrementam a versão
+        first = save_catalog(path, [{'cid': 'I10', 'nome': 'Hipertensão'}])
+        second = save_catalog(path, [{'cid': 'I10', 'nome': 'Hipertensão'}, {'cid': 'E11', 'nome': 'Diabetes'}])
+        assert first['version'] == 1 and second['version'] == 2
+        data = read_catalog(path)
+        assert data['format_version'] == FORMAT_VERSION
+        assert data['total'] == 2 and len(data['doencas']) == 2
+        print(f"✅ Versão monotônica: {first['version']} -> {second['version']}")
+
+        # Nenhum arquivo temporário fica para trás
+        leftovers = [name for name in os.listdir(tmp) if name.endswith('.tmp')]
+        assert leftovers == []
+        print("✅ Sem temporários remanescentes")
+
+        # Formato futuro é rejeitado em vez de virar catálogo vazio
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'format_version': FORMAT_VERSION + 1, 'doencas': []}, f)
+        try:
+            read_catalog(path)
+            assert False, "formato futuro deveria falhar"
+        except CatalogFormatError:
+            print("✅ Formato desconhecido rejeitado")
+
+def test_permissoes():
+    """Testa que a gravação atômica mantém o modo do destino (e não o 0600 do mkstemp)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        novo = os.path.join(tmp, 'catalog_shared.bin')
+        write_bytes_atomic(novo, b'novo')
+        umask = os.umask(0)
+        os.umask(umask)
+        assert stat.S_IMODE(os.stat(novo).st_mode) == 0o666 & ~umask
+
+        existente = os.path.join(tmp, 'doencas_cache.json')
+        with open(existente, 'w') as f:
+            f.write('{}')
+        os.chmod(existente, 0o640)
+        save_catalog(existente, [{'cid': 'J45', 'nome': 'Asma'}])
+        assert stat.S_IMODE(os.stat(existente).st_mode) == 0o640
+    print("✅ Permissões do arquivo preservadas na troca atômica")
+
+if __name__ == "__main__":
+    test_catalog_store()
+    test_permissoes()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Script de teste para o pipeline da análise abrangente (etapas calculadas uma vez)
+"""
+
+import spans
+from comprehensive_analysis import AnalysisContext, analyze
+from diagnostic_engine import DiagnosticEngine
+from enhanced_drug_interaction_checker import EnhancedDrugInteractionChecker
+
+LAUDO = "Paciente com dor no peito, falta de ar e sudorese há duas horas."
+MEDICAMENTOS = ['varfarina', 'aspirina', 'omeprazol']
+
+class CheckerContado(EnhancedDrugInteractionChecker):
+    def __init__(self):
+        super().__init__()
+        self.verificacoes = 0
+
+    def check_interactions(self, medications):
+        self.verificacoes += 1
+        return super().check_interactions(medications)
+
+def test_etapas_uma_vez():
+    """Testa que o relatório reaproveita o resumo e que os spans da thread do pool são somados"""
+    print("🧪 Testando análise abrangente com relatórios")
+
+    engine = DiagnosticEngine()
+    checker = CheckerContado()
+    token = spans.begin()
+    try:
+        ctx = analyze(AnalysisContext(LAUDO, MEDICAMENTOS, include_reports=True), engine, checker)
+        verificacoes = checker.verificacoes
+    finally:
+        coletados = spans.end(token)
+
+    assert verificacoes == 1
+    assert ctx.interaction_report == checker.generate_interaction_report(MEDICAMENTOS)
+    assert ctx.medical_report == engine.generate_medical_report(engine.analyze_symptoms_report(LAUDO), LAUDO)
+    assert 'interactions.check' in coletados and 'diagnostic.extract_symptoms' in coletados
+    assert ctx.recommendations[-1] == "Monitore sintomas e efeitos adversos"
+    print(f"✅ check_interactions chamado {verificacoes} vez, {len(coletados)} spans na requisição")
+
+def test_etapas_opcionais():
+    """Testa que só as etapas com entrada suficiente são executadas"""
+    checker = CheckerContado()
+    ctx = analyze(AnalysisContext(LAUDO, ['aspirina']), DiagnosticEngine(), checker)
+    assert ctx.diagnostic_results is not None and ctx.interaction_summary is None
+    assert checker.verificacoes == 0 and ctx.medical_report is None
+    print("✅ Etapa de interações ignorada com um único medicamento")
+
+def test_rotas_montadas():
+    """Testa /api/v2/comprehensive_analysis servido por main.app"""
+    from main import app
+    client = app.test_client()
+    engine = DiagnosticEngine()
+    checker = EnhancedDrugInteractionChecker()
+    esperado = analyze(AnalysisContext(LAUDO, MEDICAMENTOS, include_reports=True), engine, checker)
+
+    analise = client.post('/api/v2/comprehensive_analysis', json={
+        'symptoms_report': LAUDO, 'current_medications': MEDICAMENTOS, 'include_reports': True}).json
+    assert analise['success'] and analise['analysis_type'] == 'comprehensive'
+    diagnostico = analise['diagnostic_analysis']
+    assert [d['cid_code'] for d in diagnostico['diagnostic_results']] == [r.cid_code for r in esperado.diagnostic_results]
+    assert diagnostico['medical_report'] == esperado.medical_report
+    assert analise['interaction_analysis']['summary'] == esperado.interaction_summary
+    assert analise['interaction_analysis']['detailed_report'] == esperado.interaction_report
+    assert analise['integrated_recommendations'] == esperado.recommendations
+    assert client.post('/api/v2/comprehensive_analysis', json={}).status_code == 400
+    print(f"✅ /api/v2/comprehensive_analysis: {len(esperado.diagnostic_results)} diagnósticos, "
+          f"{esperado.interaction_summary['total_interactions']} interações")
+
+def test_rotas_por_etapa():
+    """Testa /api/v2/diagnose/symptoms e /interactions/check servidos pelas etapas do pipeline"""
+    from main import app
+    client = app.test_client()
+    engine = DiagnosticEngine()
+    checker = EnhancedDrugInteractionChecker()
+    esperado = analyze(AnalysisContext(LAUDO, MEDICAMENTOS, include_reports=True), engine, checker)
+
+    sintomas = client.post('/api/v2/diagnose/symptoms', json={'symptoms_report': LAUDO, 'include_report': True}).json
+    assert [d['cid_code'] for d in sintomas['diagnostic_results']] == [r.cid_code for r in esperado.diagnostic_results]
+    assert sintomas['medical_report'] == esperado.medical_report
+    vago = client.post('/api/v2/diagnose/symptoms', json={'symptoms_report': 'mal'}).json
+    assert [d['cid_code'] for d in vago['diagnostic_results']] == ['R68']
+
+    interacoes = client.post('/api/v2/interactions/check', json={'medications': MEDICAMENTOS, 'include_report': True}).json
+    assert interacoes['summary'] == esperado.interaction_summary
+    assert interacoes['detailed_report'] == esperado.interaction_report
+    print("✅ Diagnóstico e interações pelas etapas do pipeline")
+
+if __name__ == "__main__":
+    test_etapas_uma_vez()
+    test_etapas_opcionais()
+    test_rotas_montadas()
+    test_rotas_por_etapa()
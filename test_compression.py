@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Script de teste para o middleware de compressão das respostas da API
+"""
+
+import gzip
+
+from flask import Flask, Response, jsonify
+
+from compression import CompressionMiddleware, choose_encoding
+
+def test_compression_middleware():
+    """Testa negociação, limite de tamanho e respostas que não devem ser comprimidas"""
+    print("🧪 Testando middleware de compressão")
+
+    app = Flask(__name__)
+    app.wsgi_app = CompressionMiddleware(app.wsgi_app, min_size=256)
+    grande = {"doencas": [{"cid": f"A{i:02d}", "nome": "Doença infecciosa intestinal"} for i in range(50)]}
+
+    @app.route('/api/grande')
+    def api_grande():
+        response = jsonify(grande)
+        response.headers['ETag'] = '"abc"'
+        return response
+
+    @app.route('/api/pequena')
+    def api_pequena():
+        return jsonify({"success": True})
+
+    @app.route('/api/stream')
+    def api_stream():
+        return Response((b'{"cid": "A00"}\n' for _ in range(100)), mimetype='application/x-ndjson')
+
+    @app.route('/pagina')
+    def pagina():
+        return "x" * 2000
+
+    client = app.test_client()
+    gz = {'Accept-Encoding': 'gzip'}
+
+    response = client.get('/api/grande', headers=gz)
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['Vary'] == 'Accept-Encoding' and response.headers['ETag'] == 'W/"abc"'
+    assert int(response.headers['Content-Length']) == len(response.data)
+    assert gzip.decompress(response.data) == client.get('/api/grande').data
+    print(f"✅ JSON comprimido: {len(client.get('/api/grande').data)} -> {len(response.data)} bytes")
+
+    assert 'Content-Encoding' not in client.get('/api/grande').headers
+    assert 'Content-Encoding' not in client.get('/api/pequena', headers=gz).headers
+    assert 'Content-Encoding' not in client.get('/api/stream', headers=gz).headers
+    assert 'Content-Encoding' not in client.get('/pagina', headers=gz).headers
+    assert client.head('/api/grande', headers=gz).headers.get('Content-Encoding') is None
+    print("✅ Sem compressão para respostas pequenas, streams, HEAD e rotas fora da API")
+
+    assert choose_encoding('gzip;q=0, identity') is None
+    assert choose_encoding('deflate, gzip;q=0.5') == 'gzip'
+    print("✅ Negociação do Accept-Encoding")
+
+if __name__ == "__main__":
+    test_compression_middleware()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Script de teste para o armazenamento persistente de CIDs personalizados
+"""
+
+import os
+import tempfile
+
+import cid_categorizer
+from cid_categorizer import CIDCategorizer
+from custom_cid_store import CustomCIDStore, DuplicateCIDError
+
+def test_store():
+    """Testa índice único, versão incrementada na inclusão e WAL no SQLite"""
+    print("🧪 Testando custom_cid_store")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = CustomCIDStore(f"sqlite:///{os.path.join(tmp, 'app.db')}")
+        assert store.load() == (0, [])
+        version, registro = store.add('Z99.8', 'Condição de teste', 'doctor')
+        assert version == 1 and registro['custom'] and store.version() == 1
+        try:
+            store.add('Z99.8', 'Outra descrição', 'doctor')
+            assert False, "código duplicado deveria ser recusado"
+        except DuplicateCIDError as e:
+            assert e.existing['description'] == 'Condição de teste'
+        assert store.version() == 1  # inclusão recusada não altera a versão
+        with store.engine.connect() as conn:
+            assert conn.exec_driver_sql('PRAGMA journal_mode').scalar() == 'wal'
+        store.engine.dispose()
+    print("✅ Duplicado recusado pelo banco, versão monotônica")
+
+def test_categorizer_entre_workers():
+    """Testa que a inclusão feita por uma instância aparece na outra pela verificação de versão"""
+    original = cid_categorizer.CUSTOM_CHECK_INTERVAL
+    cid_categorizer.CUSTOM_CHECK_INTERVAL = 0
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            url = f"sqlite:///{os.path.join(tmp, 'app.db')}"
+            worker1 = CIDCategorizer(CustomCIDStore(url))
+            worker2 = CIDCategorizer(CustomCIDStore(url))
+            assert worker2.search_by_code('Z99.7') is None
+
+            worker1.add_custom_cid('z99.7', 'Condição personalizada')
+            assert worker1.search_by_code('Z99.7')['custom']
+            assert worker2.search_by_code('Z99.7')['description'] == 'Condição personalizada'
+            assert any(d['code'] == 'Z99.7' for d in worker2.get_diseases_by_category('Z'))
+
+            oficial = worker2.cid10_data[0]['code']
+            for codigo, erro in (('Z99.7', 'já existe'), (oficial, 'já existe'), ('XYZ', 'inválido')):
+                try:
+                    worker2.add_custom_cid(codigo, 'Duplicado')
+                    assert False, f"{codigo} deveria ser recusado"
+                except ValueError as e:
+                    assert erro in str(e)
+
+            reiniciado = CIDCategorizer(CustomCIDStore(url))
+            assert reiniciado.search_by_code('Z99.7') is not None
+            for worker in (worker1, worker2, reiniciado):
+                worker._store.engine.dispose()
+    finally:
+        cid_categorizer.CUSTOM_CHECK_INTERVAL = original
+    print("✅ CIDs personalizados visíveis em outros workers e após reinício")
+
+def test_banco_indisponivel():
+    """Testa que um diretório do SQLite que não pode ser criado não derruba as buscas"""
+    with tempfile.TemporaryDirectory() as tmp:
+        bloqueio = os.path.join(tmp, 'arquivo')
+        open(bloqueio, 'w').close()
+        # O "diretório" do banco é um arquivo: os.makedirs levanta OSError na primeira conexão
+        categorizer = CIDCategorizer(CustomCIDStore(f"sqlite:///{os.path.join(bloqueio, 'sub', 'app.db')}"))
+        assert categorizer.search_by_code('Z99.9') is None
+        assert categorizer.search_by_name('cólera')[0]['code'].startswith('A00')
+        assert categorizer.custom_cids == []
+    print("✅ Banco indisponível: catálogo oficial continua respondendo")
+
+def test_rota_montada():
+    """Testa /api/v2/add_custom_cid servido por main.app (validações que não gravam nada)"""
+    from main import app
+    client = app.test_client()
+    resposta = client.post('/api/v2/add_custom_cid', json={'code': 'Z99.8'})
+    assert resposta.status_code == 400 and not resposta.json['success']
+    resposta = client.post('/api/v2/add_custom_cid', json={'code': 'Z99.8', 'description': 'Teste'})
+    assert resposta.status_code == 400 and 'médicos' in resposta.json['message']
+    print("✅ /api/v2/add_custom_cid registrado no blueprint montado")
+
+def test_falha_no_log_de_alteracoes():
+    """Testa que o CID gravado no banco é confirmado mesmo se o log de alterações falhar"""
+    from main import app
+    from src.routes import enhanced_disease
+
+    def log_indisponivel(*args, **kwargs):
+        raise OSError("disco cheio")
+
+    originais = (enhanced_disease.cid_categorizer, enhanced_disease.record_change)
+    with tempfile.TemporaryDirectory() as tmp:
+        categorizer = CIDCategorizer(CustomCIDStore(f"sqlite:///{os.path.join(tmp, 'app.db')}"))
+        enhanced_disease.cid_categorizer, enhanced_disease.record_change = categorizer, log_indisponivel
+        try:
+            resposta = app.test_client().post('/api/v2/add_custom_cid', json={
+                'code': 'Z99.6', 'description': 'Condição de teste', 'user_type': 'doctor'})
+        finally:
+            enhanced_disease.cid_categorizer, enhanced_disease.record_change = originais
+            categorizer._store.engine.dispose()
+        assert resposta.status_code == 200 and resposta.json['disease']['code'] == 'Z99.6'
+    print("✅ Falha no log de alterações não derruba a inclusão já gravada")
+
+if __name__ == "__main__":
+    test_store()
+    test_categorizer_entre_workers()
+    test_banco_indisponivel()
+    test_rota_montada()
+    test_falha_no_log_de_alteracoes()
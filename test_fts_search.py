@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Script de teste para o backend de busca SQLite FTS5 do catálogo CID-10
+"""
+
+import os
+import tempfile
+
+from cid_categorizer import CIDCategorizer
+from custom_cid_store import CustomCIDStore
+from fts_search import FTSSearchIndex, build_match, catalog_index
+
+ENTRADAS = [
+    {'code': 'I10', 'description': 'Hipertensão essencial (primária)'},
+    {'code': 'I11', 'description': 'Doença cardíaca hipertensiva'},
+    {'code': 'E11', 'description': 'Diabetes mellitus não-insulino-dependente'},
+    {'code': 'A15.0', 'description': 'Tuberculose pulmonar'},
+    {'code': 'J44', 'description': 'Outras doenças pulmonares obstrutivas crônicas'},
+    {'code': 'I15', 'description': 'Hipertensão secundária'},
+]
+
+def test_busca_por_nome():
+    """Testa acentos, prefixos, ordenação BM25 e a repetição com OR"""
+    print("🧪 Testando busca FTS5 por nome")
+
+    assert build_match('Doença p pulm') == '"doença"* AND "pulm"*'
+    assert build_match('a') is None
+
+    index = FTSSearchIndex(ENTRADAS)
+    codigos = [r['code'] for r in index.search('hipertensao')]
+    # Sem acento; "hipertensiva" é outro termo; a descrição mais curta vem primeiro no BM25
+    assert codigos == ['I15', 'I10'], codigos
+    assert {r['code'] for r in index.search('hiper')} == {'I10', 'I11', 'I15'}
+    assert [r['code'] for r in index.search('doenca pulm')] == ['J44']
+    # Nenhuma descrição tem os dois termos: a busca é refeita com OR
+    assert {r['code'] for r in index.search('diabetes tuberculose')} == {'E11', 'A15.0'}
+    resultado = index.search('hipertensão', limit=1)
+    assert len(resultado) == 1 and resultado[0]['relevance'] > 0
+    assert index.search('inexistente') == []
+    print(f"✅ {len(codigos)} resultados para 'hipertensao'")
+
+def test_busca_por_codigo():
+    """Testa a faixa por prefixo de código, em ordem e com limite"""
+    index = FTSSearchIndex(ENTRADAS)
+    assert [r['code'] for r in index.search_code_prefix('I1')] == ['I10', 'I11', 'I15']
+    assert [r['code'] for r in index.search_code_prefix('I1', limit=2)] == ['I10', 'I11']
+    assert index.search_code_prefix('A15')[0] is ENTRADAS[3]  # o próprio registro do catálogo
+    assert index.search_code_prefix('Z') == []
+    print("✅ Busca por padrão de código pelo índice")
+
+def test_categorizer_com_fts5():
+    """Testa o CIDCategorizer com MEDIA_SEARCH_BACKEND=fts5 e CIDs personalizados"""
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'app.db')}"
+        memoria = CIDCategorizer(CustomCIDStore(url))
+        fts = CIDCategorizer(CustomCIDStore(url), search_backend='fts5')
+        assert fts._fts is not None and memoria._fts is None
+        assert CIDCategorizer(CustomCIDStore(url), search_backend='outro')._fts is None
+
+        esperado = {r['code'] for r in memoria.search_by_name('tuberculose')}
+        assert {r['code'] for r in fts.search_by_name('tuberculose')} == esperado
+        assert fts.search_by_code_pattern('A0') == memoria.search_by_code_pattern('A0')
+        assert fts.search_by_name('a') == []
+
+        fts.add_custom_cid('Z99.8', 'Síndrome experimental de teste')
+        assert [r['code'] for r in fts.search_by_name('sindrome experimental')] == ['Z99.8']
+        assert fts.search_by_code_pattern('Z99')[0]['custom']
+    print("✅ CIDCategorizer com FTS5 equivalente à busca em memória")
+
+def test_indice_do_catalogo():
+    """Testa catalog_index com outras chaves, reaproveitado para a mesma lista, e o total encontrado"""
+    doencas = [{'cid': e['code'], 'nome': e['description']} for e in ENTRADAS]
+    index = catalog_index(doencas, 'cid', 'nome')
+    assert catalog_index(doencas, 'cid', 'nome') is index
+    assert catalog_index(list(doencas), 'cid', 'nome') is not index
+    encontrados, total = index.search_entries('hipertensao', limit=1)
+    assert total == 2 and encontrados[0][0] is doencas[5]
+    assert index.search_entries('x') == ([], 0)
+    print("✅ Índice reaproveitado enquanto a lista é a mesma")
+
+def test_rotas_com_fts5():
+    """Testa /api/v2/search/name pelo índice FTS5 e /api/v2/search/code pelo CIDCategorizer"""
+    from main import app
+    from src.routes import enhanced_disease
+    client = app.test_client()
+
+    def buscar(query):
+        return client.post('/api/v2/search/name', json={'query': query}).json
+
+    memoria = buscar('tuberculose')
+    original = enhanced_disease.SEARCH_FTS
+    enhanced_disease.SEARCH_FTS = True
+    try:
+        fts = buscar('tuberculose')
+        dois_termos = buscar('tuberculose pulmonar')
+    finally:
+        enhanced_disease.SEARCH_FTS = original
+    assert fts['total_found'] == memoria['total_found'] > 0
+    assert {r['code'] for r in fts['results']} == {r['code'] for r in memoria['results']}
+    # Mesma escala de relevância (0 a 100) que o SPA mostra como porcentagem
+    assert fts['results'][0]['relevance'] == 100
+    assert all(0 < r['relevance'] <= 100 and isinstance(r['relevance'], int) for r in fts['results'])
+    assert all('pulmonar' in r['description'].lower() for r in dois_termos['results']) and dois_termos['results']
+
+    exato = client.post('/api/v2/search/code', json={'code': 'a00'}).json
+    assert exato['disease']['description'] == 'Cólera' and 'subcategory' in exato['disease']
+    semelhantes = client.post('/api/v2/search/code', json={'code': 'A0'}).json
+    assert not semelhantes['exact_match'] and all(r['code'].startswith('A0') for r in semelhantes['pattern_results'])
+    print(f"✅ {fts['total_found']} resultados pelo FTS5 em /api/v2/search/name")
+
+if __name__ == "__main__":
+    test_busca_por_nome()
+    test_busca_por_codigo()
+    test_categorizer_com_fts5()
+    test_indice_do_catalogo()
+    test_rotas_com_fts5()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Script de teste para a recarga a quente do catálogo e da base de conhecimento
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import catalog_snapshot
+import knowledge_base
+import catalog_refresh
+import fork_hooks
+from hot_reload import HotReloader, ReloadError
+from service_registry import ServiceRegistry
+
+def _editar_tabela(path, alterar):
+    with open(path, encoding='utf-8') as f:
+        document = json.load(f)
+    alterar(document)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(document, f, ensure_ascii=False)
+    # Garante carimbo de stat diferente mesmo em sistemas de arquivos com baixa resolução
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+def test_hot_reload():
+    """Testa troca atômica de tabelas, reconstrução de serviços e rejeição de dados inválidos"""
+    print("🧪 Testando hot_reload")
+
+    originais = (knowledge_base.KNOWLEDGE_DIR, catalog_snapshot.DOENCAS_PATH, catalog_snapshot.CID10_PATH)
+    with tempfile.TemporaryDirectory() as tmp:
+        shutil.copytree(originais[0], os.path.join(tmp, 'knowledge'),
+                        ignore=shutil.ignore_patterns('*.pickle'))
+        shutil.copy(originais[1], tmp)
+        shutil.copy(originais[2], tmp)
+        knowledge_base.KNOWLEDGE_DIR = os.path.join(tmp, 'knowledge')
+        catalog_snapshot.DOENCAS_PATH = os.path.join(tmp, 'doencas_cache.json')
+        catalog_snapshot.CID10_PATH = os.path.join(tmp, 'cid10_datasus.json')
+        try:
+            class Servico:
+                def __init__(self):
+                    self.aliases = knowledge_base.get_table('drug_aliases')
+
+            registry = ServiceRegistry()
+            servico = registry.register('servico', Servico)
+            reloader = HotReloader(registry)
+            em_andamento = registry.get('servico')
+            assert 'dipirona' in servico.aliases
+
+            assert reloader.reload()['reloaded'] is False
+            print("✅ Sem alterações, nada é recarregado")
+
+            aliases_path = knowledge_base.source_path('drug_aliases')
+            _editar_tabela(aliases_path, lambda doc: doc['data'].update({'novalgina': ['dipirona']}))
+            status = reloader.reload()
+            assert status['reloaded'] and status['generation'] == 1 and status['services'] == ['servico']
+            assert 'novalgina' in servico.aliases
+            assert 'novalgina' not in em_andamento.aliases
+            print("✅ Tabela trocada; instância em uso manteve os dados anteriores")
+
+            _editar_tabela(aliases_path, lambda doc: doc['data'].update({'novalgina': 'dipirona'}))
+            try:
+                reloader.reload()
+                assert False, "tabela inválida deveria ser rejeitada"
+            except ReloadError:
+                pass
+            assert servico.aliases['novalgina'] == ['dipirona'] and reloader.generation == 1
+            assert reloader.reload()['reloaded'] is False
+            print("✅ Dados inválidos rejeitados, geração anterior mantida")
+        finally:
+            knowledge_base.KNOWLEDGE_DIR, catalog_snapshot.DOENCAS_PATH, catalog_snapshot.CID10_PATH = originais
+            knowledge_base.install_tables(knowledge_base.compile_knowledge())
+            catalog_snapshot.install_snapshot(catalog_snapshot.build_snapshot())
+
+def test_after_fork():
+    """Testa a reinicialização de locks herdados travados (post_fork do gunicorn)"""
+    print("🧪 Testando hooks de fork")
+
+    travados = [catalog_snapshot._lock, knowledge_base._lock, catalog_refresh._lock]
+    for lock in travados:
+        lock.acquire()
+    try:
+        fork_hooks.run_after_fork()
+        assert not any(lock.locked() for lock in
+                       (catalog_snapshot._lock, knowledge_base._lock, catalog_refresh._lock))
+        assert catalog_snapshot.get_snapshot() is not None
+        assert not catalog_refresh.refresh_running()
+        print("✅ Locks recriados no processo filho")
+    finally:
+        for lock in travados:
+            lock.release()
+
+def test_outros_workers():
+    """Testa que a thread de observação de outro worker recarrega quando os artefatos são regravados"""
+    print("🧪 Testando recarga propagada pelos artefatos compilados")
+
+    originais = (catalog_snapshot.SNAPSHOT_PATH, knowledge_base.COMPILED_PATH)
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog_snapshot.SNAPSHOT_PATH = os.path.join(tmp, 'catalog_snapshot.pickle')
+        knowledge_base.COMPILED_PATH = os.path.join(tmp, 'knowledge.pickle')
+        outro_worker = HotReloader(ServiceRegistry(), interval=0.05)
+        try:
+            assert outro_worker.start_watcher() and outro_worker.watcher_running()
+            # O worker que atendeu o POST /reload regrava os artefatos (persist=True)
+            with open(catalog_snapshot.SNAPSHOT_PATH, 'wb') as f:
+                f.write(b'novo')
+            limite = time.time() + 5
+            while outro_worker.generation == 0 and time.time() < limite:
+                time.sleep(0.05)
+            assert outro_worker.generation == 1
+        finally:
+            outro_worker.stop_watcher()
+            catalog_snapshot.SNAPSHOT_PATH, knowledge_base.COMPILED_PATH = originais
+    print("✅ Outro worker recarregou pela thread de observação")
+
+def test_intervalo_padrao():
+    """Testa que gunicorn.conf.py liga a thread de observação quando MEDIA_RELOAD_INTERVAL não está definido"""
+    env = {k: v for k, v in os.environ.items() if k != 'MEDIA_RELOAD_INTERVAL'}
+    codigo = "import runpy; runpy.run_path('gunicorn.conf.py'); import hot_reload; print(hot_reload.RELOAD_INTERVAL)"
+    saida = subprocess.run([sys.executable, '-c', codigo], cwd=os.path.dirname(os.path.abspath(__file__)),
+                           env=env, capture_output=True, text=True, check=True).stdout
+    assert float(saida.split()[-1]) > 0
+    print(f"✅ MEDIA_RELOAD_INTERVAL padrão no gunicorn: {saida.split()[-1]} s")
+
+if __name__ == "__main__":
+    test_hot_reload()
+    test_after_fork()
+    test_outros_workers()
+    test_intervalo_padrao()
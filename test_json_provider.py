@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Script de teste para o provedor JSON rápido do Flask
+"""
+
+import dataclasses
+import decimal
+import json
+import uuid
+from datetime import date, datetime, timezone
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from json_provider import FastJSONProvider, detect_backend
+
+@dataclasses.dataclass
+class Medicamento:
+    nome: str
+    dose_mg: int
+
+class Marcado:
+    def __html__(self):
+        return '<b>Asma</b>'
+
+PAYLOAD = {
+    'zeta': 1,
+    'alfa': [1, 2.5, None, True],
+    'data': date(2024, 6, 1),
+    'momento': datetime(2024, 6, 1, 12, 30, tzinfo=timezone.utc),
+    'preco': decimal.Decimal('10.50'),
+    'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+    'medicamento': Medicamento('Losartana', 50),
+    'html': Marcado(),
+    'acentos': 'Hipertensão',
+}
+
+def _providers(app):
+    backends = ['json'] + ([detect_backend()] if detect_backend() != 'json' else [])
+    return {backend: FastJSONProvider(app, backend=backend) for backend in backends}
+
+def test_tipos_fora_do_codificador():
+    """Testa que datas, Decimal, UUID, dataclass e __html__ saem como no provedor padrão do Flask"""
+    print("🧪 Testando fallback para tipos não suportados pelo codificador rápido")
+
+    app = Flask(__name__)
+    esperado = json.loads(DefaultJSONProvider(app).dumps(PAYLOAD))
+    for backend, provider in _providers(app).items():
+        with app.app_context():
+            assert json.loads(provider.dumps_bytes(PAYLOAD)) == esperado, backend
+            assert json.loads(provider.dumps(PAYLOAD)) == esperado, backend
+        try:
+            provider.dumps_bytes({'conjunto': {1, 2}})
+            assert False, "tipo sem conversão deveria falhar"
+        except TypeError:
+            pass
+    print(f"✅ Mesma saída do provedor padrão nos backends {', '.join(_providers(app))}")
+
+def test_sort_keys_e_chaves_nao_str():
+    """Testa ordenação das chaves (sort_keys) e chaves int convertidas para string"""
+    app = Flask(__name__)
+    for backend, provider in _providers(app).items():
+        assert list(json.loads(provider.dumps_bytes({'b': 1, 'a': 2}))) == ['a', 'b'], backend
+        provider.sort_keys = False
+        assert list(json.loads(provider.dumps_bytes({'b': 1, 'a': 2}))) == ['b', 'a'], backend
+        assert json.loads(provider.dumps_bytes({1: 'I10', 2: 'E11'})) == {'1': 'I10', '2': 'E11'}, backend
+    print("✅ sort_keys respeitado e chaves não-str convertidas")
+
+def test_resposta_e_requisicao():
+    """Testa jsonify (corpo em bytes, acentos em UTF-8) e request.get_json pelo provedor"""
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+
+    @app.route('/eco', methods=['POST'])
+    def eco():
+        from flask import jsonify, request
+        return jsonify(recebido=request.get_json())
+
+    response = app.test_client().post('/eco', data=json.dumps({'nome': 'Hipertensão', 'cids': ['I10']}),
+                                      content_type='application/json')
+    assert response.status_code == 200 and response.mimetype == 'application/json'
+    assert response.get_json() == {'recebido': {'nome': 'Hipertensão', 'cids': ['I10']}}
+    assert app.json.loads('{"a": [1, 2]}') == {'a': [1, 2]}
+    # Argumentos que o caminho rápido não trata caem para a stdlib
+    assert app.json.dumps({'a': 1}, separators=(',', ':')) == '{"a":1}'
+    print(f"✅ jsonify e get_json com o backend {app.json.backend}")
+
+if __name__ == "__main__":
+    test_tipos_fora_do_codificador()
+    test_sort_keys_e_chaves_nao_str()
+    test_resposta_e_requisicao()
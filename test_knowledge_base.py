@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Script de teste para a base de conhecimento em arquivos de dados
+"""
+
+import json
+import os
+import shutil
+import tempfile
+
+import knowledge_base
+from knowledge_base import KnowledgeBaseError, compile_knowledge, read_compiled, write_compiled
+
+def test_knowledge_base():
+    """Testa validação das tabelas, pares reversos e forma compilada"""
+    print("🧪 Testando knowledge_base")
+
+    compiled = compile_knowledge()
+    assert set(compiled) == set(knowledge_base.TABLES)
+    print(f"✅ {len(compiled)} tabelas válidas")
+
+    interactions = compiled['drug_interactions']['data']
+    for (drug1, drug2), record in interactions.items():
+        assert (drug2, drug1) in interactions
+        assert record['drug1'] == drug1 and record['drug2'] == drug2
+    print(f"✅ {len(interactions)} interações indexadas nos dois sentidos")
+
+    original_dir = knowledge_base.KNOWLEDGE_DIR
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'knowledge.pickle')
+        write_compiled(compiled, path)
+        assert read_compiled(path) == compiled
+        print("✅ Forma compilada relida")
+
+        # Tabela malformada é rejeitada com mensagem indicando o problema
+        shutil.copy(knowledge_base.source_path('disease_details'), tmp)
+        with open(os.path.join(tmp, 'disease_details.json'), encoding='utf-8') as f:
+            document = json.load(f)
+        document['data']['E10']['has_treatment'] = 'sim'
+        with open(os.path.join(tmp, 'disease_details.json'), 'w', encoding='utf-8') as f:
+            json.dump(document, f)
+        knowledge_base.KNOWLEDGE_DIR = tmp
+        try:
+            knowledge_base.load_source('disease_details')
+            assert False, "tabela inválida deveria falhar"
+        except KnowledgeBaseError as e:
+            assert 'E10' in str(e)
+            print(f"✅ Tabela inválida rejeitada: {e}")
+        finally:
+            knowledge_base.KNOWLEDGE_DIR = original_dir
+
+if __name__ == "__main__":
+    test_knowledge_base()
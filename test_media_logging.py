@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Script de teste para o logging estruturado com fila e amostragem
+"""
+
+import io
+import json
+
+import media_logging
+from media_logging import configure_logging, get_logger, stop_logging
+
+def registros(stream):
+    stop_logging()  # esvazia a fila antes de ler a saída
+    return [json.loads(linha) for linha in stream.getvalue().splitlines()]
+
+def test_json_e_nivel():
+    """Testa saída JSON com campos extras e descarte abaixo do nível configurado"""
+    print("🧪 Testando logging JSON com nível")
+
+    saida = io.StringIO()
+    configure_logging(level='INFO', fmt='json', stream=saida, force=True)
+    logger = get_logger('teste')
+    logger.debug("não deve aparecer")
+    logger.info("Cache salvo com %d doenças", 14000, extra={'doencas': 14000})
+
+    linhas = registros(saida)
+    assert len(linhas) == 1
+    evento = linhas[0]
+    assert evento['level'] == 'INFO' and evento['logger'] == 'media.teste'
+    assert evento['msg'] == "Cache salvo com 14000 doenças" and evento['doencas'] == 14000
+    print("✅ Uma linha JSON por evento, com campos extras")
+
+def test_amostragem():
+    """Testa que eventos com extra={'sample': N} mantêm 1 a cada N"""
+    print("🧪 Testando amostragem de eventos frequentes")
+
+    saida = io.StringIO()
+    configure_logging(level='DEBUG', fmt='json', stream=saida, force=True)
+    logger = get_logger('teste')
+    for i in range(250):
+        logger.debug("Linha %d", i, extra={'sample': 100})
+    logger.info("fim")
+
+    linhas = registros(saida)
+    amostradas = [linha for linha in linhas if linha['msg'].startswith('Linha')]
+    assert [linha['msg'] for linha in amostradas] == ['Linha 0', 'Linha 100', 'Linha 200']
+    assert 'sampled' not in amostradas[0] and amostradas[1]['sampled'] == 99
+    assert linhas[-1]['msg'] == 'fim'
+    print(f"✅ {len(amostradas)} de 250 eventos mantidos")
+
+def test_texto_e_fork():
+    """Testa o formato texto e a recriação da thread de escrita após o fork"""
+    saida = io.StringIO()
+    configure_logging(level='INFO', fmt='text', stream=saida, force=True)
+    media_logging.restart_after_fork()
+    assert media_logging._listener is not None
+    get_logger('teste').warning("Tabela %s inválida", 'drug_aliases', extra={'version': 3})
+    stop_logging()
+    texto = saida.getvalue()
+    assert 'WARNING' in texto and 'media.teste: Tabela drug_aliases inválida version=3' in texto
+    print("✅ Formato texto com campos chave=valor")
+
+if __name__ == "__main__":
+    test_json_e_nivel()
+    test_amostragem()
+    test_texto_e_fork()
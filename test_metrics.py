@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Script de teste para a instrumentação de requisições e o endpoint /metrics
+"""
+
+import json
+import os
+import tempfile
+
+from flask import Blueprint, Flask, jsonify
+
+import metrics
+from metrics import RequestMetrics, collect, render, retire_worker
+
+def test_metrics_endpoint():
+    """Testa contadores, histogramas e formato Prometheus por blueprint"""
+    print("🧪 Testando métricas de requisições")
+
+    app = Flask(__name__)
+    disease_bp = Blueprint('disease', __name__)
+
+    @disease_bp.route('/doencas')
+    def listar_doencas():
+        return jsonify({"doencas": ["Asma"] * 100})
+
+    @disease_bp.route('/falha')
+    def falha():
+        raise RuntimeError("erro simulado")
+
+    app.register_blueprint(disease_bp, url_prefix='/api')
+    request_metrics = RequestMetrics()
+    metrics.init_app(app, request_metrics)
+    client = app.test_client()
+
+    for _ in range(3):
+        assert client.get('/api/doencas').status_code == 200
+    assert client.get('/api/falha').status_code == 500
+    assert client.get('/nao-existe').status_code == 404
+
+    response = client.get('/metrics')
+    assert response.content_type.startswith('text/plain; version=0.0.4')
+    text = response.get_data(as_text=True)
+    labels = 'blueprint="disease",endpoint="disease.listar_doencas",method="GET"'
+    assert f'media_http_requests_total{{{labels},status="200"}} 3' in text
+    assert 'endpoint="disease.falha",method="GET",status="500"} 1' in text
+    assert 'endpoint="unmatched",method="GET",status="404"} 1' in text
+    assert f'media_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 3' in text
+    assert f'media_http_request_duration_seconds_count{{{labels}}} 3' in text
+    assert f'media_http_response_size_bytes_count{{{labels}}} 3' in text
+    assert 'media_http_requests_in_flight{blueprint="disease"} 0' in text
+    print("✅ Contadores e histogramas por endpoint no formato Prometheus")
+
+def test_metrics_aggregation():
+    """Testa a soma entre workers e a consolidação de workers encerrados"""
+    print("🧪 Testando agregação de métricas entre workers")
+
+    with tempfile.TemporaryDirectory() as directory:
+        worker = RequestMetrics()
+        worker.observe('symptoms', 'symptoms.analyze_symptoms', 'POST', 200, 0.02, 500)
+        worker.started('symptoms')
+        dead_pid = 999999999
+        with open(os.path.join(directory, f'worker-{dead_pid}.json'), 'w') as f:
+            json.dump(worker.snapshot(), f)
+
+        own = RequestMetrics()
+        own.observe('symptoms', 'symptoms.analyze_symptoms', 'POST', 200, 0.2, 500)
+        merged = collect(own, directory)
+        text = render(merged)
+        assert 'endpoint="symptoms.analyze_symptoms",method="POST",status="200"} 2' in text
+        assert 'media_http_requests_in_flight{blueprint="symptoms"}' not in text
+        print("✅ Workers somados; em andamento de worker encerrado descartado")
+
+        retire_worker(dead_pid, directory)
+        assert os.listdir(directory) == ['retired.json']
+        assert render(collect(own, directory)) == text
+        print("✅ Worker encerrado consolidado em retired.json")
+
+if __name__ == "__main__":
+    test_metrics_endpoint()
+    test_metrics_aggregation()
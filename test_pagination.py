@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Script de teste para a paginação por offset/cursor e o streaming NDJSON das listagens
+"""
+
+import json
+
+from catalog_snapshot import get_snapshot
+from main import app
+from pagination import (MAX_LIMIT, PageRequest, PaginationError, decode_cursor, encode_cursor, iter_page,
+                        parse_page_request)
+from response_cache import catalog_cache
+
+def _codigos(doencas):
+    return [d['cid'] for d in doencas]
+
+def test_parametros():
+    """Testa leitura de limit/offset/cursor e os erros de validação"""
+    print("🧪 Testando parâmetros de paginação")
+
+    assert parse_page_request({}) is None
+    page = parse_page_request({'limit': '5', 'offset': '10'})
+    assert (page.offset, page.limit, page.stream) == (10, 5, False)
+    assert decode_cursor(encode_cursor(42)) == 42
+    assert parse_page_request({'cursor': encode_cursor(7)}).offset == 7
+    for args in ({'limit': '0'}, {'limit': str(MAX_LIMIT + 1)}, {'limit': 'x'}, {'offset': '-1'},
+                 {'cursor': 'nao-e-cursor'}, {'cursor': encode_cursor(3)[:-1] + '!'}):
+        try:
+            parse_page_request(args)
+            assert False, f"{args} deveria ser recusado"
+        except PaginationError:
+            pass
+    # Sequências são lidas por posição; iteradores, com islice
+    assert list(iter_page(list(range(10)), PageRequest(offset=8, limit=5))) == [8, 9]
+    assert list(iter_page(iter(range(10)), PageRequest(offset=2, limit=2))) == [2, 3]
+    print("✅ limit/offset/cursor validados")
+
+def test_paginas_e_cursor():
+    """Testa páginas de /api/doencas seguindo next_cursor até o fim"""
+    catalog_cache.clear()
+    client = app.test_client()
+    todas = _codigos(get_snapshot().doencas)
+
+    pagina = client.get('/api/doencas?limit=3&offset=2').json
+    assert _codigos(pagina['doencas']) == todas[2:5]
+    assert pagina['total'] == len(todas) and pagina['offset'] == 2 and pagina['limit'] == 3
+
+    vistos, url = [], '/api/doencas?limit=100'
+    while url:
+        pagina = client.get(url).json
+        vistos += _codigos(pagina['doencas'])
+        url = pagina['next_cursor'] and f"/api/doencas?limit=100&cursor={pagina['next_cursor']}"
+    assert vistos == todas
+
+    assert client.get('/api/doencas?cursor=%%%').status_code == 400
+    assert client.get(f'/api/doencas?limit={MAX_LIMIT + 1}').status_code == 400
+    assert client.get('/api/v2/categories/D/diseases?limit=-5').status_code == 400
+    print(f"✅ {len(todas)} doenças percorridas pelo cursor")
+
+def test_ndjson_e_legado():
+    """Testa o streaming NDJSON (Accept e format=) e a lista completa sem parâmetros"""
+    catalog_cache.clear()
+    client = app.test_client()
+    todas = _codigos(get_snapshot().doencas)
+
+    response = client.get('/api/doencas?offset=1&limit=4', headers={'Accept': 'application/x-ndjson'})
+    assert response.mimetype == 'application/x-ndjson' and response.is_streamed
+    linhas = response.get_data(as_text=True).splitlines()
+    assert _codigos(json.loads(linha) for linha in linhas) == todas[1:5]
+    assert len(client.get('/api/doencas?format=ndjson').get_data(as_text=True).splitlines()) == len(todas)
+
+    legado = client.get('/api/doencas')
+    assert legado.mimetype == 'application/json' and _codigos(legado.json) == todas
+    categoria = client.get('/api/v2/categories/D/diseases').json
+    assert 'next_cursor' not in categoria and categoria['total_diseases'] == len(categoria['diseases'])
+    print("✅ NDJSON em streaming e respostas legadas inalteradas")
+
+if __name__ == "__main__":
+    test_parametros()
+    test_paginas_e_cursor()
+    test_ndjson_e_legado()
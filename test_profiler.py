@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Script de teste para o profiler por amostragem e o endpoint administrativo
+"""
+
+import os
+import threading
+import time
+
+from flask import Flask
+
+import profiler
+from profiler import ProfilerBusy, SamplingProfiler, render_collapsed
+
+def calculate_relevance_lenta():
+    fim = time.perf_counter() + 0.03
+    while time.perf_counter() < fim:
+        sum(range(200))
+
+def test_sampling_profiler():
+    """Testa amostragem das threads em requisição, limite por requisições e exclusão mútua"""
+    print("🧪 Testando profiler por amostragem")
+
+    app = Flask(__name__)
+    amostrador = SamplingProfiler()
+    profiler.init_app(app, amostrador)
+
+    @app.route('/api/lenta')
+    def lenta():
+        calculate_relevance_lenta()
+        return "ok"
+
+    def carga(total):
+        client = app.test_client()
+        time.sleep(0.05)
+        for _ in range(total):
+            client.get('/api/lenta')
+
+    thread = threading.Thread(target=carga, args=(5,))
+    thread.start()
+    resultado = amostrador.profile(requests=5, interval=0.002)
+    thread.join()
+
+    assert resultado['requests'] == 5 and resultado['samples'] > 0
+    saida = render_collapsed(resultado['stacks'])
+    assert 'calculate_relevance_lenta (test_profiler.py:' in saida
+    linha = saida.splitlines()[0]
+    assert linha.rsplit(' ', 1)[1].isdigit() and ';' in linha
+    print(f"✅ {resultado['samples']} amostras em {resultado['requests']} requisições")
+
+    ocupado = threading.Thread(target=amostrador.profile, kwargs={'seconds': 0.3})
+    ocupado.start()
+    time.sleep(0.05)
+    try:
+        amostrador.profile(seconds=0.1)
+        assert False, "segunda sessão simultânea deveria ser recusada"
+    except ProfilerBusy:
+        pass
+    ocupado.join()
+    print("✅ Uma sessão por worker")
+
+def test_profile_endpoint():
+    """Testa autenticação e validação do POST /api/admin/profile"""
+    os.environ['MEDIA_ADMIN_TOKEN'] = 'segredo'
+    try:
+        from src.routes.admin import admin_bp
+        app = Flask(__name__)
+        app.register_blueprint(admin_bp, url_prefix='/api/admin')
+        client = app.test_client()
+
+        assert client.post('/api/admin/profile?seconds=0.05').status_code == 401
+        headers = {'X-Admin-Token': 'segredo'}
+        assert client.post('/api/admin/profile?seconds=abc', headers=headers).status_code == 400
+        response = client.post('/api/admin/profile?seconds=0.05&format=json', headers=headers)
+        assert response.status_code == 200 and response.json['pid'] == os.getpid()
+        print("✅ Endpoint protegido pelo token administrativo")
+    finally:
+        del os.environ['MEDIA_ADMIN_TOKEN']
+
+if __name__ == "__main__":
+    test_sampling_profiler()
+    test_profile_endpoint()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Script de teste para o cache de respostas pré-serializadas
+"""
+
+import gzip
+
+from flask import Flask
+
+from response_cache import ResponseCache
+
+def test_response_cache():
+    """Testa ETag, 304, compressão e invalidação por versão"""
+    print("🧪 Testando cache de respostas")
+
+    app = Flask(__name__)
+    cache = ResponseCache(max_entries=2)
+    state = {"version": "v1", "builds": 0}
+
+    def builder():
+        state["builds"] += 1
+        return {"doencas": ["Asma", "Cólera"], "build": state["builds"]}
+
+    @app.route('/doencas')
+    def doencas():
+        return cache.cached_json('doencas', state["version"], builder)
+
+    client = app.test_client()
+
+    # Primeira chamada monta, segunda reutiliza os bytes
+    first = client.get('/doencas')
+    second = client.get('/doencas')
+    assert first.status_code == 200 and second.status_code == 200
+    assert state["builds"] == 1
+    assert first.data == second.data
+    etag = first.headers['ETag']
+    print(f"✅ ETag estável: {etag}")
+
+    # Revalidação condicional
+    not_modified = client.get('/doencas', headers={'If-None-Match': etag})
+    assert not_modified.status_code == 304
+    print("✅ If-None-Match retorna 304")
+
+    # Variante gzip
+    compressed = client.get('/doencas', headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(compressed.data) == first.data
+    print("✅ Variante gzip servida")
+
+    # Nova versão do catálogo invalida o cache
+    state["version"] = "v2"
+    updated = client.get('/doencas')
+    assert state["builds"] == 2
+    assert updated.headers['ETag'] != etag
+    print("✅ Nova versão do catálogo invalida a entrada")
+
+if __name__ == "__main__":
+    test_response_cache()
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Script de teste para a busca por nome com detalhes embutidos (include=details)
+"""
+
+import os
+
+os.environ.setdefault('MEDIA_BACKGROUND_REFRESH', '0')
+
+from main import app
+
+def test_busca_com_detalhes():
+    """Testa que include=details traz o mesmo conteúdo do endpoint de detalhes"""
+    print("🧪 Testando busca com include=details")
+
+    client = app.test_client()
+    simples = client.post('/api/v2/search/name', json={'query': 'diabetes'}).json
+    assert simples['success'] and simples['results']
+    assert all('details' not in r for r in simples['results'])
+
+    completa = client.post('/api/v2/search/name?include=details', json={'query': 'diabetes'}).json
+    assert completa['total_found'] == simples['total_found']
+    assert [r['code'] for r in completa['results']] == [r['code'] for r in simples['results']]
+    for result in completa['results'][:5]:
+        detalhes = client.get(f"/api/v2/disease/{result['code']}/details").json
+        assert result['details'] == detalhes['disease_details']
+
+    corpo = client.post('/api/v2/search/name', json={'query': 'diabetes', 'include': ['details']}).json
+    assert corpo['results'] == completa['results']
+    print(f"✅ {len(completa['results'])} resultados com detalhes em uma única requisição")
+
+if __name__ == "__main__":
+    test_busca_com_detalhes()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Script de teste para o registro de serviços preguiçoso
+"""
+
+import threading
+
+from service_registry import ServiceRegistry, registry as registro_global
+
+def test_service_registry():
+    """Testa construção no primeiro uso, instância única entre threads e nova tentativa após falha"""
+    print("🧪 Testando service_registry")
+
+    constructions = []
+
+    class Servico:
+        def __init__(self):
+            constructions.append(1)
+
+        def ping(self):
+            return 'pong'
+
+    registry = ServiceRegistry()
+    servico = registry.register('servico', Servico)
+    assert not registry.is_loaded('servico') and constructions == []
+    print("✅ Nada construído no registro")
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(servico.ping())) for _ in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == ['pong'] * 16 and len(constructions) == 1
+    print("✅ Construído uma única vez com 16 threads concorrentes")
+
+    falhas = []
+
+    def fabrica_instavel():
+        if not falhas:
+            falhas.append(1)
+            raise RuntimeError("falha temporária")
+        return Servico()
+
+    instavel = registry.register('instavel', fabrica_instavel)
+    try:
+        instavel.ping()
+        assert False, "primeira construção deveria falhar"
+    except RuntimeError:
+        pass
+    assert instavel.ping() == 'pong'
+    print("✅ Falha na construção não fica em cache")
+
+    # Caminho 'modulo:Classe' é importado só no primeiro uso
+    registry.register('symptoms', 'enhanced_symptom_service:EnhancedSymptomService')
+    registry.preload(['symptoms'])
+    assert registry.status()['symptoms']
+    print("✅ Preload por caminho de importação")
+
+def test_fabricas_registradas():
+    """Testa que toda fábrica registrada pelos blueprints aponta para um módulo e classe existentes"""
+    import enhanced_disease  # noqa: F401 - blueprint da raiz (não montado no main.py)
+    import main  # noqa: F401 - blueprints servidos
+
+    nomes = sorted(registro_global.status())
+    assert {'cid_categorizer', 'diagnostic_engine', 'drug_checker', 'disease_details',
+            'symptom_selector', 'symptom_service'} <= set(nomes)
+    for nome in nomes:
+        fabrica = registro_global.factory(nome)
+        assert isinstance(fabrica, type), f"{nome}: {fabrica!r}"
+    print(f"✅ {len(nomes)} fábricas resolvidas: {', '.join(nomes)}")
+
+if __name__ == "__main__":
+    test_service_registry()
+    test_fabricas_registradas()
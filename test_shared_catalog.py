@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Script de teste para o catálogo compartilhado via mmap
+"""
+
+import os
+import tempfile
+
+import catalog_snapshot
+from catalog_snapshot import build_snapshot, read_shared, write_shared
+from response_cache import catalog_cache
+
+def test_shared_catalog():
+    """Testa que o catálogo mapeado responde igual ao snapshot em memória"""
+    print("🧪 Testando shared_catalog")
+
+    snapshot = build_snapshot()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'catalog_shared.bin')
+        write_shared(snapshot, path)
+        shared = read_shared(path)
+        assert shared is not None and shared.is_current()
+
+        assert list(shared.doencas) == snapshot.doencas
+        assert list(shared.cid10) == snapshot.cid10
+        assert shared.doencas[5:9] == snapshot.doencas[5:9]
+        print(f"✅ {len(shared.doencas)} doenças e {len(shared.cid10)} códigos CID-10 idênticos")
+
+        for doenca in snapshot.doencas:
+            assert shared.doenca_por_cid(doenca['cid']) == snapshot.doenca_por_cid(doenca['cid'])
+        for item in snapshot.cid10:
+            assert shared.cid10_por_codigo(item['code']) == snapshot.cid10_por_codigo(item['code'])
+        assert shared.doenca_por_cid('Z99.9') is None and shared.cid10_por_codigo('') is None
+        for letter in 'ACFIJZ':
+            assert shared.doencas_por_letra(letter) == snapshot.doencas_por_letra(letter)
+            assert list(shared.indexes['cid10_by_letter'].get(letter, ())) == snapshot.indexes['cid10_by_letter'].get(letter, [])
+        print("✅ Índices por código e por letra equivalentes")
+
+        with open(path, 'wb') as f:
+            f.write(b'MEDIASHM\x09')
+        assert read_shared(path) is None
+        print("✅ Arquivo incompatível ignorado")
+
+def test_colunas_nas_rotas():
+    """Testa as colunas decodificadas uma vez e as rotas /api/v2 servidas pelo catálogo mapeado"""
+    print("🧪 Testando colunas do snapshot nas varreduras das rotas")
+
+    from main import app
+    client = app.test_client()
+    consultas = [('/api/v2/search/name', {'query': 'tuberculose'}), ('/api/v2/search/name', {'query': 'febre'})]
+    urls = ['/api/v2/categories', '/api/v2/categories/Doen/diseases']
+
+    def respostas():
+        catalog_cache.clear()
+        return ([client.post(url, json=body).json for url, body in consultas] +
+                [client.get(url).json for url in urls])
+
+    snapshot = build_snapshot()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'catalog_shared.bin')
+        write_shared(snapshot, path)
+        shared = read_shared(path)
+        nomes = shared.column('doencas', 'nome')
+        assert nomes == tuple(d['nome'] for d in snapshot.doencas)
+        assert shared.column('doencas', 'nome') is nomes  # memorizada
+        assert shared.column('cid10', 'inexistente') == (None,) * len(snapshot.cid10)
+
+        previous = catalog_snapshot.get_snapshot()
+        catalog_snapshot.set_auto_refresh(False)
+        try:
+            catalog_snapshot.install_snapshot(snapshot)
+            esperado = respostas()
+            catalog_snapshot.install_snapshot(shared)
+            assert respostas() == esperado
+        finally:
+            catalog_snapshot.install_snapshot(previous)
+            catalog_snapshot.set_auto_refresh(True)
+            catalog_cache.clear()
+    assert esperado[0]['total_found'] > 0 and esperado[-1]['total_diseases'] > 0
+    print("✅ Mesmas respostas com o catálogo em memória e mapeado")
+
+if __name__ == "__main__":
+    test_shared_catalog()
+    test_colunas_nas_rotas()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Script de teste para os spans de tempo dos serviços
+"""
+
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Flask, jsonify
+
+import spans
+from metrics import RequestMetrics, render
+from spans import span, timed
+
+@timed('teste.soma')
+def soma(a, b):
+    return a + b
+
+def test_spans():
+    """Testa coleta por requisição, Server-Timing e agregação no /metrics"""
+    print("🧪 Testando spans")
+
+    # Fora de uma requisição nada é registrado
+    assert soma(1, 2) == 3
+    with span('teste.bloco'):
+        pass
+
+    token = spans.begin()
+    soma(1, 2)
+    soma(3, 4)
+    with span('teste.bloco'):
+        pass
+    coletados = spans.end(token)
+    assert coletados['teste.soma'][1] == 2 and coletados['teste.bloco'][1] == 1
+    assert 'teste.soma;dur=' in spans.server_timing(coletados)
+    assert ';desc="2x"' in spans.server_timing(coletados)
+    print("✅ Tempos somados por nome de span")
+
+    app = Flask(__name__)
+    request_metrics = RequestMetrics()
+    spans.init_app(app, request_metrics)
+
+    @app.route('/api/soma')
+    def api_soma():
+        return jsonify({"resultado": soma(2, 3)})
+
+    client = app.test_client()
+    assert 'Server-Timing' not in client.get('/api/soma').headers
+    debug = client.get('/api/soma', headers={'X-Debug-Timing': '1'})
+    assert debug.headers['Server-Timing'].startswith('teste.soma;dur=')
+    print(f"✅ Server-Timing: {debug.headers['Server-Timing']}")
+
+    text = render(request_metrics.snapshot())
+    assert 'media_span_duration_seconds_count{span="teste.soma"} 2' in text
+    print("✅ Spans agregados em media_span_duration_seconds")
+
+def test_spans_em_threads():
+    """Testa spans somados por várias threads que receberam o contexto da requisição"""
+    token = spans.begin()
+
+    def repetir():
+        for _ in range(2000):
+            soma(1, 2)
+
+    with ThreadPoolExecutor(8) as pool:
+        for future in [pool.submit(contextvars.copy_context().run, repetir) for _ in range(8)]:
+            future.result()
+    coletados = spans.end(token)
+    assert coletados['teste.soma'][1] == 8 * 2000, coletados
+    print("✅ Nenhuma chamada perdida entre threads")
+
+def test_spans_nas_rotas():
+    """Testa que as rotas montadas em main.app registram spans no Server-Timing"""
+    from main import app
+    client = app.test_client()
+    headers = {'X-Debug-Timing': '1'}
+    busca = client.post('/api/v2/search/name', json={'query': 'febre'}, headers=headers)
+    assert 'disease.search.scan;dur=' in busca.headers['Server-Timing']
+    diagnostico = client.post('/api/v2/diagnose/symptoms', headers=headers,
+                              json={'symptoms_report': 'muita sede', 'include_report': True})
+    assert 'diagnostic.extract_symptoms;dur=' in diagnostico.headers['Server-Timing']
+    interacoes = client.post('/api/v2/interactions/check', json={'medications': ['aspirina', 'varfarina']},
+                             headers=headers)
+    assert 'interactions.check;dur=' in interacoes.headers['Server-Timing']
+    print(f"✅ Server-Timing da busca: {busca.headers['Server-Timing']}")
+
+if __name__ == "__main__":
+    test_spans()
+    test_spans_em_threads()
+    test_spans_nas_rotas()
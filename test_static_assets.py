@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Script de teste para os arquivos estáticos servidos da memória
+"""
+
+import gzip
+import os
+import tempfile
+
+from flask import Flask
+
+from static_assets import StaticAssets, write_compressed
+
+def test_static_assets():
+    """Testa variantes pré-comprimidas, ETag/304 e cabeçalhos de cache"""
+    print("🧪 Testando arquivos estáticos")
+
+    with tempfile.TemporaryDirectory() as directory:
+        html = ("<html><body>" + "Med-IA " * 200 + "</body></html>").encode('utf-8')
+        with open(os.path.join(directory, 'index.html'), 'wb') as f:
+            f.write(html)
+        with open(os.path.join(directory, 'app.3f2a9c1d.js'), 'wb') as f:
+            f.write(b"console.log('med-ia');" * 50)
+        with open(os.path.join(directory, 'logo.png'), 'wb') as f:
+            f.write(b'\x89PNG' + bytes(2000))
+
+        assert write_compressed(directory) >= 2
+        assert os.path.exists(os.path.join(directory, 'index.html.gz'))
+        assert not os.path.exists(os.path.join(directory, 'logo.png.gz'))
+        print("✅ Variantes .gz gravadas apenas para arquivos comprimíveis")
+
+        assets = StaticAssets(directory)
+        assert sorted(assets.assets) == ['app.3f2a9c1d.js', 'index.html', 'logo.png']
+
+        app = Flask(__name__, static_folder=None)
+
+        @app.route('/<path:filename>')
+        def serve(filename):
+            return assets.get(filename).response()
+
+        client = app.test_client()
+        response = client.get('/index.html', headers={'Accept-Encoding': 'gzip'})
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert response.headers['Cache-Control'] == 'no-cache'
+        assert gzip.decompress(response.data) == html
+
+        not_modified = client.get('/index.html', headers={'If-None-Match': response.headers['ETag']})
+        assert not_modified.status_code == 304 and not not_modified.data
+        print("✅ HTML comprimido, revalidado por ETag")
+
+        script = client.get('/app.3f2a9c1d.js')
+        assert 'immutable' in script.headers['Cache-Control'] and 'Content-Encoding' not in script.headers
+        image = client.get('/logo.png', headers={'Accept-Encoding': 'gzip'})
+        assert image.content_type == 'image/png' and 'Content-Encoding' not in image.headers
+        print("✅ Cache longo para arquivos com hash, binários sem compressão")
+
+if __name__ == "__main__":
+    test_static_assets()
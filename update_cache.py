@@ -12,10 +12,14 @@ from datetime import datetime
 # Adicionar o diretório src ao path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
-from routes.disease import scraping_doencas, salvar_doencas_local
+from routes.disease import scraping_doencas
+from catalog_snapshot import build_snapshot, write_artifacts
+from media_logging import configure_logging
 
 def main():
     """Função principal para atualizar o cache"""
+    # Mensagens do scraping (logger "datasus") saem pelo handler do media_logging
+    configure_logging()
     print(f"Iniciando atualização do cache de doenças - {datetime.now()}")
     
     try:
@@ -23,9 +27,11 @@ def main():
         doencas = scraping_doencas()
         
         if doencas:
-            # Salvar no cache
-            salvar_doencas_local(doencas)
+            # scraping_doencas já grava o cache (de forma atômica)
             print(f"Cache atualizado com sucesso! {len(doencas)} doenças salvas.")
+            # Recompilar o snapshot binário lido pelos workers
+            write_artifacts(build_snapshot())
+            print("Snapshot do catálogo recompilado.")
         else:
             print("Erro: Nenhuma doença foi extraída do Datasus")
             return 1